@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,14 +44,17 @@ INSTALLED_APPS = [
     'drf_spectacular',
     'user',
     'event',
+    'enrollment',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -79,16 +83,94 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Connections come from a pool kept by each process, see
+# core.db.backends.postgresql_pool. DB_POOL=0 connects per request.
+if os.environ.get('DB_POOL', '1').lower() in ('0', 'false', 'no'):
+    DB_POOL = None
+else:
+    DB_POOL = {
+        'MIN_SIZE': int(os.environ.get('DB_POOL_MIN_SIZE', 0)),
+        'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+        'MAX_LIFETIME': int(os.environ.get('DB_POOL_MAX_LIFETIME', 3600)),
+        'MAX_IDLE': int(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+        'WAIT_TIMEOUT': float(os.environ.get('DB_POOL_WAIT_TIMEOUT', 5)),
+        'HEALTH_CHECK_AFTER': int(
+            os.environ.get('DB_POOL_HEALTH_CHECK_AFTER', 30)
+        ),
+    }
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.db.backends.postgresql_pool',
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASS'),
+        'POOL': DB_POOL,
     }
 }
 
+# Read replicas of the default database, see core.routers. Each host in
+# DB_REPLICA_HOSTS is a `replica_<n>` alias; DB_REPLICA_NAME points them
+# at another database, e.g. a second local one standing in for a
+# replica. The tests route to `replica_1` themselves, in a test database
+# of its own so they can tell which database a read went to.
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+DB_REPLICA_HOSTS = [
+    host.strip()
+    for host in os.environ.get('DB_REPLICA_HOSTS', '').split(',')
+    if host.strip()
+]
+for number, host in enumerate(
+    DB_REPLICA_HOSTS or [DATABASES['default']['HOST']], start=1
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'NAME': os.environ.get('DB_REPLICA_NAME', os.environ.get('DB_NAME')),
+        'TEST': {'NAME': f'test_{os.environ.get("DB_NAME")}_{alias}'},
+    }
+    if DB_REPLICA_HOSTS or os.environ.get('DB_REPLICA_NAME'):
+        DATABASE_REPLICAS.append(alias)
+
+# Seconds a user's reads stay on the primary after they wrote.
+DATABASE_REPLICA_LAG = int(os.environ.get('DB_REPLICA_LAG', 5))
+
+
+# Password hashing, see core.hashers. PASSWORD_HASHER picks the hasher
+# of new passwords: pbkdf2, argon2 (needs argon2-cffi) or bcrypt (needs
+# bcrypt). Passwords hashed with another hasher or cost are rehashed
+# when their user next logs in.
+PASSWORD_HASHER_CLASSES = {
+    'pbkdf2': 'core.hashers.PBKDF2PasswordHasher',
+    'argon2': 'core.hashers.Argon2PasswordHasher',
+    'bcrypt': 'core.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CLASSES.items()
+    if name != PASSWORD_HASHER
+]
+PASSWORD_HASHER_OPTIONS = {
+    'pbkdf2_iterations': int(
+        os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 260000)
+    ),
+    'argon2_time_cost': int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2)),
+    'argon2_memory_cost': int(
+        os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 102400)
+    ),
+    'argon2_parallelism': int(
+        os.environ.get('PASSWORD_ARGON2_PARALLELISM', 8)
+    ),
+    'bcrypt_rounds': int(os.environ.get('PASSWORD_BCRYPT_ROUNDS', 12)),
+}
+
+# Threads hashing passwords, see core.hashing; one per CPU by default.
+PASSWORD_HASHING_WORKERS = int(
+    os.environ.get('PASSWORD_HASHING_WORKERS', os.cpu_count() or 1)
+)
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -135,4 +217,158 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'core.User'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # orjson backed JSON, see core.renderers and core.parsers; views can
+    # still pick the stdlib JSONRenderer/JSONParser.
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Proxies in front of the app appending to X-Forwarded-For; the
+    # throttles key on the address the nearest of them saw, or on
+    # REMOTE_ADDR with none, never on a header the client sent.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+}
+
+# Keyset pagination for the event listings, used when a client
+# asks for it with `?page_size=` or `?cursor=`.
+EVENT_PAGE_SIZE = int(os.environ.get('EVENT_PAGE_SIZE', 20))
+EVENT_MAX_PAGE_SIZE = int(os.environ.get('EVENT_MAX_PAGE_SIZE', 100))
+
+# Caches used by the apps, see core.cache. Set REDIS_URL to share them
+# between processes.
+if os.environ.get('REDIS_URL'):
+    CORE_CACHE_BACKEND = {
+        'BACKEND': 'core.cache.RedisCache',
+        'OPTIONS': {'location': os.environ['REDIS_URL']},
+    }
+else:
+    CORE_CACHE_BACKEND = {
+        'BACKEND': 'core.cache.LocMemLRUCache',
+        'OPTIONS': {'max_entries': 1024},
+    }
+
+CORE_CACHES = {
+    'default': CORE_CACHE_BACKEND,
+    'events': {
+        'BACKEND': CORE_CACHE_BACKEND['BACKEND'],
+        'OPTIONS': {
+            **CORE_CACHE_BACKEND['OPTIONS'],
+            'key_prefix': 'events:',
+        },
+    },
+    # Token to user lookups of user.authentication, kept briefly in
+    # every process and, with REDIS_URL, for longer in the shared cache.
+    'tokens': {
+        'BACKEND': 'core.cache.LocMemLRUCache',
+        'OPTIONS': {
+            'max_entries': int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', 10000)),
+            'default_timeout': int(os.environ.get('AUTH_TOKEN_LOCAL_TTL', 30)),
+        },
+    },
+}
+
+# Seconds an event listing or calendar month stays cached, see
+# event.cache and event.calendar. Writes to the events expire them
+# sooner, but only in the processes sharing the cache, so set REDIS_URL
+# when running more than one worker.
+EVENT_LISTING_CACHE_TTL = int(os.environ.get('EVENT_LISTING_CACHE_TTL', 60))
+
+# Login throttle counters, see user.throttling: shared by the processes
+# with REDIS_URL, otherwise kept per process.
+if os.environ.get('REDIS_URL'):
+    CORE_CACHES['throttle'] = {
+        'BACKEND': 'core.cache.RedisCache',
+        'OPTIONS': {
+            'location': os.environ['REDIS_URL'],
+            'key_prefix': 'throttle:',
+        },
+    }
+else:
+    CORE_CACHES['throttle'] = {
+        'BACKEND': 'core.cache.LocMemLRUCache',
+        'OPTIONS': {
+            'max_entries': int(os.environ.get('THROTTLE_CACHE_SIZE', 100000)),
+        },
+    }
+
+# Login attempts allowed per client IP and per email address, as
+# `<count>/<sec|min|hour|day>`; None turns a throttle off.
+LOGIN_THROTTLE_RATES = {
+    'login-ip': os.environ.get('LOGIN_THROTTLE_IP_RATE', '30/min'),
+    'login-email': os.environ.get('LOGIN_THROTTLE_EMAIL_RATE', '10/min'),
+}
+
+if os.environ.get('REDIS_URL'):
+    CORE_CACHES['tokens-shared'] = {
+        'BACKEND': 'core.cache.RedisCache',
+        'OPTIONS': {
+            'location': os.environ['REDIS_URL'],
+            'key_prefix': 'tokens:',
+            'default_timeout': int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 300)),
+        },
+    }
+    AUTH_TOKEN_SHARED_CACHE = 'tokens-shared'
+else:
+    AUTH_TOKEN_SHARED_CACHE = None
+
+# Signed, expiring api tokens, see user.tokens. Tokens are signed with
+# the key of AUTH_TOKEN_SIGNING_KEY_VERSION; keep retired keys listed
+# until the tokens signed with them have expired.
+AUTH_TOKEN_TTL = int(os.environ.get('AUTH_TOKEN_TTL', 7 * 24 * 60 * 60))
+AUTH_TOKEN_SIGNING_KEYS = {
+    '1': os.environ.get('AUTH_TOKEN_SIGNING_KEY', SECRET_KEY),
 }
+AUTH_TOKEN_SIGNING_KEY_VERSION = '1'
+
+# Bulk event imports through `organized-events/bulk/`: the most events
+# accepted per request and how many are written per statement.
+EVENT_BULK_MAX_ITEMS = int(os.environ.get('EVENT_BULK_MAX_ITEMS', 1000))
+EVENT_BULK_BATCH_SIZE = int(os.environ.get('EVENT_BULK_BATCH_SIZE', 500))
+
+# Longest event duration accepted, in days; venue bookings are checked
+# this far back where the database does not check them, see
+# event.bookings.
+EVENT_MAX_DURATION_DAYS = int(os.environ.get('EVENT_MAX_DURATION_DAYS', 31))
+
+# Longest window, in days, served by the event calendar.
+EVENT_CALENDAR_MAX_DAYS = int(os.environ.get('EVENT_CALENDAR_MAX_DAYS', 366))
+
+# Rows fetched per round trip by the streaming event export.
+EVENT_EXPORT_CHUNK_SIZE = int(os.environ.get('EVENT_EXPORT_CHUNK_SIZE', 2000))
+
+# Serve the all-events and organized events listings from `.values()`
+# rows with precompiled field converters, see event.fast.
+EVENT_FAST_SERIALIZATION = os.environ.get(
+    'EVENT_FAST_SERIALIZATION', ''
+).lower() in ('1', 'true', 'yes')
+
+# Threads running the database work of the async event views, see
+# event.async_views.
+EVENT_ASYNC_WORKERS = int(os.environ.get('EVENT_ASYNC_WORKERS', 10))
+
+# Request metrics served on /metrics/, see core.metrics. Set METRICS_TOKEN
+# to require it as a bearer token; without one they are only served under
+# DEBUG or with METRICS_PUBLIC set.
+METRICS_ENABLED = os.environ.get(
+    'METRICS_ENABLED', '1'
+).lower() in ('1', 'true', 'yes')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_PUBLIC = os.environ.get(
+    'METRICS_PUBLIC', ''
+).lower() in ('1', 'true', 'yes')
+
+# Requests running more queries than their view's `query_budget`, or
+# the same query more than QUERY_REPEAT_LIMIT times, are counted in the
+# request metrics. Under DEBUG, in the test suite or with
+# QUERY_BUDGET_WARNINGS set they also raise a
+# core.middleware.QueryBudgetWarning.
+QUERY_BUDGET = int(os.environ.get('QUERY_BUDGET', 20))
+QUERY_REPEAT_LIMIT = int(os.environ.get('QUERY_REPEAT_LIMIT', 5))
+QUERY_BUDGET_WARNINGS = os.environ.get(
+    'QUERY_BUDGET_WARNINGS', ''
+).lower() in ('1', 'true', 'yes') or sys.argv[1:2] == ['test']
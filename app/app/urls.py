@@ -11,6 +11,8 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from core.views import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
@@ -21,4 +23,6 @@ urlpatterns = [
     ),
     path('api/user/', include('user.urls')),
     path('api/event/', include('event.urls')),
+    path('api/enrollment/', include('enrollment.urls')),
+    path('metrics/', metrics_view, name='metrics'),
 ]
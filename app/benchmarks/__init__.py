@@ -0,0 +1,11 @@
+"""
+Benchmarks for the event management API.
+
+Each module is runnable from the app directory, for example:
+`python -m benchmarks.pagination --events 200000`.
+Benchmarks run against a throwaway test database and print their
+results as JSON, along with the commit they ran on. `benchmarks.data`
+generates the larger data sets, `benchmarks.micro` times serializers and
+querysets, `benchmarks.load` drives the api from many clients and
+`benchmarks.compare` diffs two saved reports.
+"""
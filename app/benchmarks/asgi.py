@@ -0,0 +1,101 @@
+"""
+Load test the async event views under ASGI against the WSGI path.
+
+Seeds a test database, then serves the app with uvicorn (ASGI) and with
+Django's threaded development server (WSGI) and drives each with
+`--concurrency` connections for `--duration` seconds, reporting
+sustained requests per second and latency percentiles. `--read-delay`
+makes every client wait before reading its response, like slow mobile
+clients do. uvicorn comes from requirements.dev.txt.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+from benchmarks.common import benchmark_database, report, setup
+from benchmarks.http import free_port, load, wait_for_port
+from benchmarks.pagination import seed_events
+
+HOST = '127.0.0.1'
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = [
+    ('asgi_async_view', 'asgi', '/api/event/async/all-events/'),
+    ('asgi_sync_view', 'asgi', '/api/event/all-events/'),
+    ('wsgi_sync_view', 'wsgi', '/api/event/all-events/'),
+]
+
+
+def start_server(kind, port, database):
+    env = dict(os.environ, DB_NAME=database)
+    if kind == 'asgi':
+        command = [
+            sys.executable, '-m', 'uvicorn', 'app.asgi:application',
+            '--host', HOST, '--port', str(port),
+            '--log-level', 'warning', '--backlog', '4096',
+        ]
+    else:
+        command = [
+            sys.executable, 'manage.py', 'runserver', '--noreload',
+            f'{HOST}:{port}',
+        ]
+    server = subprocess.Popen(
+        command, cwd=APP_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    wait_for_port(HOST, port)
+    return server
+
+
+def run(database, events, page_size, concurrency, duration, read_delay):
+    seed_events(events)
+    results = []
+    for name, kind, path in TARGETS:
+        port = free_port()
+        server = start_server(kind, port, database)
+        try:
+            url = f'{path}?page_size={page_size}'
+            load(HOST, port, url, concurrency=10, duration=1)
+            results.append({
+                'target': name,
+                'concurrency': concurrency,
+                **load(
+                    HOST, port, url,
+                    concurrency=concurrency,
+                    duration=duration,
+                    read_delay=read_delay,
+                ),
+            })
+        finally:
+            server.terminate()
+            server.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--read-delay', type=float, default=0)
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database() as connection:
+        connection.close()
+        results = run(
+            connection.settings_dict['NAME'],
+            args.events,
+            args.page_size,
+            args.concurrency,
+            args.duration,
+            args.read_delay,
+        )
+    report('asgi', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Benchmark the venue double-booking checks.
+
+Books a venue back to back with `--events` events, an hour each with
+half an hour free between them, then times checking an event that
+overlaps a booking and one that fits a free slot:
+
+- `scan` loads every booking of the venue and compares each in turn,
+- `tree` is the interval tree check of the api without the exclusion
+  constraint, which only loads the bookings of the days around the event,
+- `constraint` inserts the event with the exclusion constraint of core
+  migration 0012, where the database has `btree_gist` to create it.
+
+Writes are rolled back after each call so every sample sees the same
+bookings.
+"""
+
+import argparse
+import random
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from benchmarks.common import (
+    benchmark_database,
+    measure,
+    report,
+    setup,
+    summarize,
+)
+from benchmarks.data import FIRST_DATE
+
+VENUE = 'Main Hall'
+SLOTS_PER_DAY = 8
+BOOKING = timedelta(hours=1)
+GAP = timedelta(minutes=30)
+
+
+def slot_start(number):
+    """Return when the `number`th booking of the venue starts."""
+    day, slot = divmod(number, SLOTS_PER_DAY)
+    return datetime.combine(FIRST_DATE, time(8)) + timedelta(days=day) \
+        + slot * (BOOKING + GAP)
+
+
+def seed_bookings(count):
+    """Book the venue with `count` events and return their organizer."""
+    from django.contrib.auth import get_user_model
+    from core.db.copy import copy_rows
+    from core.models import Event
+
+    organizer = get_user_model().objects.create_user(
+        email='bench@example.com', password='bench123'
+    )
+    rows = (
+        (
+            organizer.pk, f'Booking {number}', VENUE, Decimal(1),
+            slot_start(number).date(), slot_start(number).time(), BOOKING,
+        )
+        for number in range(count)
+    )
+    copy_rows(Event, [
+        'organizer_id', 'title', 'venue', 'ticket_price', 'date', 'time',
+        'duration',
+    ], rows)
+    return organizer
+
+
+def candidates(organizer, count, free):
+    """Return events at random slots of the bookings, overlapping one
+    unless `free`, when they fit the gap after it."""
+    from core.models import Event
+
+    rng = random.Random(count)
+    events = []
+    for _ in range(count):
+        start = slot_start(rng.randrange(count))
+        if free:
+            start += BOOKING
+        events.append(Event(
+            organizer=organizer, title='Candidate', venue=VENUE,
+            ticket_price=Decimal(1), date=start.date(), time=start.time(),
+            duration=GAP if free else BOOKING,
+        ))
+    return events
+
+
+def scan(event):
+    """Compare the event with every booking of its venue."""
+    from core.models import Event
+    from event.bookings import booked_range
+
+    start, end = booked_range(event)
+    bookings = Event.objects.filter(
+        venue=event.venue, duration__isnull=False
+    ).values_list('date', 'time', 'duration')
+    for day, clock, duration in bookings:
+        other = datetime.combine(day, clock)
+        if other < end and start < other + duration:
+            return True
+    return False
+
+
+def check(event):
+    """Check the event with the interval tree, locking the venue."""
+    from django.db import transaction
+    from core.models import VenueBookedError
+    from event.bookings import check_bookings
+
+    with transaction.atomic():
+        try:
+            check_bookings([event])
+        except VenueBookedError:
+            pass
+        transaction.set_rollback(True)
+
+
+def insert(event):
+    """Insert the event, letting the exclusion constraint check it."""
+    from django.db import transaction
+    from core.models import VenueBookedError
+    from event.bookings import booking_conflicts
+
+    with transaction.atomic():
+        try:
+            with booking_conflicts():
+                event.pk = None
+                event.save()
+        except VenueBookedError:
+            pass
+        transaction.set_rollback(True)
+
+
+def timed(name, func, events, repeat):
+    """Time `func` over the events, one sample per event."""
+    events = iter(events)
+    samples = measure(lambda: func(next(events)), repeat=repeat)
+    return {'check': name, **summarize(samples)}
+
+
+def run(count, repeat):
+    from django.db import connection
+    from event.bookings import has_booking_constraint
+
+    organizer = seed_bookings(count)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE core_event')
+    constraint = has_booking_constraint(connection.alias)
+
+    results = []
+    for free in (False, True):
+        events = candidates(organizer, repeat + 2, free)
+        outcome = {'bookings': count, 'free': free}
+        results.append({
+            **outcome, **timed('scan', scan, events, repeat),
+        })
+        with patch('event.bookings.has_booking_constraint',
+                   return_value=False):
+            results.append({
+                **outcome, **timed('tree', check, events, repeat),
+            })
+        if constraint:
+            results.append({
+                **outcome, **timed('constraint', insert, events, repeat),
+            })
+    if not constraint:
+        results.append({
+            'check': 'constraint',
+            'skipped': 'the btree_gist extension is not available',
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        results = run(args.events, args.repeat)
+    report('bookings', results)
+
+
+if __name__ == '__main__':
+    main()
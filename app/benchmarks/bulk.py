@@ -0,0 +1,94 @@
+"""
+Benchmark importing events in bulk against one POST per event.
+
+Creates the same batch of events through `organized-events/` one
+request at a time and through `organized-events/bulk/` as a JSON array
+and as an NDJSON stream, and reports the time taken by each.
+"""
+
+import argparse
+import json
+
+from benchmarks.common import (
+    benchmark_database,
+    measure,
+    report,
+    setup,
+    summarize,
+)
+
+SIZES = [10, 100, 1000]
+
+
+def event_payloads(count):
+    return [
+        {
+            'title': f'Event {number}',
+            'venue': f'Venue {number % 100}',
+            'ticket_price': '12.50',
+            'date': '2024-01-01',
+            'time': f'{number % 24:02d}:00',
+        }
+        for number in range(count)
+    ]
+
+
+def run(repeat):
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from core.models import Event
+
+    organizer = get_user_model().objects.create_user(
+        email='bench@example.com', password='bench123'
+    )
+    client = APIClient()
+    client.force_authenticate(organizer)
+    events_url = reverse('event:event-list')
+    bulk_url = reverse('event:event-bulk')
+
+    def single(payloads):
+        for payload in payloads:
+            client.post(events_url, payload, format='json')
+
+    def bulk_json(payloads):
+        client.post(bulk_url, payloads, format='json')
+
+    def bulk_ndjson(payloads):
+        body = '\n'.join(json.dumps(payload) for payload in payloads)
+        client.post(bulk_url, body, content_type='application/x-ndjson')
+
+    results = []
+    for size in SIZES:
+        payloads = event_payloads(size)
+        result = {'events': size}
+        for name, func in [
+            ('single_posts', single),
+            ('bulk_json', bulk_json),
+            ('bulk_ndjson', bulk_ndjson),
+        ]:
+            result[name] = summarize(measure(
+                lambda: func(payloads), repeat=repeat, warmup=1
+            ))
+            Event.objects.all().delete()
+        result['speedup'] = (
+            result['single_posts']['mean_ms']
+            / result['bulk_json']['mean_ms']
+        )
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        results = run(args.repeat)
+    report('bulk', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Compare two saved benchmark reports.
+
+`python -m benchmarks.compare before.json after.json` prints, for every
+number both reports share, its value in each and the relative change.
+Entries of result lists are matched by their `scenario`, `events` or
+`page` key when they have one, by position otherwise.
+"""
+
+import argparse
+import json
+import sys
+
+IDENTITY_KEYS = ('scenario', 'events', 'page')
+
+
+def list_key(index, item):
+    if isinstance(item, dict):
+        for key in IDENTITY_KEYS:
+            if key in item:
+                return f'{key}={item[key]}'
+    return str(index)
+
+
+def flatten(value, prefix=''):
+    """Yield `(path, number)` for every number in a report."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten(item, f'{prefix}{key}.')
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from flatten(item, f'{prefix}{list_key(index, item)}.')
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix.rstrip('.'), value
+
+
+def compare(before, after):
+    """Return `(path, before, after, change)` rows for the numbers both
+    reports share; `change` is relative, None when `before` is 0."""
+    old = dict(flatten(before['results']))
+    rows = []
+    for path, new in flatten(after['results']):
+        if path not in old:
+            continue
+        change = (new - old[path]) / old[path] if old[path] else None
+        rows.append((path, old[path], new, change))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('before', type=argparse.FileType())
+    parser.add_argument('after', type=argparse.FileType())
+    args = parser.parse_args()
+
+    before, after = json.load(args.before), json.load(args.after)
+    if before['benchmark'] != after['benchmark']:
+        parser.error(f'{before["benchmark"]} and {after["benchmark"]} '
+                     'reports cannot be compared')
+
+    commits = [report.get('run', {}).get('commit') for report in
+               (before, after)]
+    sys.stdout.write(f'{before["benchmark"]}: {commits[0]} -> '
+                     f'{commits[1]}\n')
+    for path, old, new, change in compare(before, after):
+        change = f'{change:+.1%}' if change is not None else 'n/a'
+        sys.stdout.write(f'{path}: {old:.4g} -> {new:.4g} ({change})\n')
+
+
+if __name__ == '__main__':
+    main()
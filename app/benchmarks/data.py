@@ -0,0 +1,165 @@
+"""
+Generate a large data set for the benchmarks.
+
+Creates users, events spread over them as organizers, and enrollments,
+`chunk_size` rows per `bulk_create`, and reports the rows per second of
+each. Every user gets the same password hash, computed once, so millions
+of users are not bound by the password hasher; they all log in with
+`PASSWORD`.
+"""
+
+import argparse
+import time
+from datetime import date, timedelta, time as clock
+from decimal import Decimal
+
+from benchmarks.common import benchmark_database, report, setup
+
+PASSWORD = 'bench123'
+TITLE_WORDS = [
+    'Concert', 'Workshop', 'Meetup', 'Conference', 'Festival',
+    'Lecture', 'Webinar', 'Hackathon',
+]
+FIRST_DATE = date(2024, 1, 1)
+
+
+def user_email(number):
+    return f'user{number}@bench.example.com'
+
+
+def chunks(start, stop, chunk_size):
+    """Yield the `(first, stop)` bounds of the chunks of a range."""
+    for first in range(start, stop, chunk_size):
+        yield first, min(first + chunk_size, stop)
+
+
+def generate_users(count, chunk_size=5000, start=0):
+    """Insert `count` users numbered from `start` and return their ids."""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+
+    User = get_user_model()
+    password = make_password(PASSWORD)
+    ids = []
+    for first, stop in chunks(start, start + count, chunk_size):
+        users = User.objects.bulk_create(
+            User(
+                email=user_email(number),
+                name=f'User {number}',
+                password=password,
+            )
+            for number in range(first, stop)
+        )
+        ids.extend(user.pk for user in users)
+    return ids
+
+
+def generate_events(count, organizer_ids, seats_taken=0, chunk_size=5000,
+                    start=0):
+    """Insert `count` events numbered from `start`, organized in turn by
+    `organizer_ids`, and return their ids.
+
+    Titles, venues, prices and dates vary so the filters, the orderings
+    and the search have something to select on. Events hold at least
+    `seats_taken` attendees, so the seats of every enrollment fit.
+    """
+    from core.models import Event
+
+    capacity = max(
+        Event._meta.get_field('max_attendees').get_default(), seats_taken
+    )
+    ids = []
+    for first, stop in chunks(start, start + count, chunk_size):
+        events = Event.objects.bulk_create(
+            Event(
+                organizer_id=organizer_ids[number % len(organizer_ids)],
+                title=f'{TITLE_WORDS[number % len(TITLE_WORDS)]} {number}',
+                description=f'Event number {number} of the benchmark.',
+                venue=f'Venue {number % 500}',
+                ticket_price=Decimal(number % 50),
+                date=FIRST_DATE + timedelta(days=number % 730),
+                time=clock(number % 24),
+                max_attendees=capacity,
+                seats_taken=seats_taken,
+            )
+            for number in range(first, stop)
+        )
+        ids.extend(event.pk for event in events)
+    return ids
+
+
+def generate_enrollments(per_event, user_ids, event_ids, chunk_size=5000):
+    """Enroll `per_event` distinct users into every event."""
+    from core.models import Enrollment
+
+    total = len(event_ids) * per_event
+    for first, stop in chunks(0, total, chunk_size):
+        Enrollment.objects.bulk_create(
+            Enrollment(
+                event_id=event_ids[number // per_event],
+                user_id=user_ids[
+                    (number // per_event + number % per_event)
+                    % len(user_ids)
+                ],
+            )
+            for number in range(first, stop)
+        )
+    return total
+
+
+def generate(users, events, enrollments_per_event=0, chunk_size=5000):
+    """Generate the data set and return the rows per second of each
+    table."""
+    enrollments_per_event = min(enrollments_per_event, users)
+    timings = {}
+
+    start = time.perf_counter()
+    user_ids = generate_users(users, chunk_size)
+    timings['users'] = (len(user_ids), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    event_ids = generate_events(
+        events, user_ids, enrollments_per_event, chunk_size
+    )
+    timings['events'] = (len(event_ids), time.perf_counter() - start)
+
+    if enrollments_per_event:
+        start = time.perf_counter()
+        count = generate_enrollments(
+            enrollments_per_event, user_ids, event_ids, chunk_size
+        )
+        timings['enrollments'] = (count, time.perf_counter() - start)
+
+    return {
+        table: {
+            'rows': rows,
+            'seconds': seconds,
+            'rows_per_second': rows / seconds if seconds else None,
+        }
+        for table, (rows, seconds) in timings.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--events', type=int, default=1000000)
+    parser.add_argument('--enrollments-per-event', type=int, default=5)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument(
+        '--keepdb', action='store_true',
+        help='Keep the test database, with the data, for later runs.',
+    )
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database(keepdb=args.keepdb):
+        results = generate(
+            args.users, args.events, args.enrollments_per_event,
+            args.chunk_size,
+        )
+    report('data', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark the memory used by the streaming event export.
+
+Seeds increasing numbers of events and consumes `/api/event/export/`
+in both formats, sampling the resident set size of the process while
+the body streams; the growth should stay flat as the table grows. For
+comparison the all-events listing, which is built in memory, is
+measured as well up to `--listing-max` rows.
+"""
+
+import argparse
+import threading
+import time
+
+from benchmarks.common import benchmark_database, report, setup
+from benchmarks.pagination import seed_events
+
+SIZES = [10000, 100000, 1000000]
+
+
+def current_rss():
+    """Return the resident set size of the process in bytes."""
+    import resource
+    with open('/proc/self/statm') as statm:
+        pages = int(statm.read().split()[1])
+    return pages * resource.getpagesize()
+
+
+def peak_rss_growth(func, interval=0.01):
+    """Call `func` and return its duration and how far the RSS grew."""
+    baseline = current_rss()
+    peak = baseline
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, current_rss())
+            time.sleep(interval)
+
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        func()
+    finally:
+        elapsed = time.perf_counter() - start
+        done.set()
+        sampler.join()
+    peak = max(peak, current_rss())
+    return elapsed, peak - baseline
+
+
+def consume(response):
+    size = 0
+    for chunk in response.streaming_content:
+        size += len(chunk)
+    return size
+
+
+def run(listing_max):
+    import gc
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from event.cache import get_listing_cache
+
+    client = APIClient()
+    export_url = reverse('event:export-events')
+    listing_url = reverse('event:all-events')
+    results = []
+    seeded = 0
+    for size in SIZES:
+        seed_events(size - seeded, start=seeded)
+        seeded = size
+        result = {'events': seeded}
+        for format in ('ndjson', 'csv'):
+            gc.collect()
+            elapsed, growth = peak_rss_growth(
+                lambda: consume(client.get(export_url, {'format': format}))
+            )
+            result[f'export_{format}'] = {
+                'seconds': elapsed,
+                'rows_per_second': seeded / elapsed,
+                'rss_growth_mb': growth / 2 ** 20,
+            }
+        if seeded <= listing_max:
+            get_listing_cache().clear()
+            gc.collect()
+            elapsed, growth = peak_rss_growth(
+                lambda: client.get(listing_url)
+            )
+            result['all_events_listing'] = {
+                'seconds': elapsed,
+                'rss_growth_mb': growth / 2 ** 20,
+            }
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--listing-max', type=int, default=100000)
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        results = run(args.listing_max)
+    report('export', results)
+
+
+if __name__ == '__main__':
+    main()
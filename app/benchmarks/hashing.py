@@ -0,0 +1,150 @@
+"""
+Benchmark logins per second per core for each password hashing policy.
+
+For every policy, hashes the passwords of `--concurrency` users with it
+and times checking a password on one thread, then has the users log in
+through `user/token/` from as many threads for `--duration` seconds,
+with the login throttles turned off. Policies whose library is not
+installed are reported as unavailable.
+"""
+
+import argparse
+import os
+import threading
+import time
+from importlib.util import find_spec
+
+from benchmarks.common import (
+    benchmark_database,
+    measure,
+    report,
+    setup,
+    summarize,
+)
+from benchmarks.load import NO_LOGIN_THROTTLES, Recorder, login
+
+POLICIES = {
+    'pbkdf2': ('pbkdf2', {}, None),
+    'pbkdf2_100k': ('pbkdf2', {'pbkdf2_iterations': 100000}, None),
+    'argon2': ('argon2', {}, 'argon2'),
+    'bcrypt': ('bcrypt', {}, 'bcrypt'),
+}
+
+
+def policy_settings(hasher, options):
+    from django.conf import settings
+
+    preferred = settings.PASSWORD_HASHER_CLASSES[hasher]
+    return {
+        'PASSWORD_HASHERS': [preferred] + [
+            path for path in settings.PASSWORD_HASHER_CLASSES.values()
+            if path != preferred
+        ],
+        'PASSWORD_HASHER_OPTIONS': dict(
+            settings.PASSWORD_HASHER_OPTIONS, **options
+        ),
+    }
+
+
+def logins(emails, duration):
+    from django.db import connections
+    from rest_framework.test import APIClient
+
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+
+    def worker(email):
+        client = APIClient()
+        try:
+            while time.monotonic() < deadline and not recorder.failed:
+                login(client, recorder, email)
+        except Exception as failure:
+            recorder.fail(failure)
+        finally:
+            connections.close_all()
+
+    threads = [
+        threading.Thread(target=worker, args=(email,)) for email in emails
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.check()
+    return recorder, time.perf_counter() - start
+
+
+def run_policy(hasher, options, concurrency, duration, repeat):
+    from django.contrib.auth import get_user_model
+    from django.test import override_settings
+    from core import hashing
+    from benchmarks.data import PASSWORD
+
+    cores = os.cpu_count() or 1
+    with override_settings(LOGIN_THROTTLE_RATES=NO_LOGIN_THROTTLES,
+                           **policy_settings(hasher, options)):
+        encoded = hashing.make_password(PASSWORD)
+        check = summarize(measure(
+            lambda: hashing.verify_password(PASSWORD, encoded),
+            repeat=repeat, warmup=1,
+        ))
+        User = get_user_model()
+        User.objects.all().delete()
+        emails = [f'login{number}@bench.example.com'
+                  for number in range(concurrency)]
+        User.objects.bulk_create(
+            User(email=email, password=encoded) for email in emails
+        )
+        recorder, elapsed = logins(emails, duration)
+
+    latencies = recorder.latencies['token']
+    per_second = len(latencies) / elapsed
+    result = {
+        'hash': encoded.rsplit('$', 2)[0],
+        'check_password': dict(check, per_second_per_core=(
+            1000 / check['mean_ms']
+        )),
+        'logins': len(latencies),
+        'logins_per_second': per_second,
+        'logins_per_second_per_core': per_second / cores,
+    }
+    if latencies:
+        result['latency'] = summarize(latencies)
+    return result
+
+
+def run(policies, concurrency, duration, repeat):
+    results = {'cores': os.cpu_count(), 'concurrency': concurrency}
+    for name in policies:
+        hasher, options, library = POLICIES[name]
+        if library and find_spec(library) is None:
+            results[name] = {'unavailable': f'{library} is not installed'}
+            continue
+        results[name] = run_policy(
+            hasher, options, concurrency, duration, repeat
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--policy', action='append', choices=POLICIES,
+                        help='Policy to run, repeatable; default all.')
+    parser.add_argument('--concurrency', type=int,
+                        default=os.cpu_count() or 1)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        results = run(
+            args.policy or list(POLICIES), args.concurrency, args.duration,
+            args.repeat,
+        )
+    report('hashing', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Minimal asyncio HTTP load generator used by the server benchmarks.
+"""
+
+import asyncio
+import socket
+import time
+
+from benchmarks.common import summarize
+
+
+async def fetch(host, port, path, headers, read_delay):
+    """Send one GET on a fresh connection and return its status."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        request = (
+            f'GET {path} HTTP/1.1\r\nHost: {host}\r\n'
+            f'Connection: close\r\n{headers}\r\n'
+        )
+        writer.write(request.encode())
+        await writer.drain()
+        if read_delay:
+            # A slow client that leaves the response unread for a while.
+            await asyncio.sleep(read_delay)
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response.split(b' ', 2)[1])
+
+
+async def worker(host, port, path, headers, read_delay, deadline, results):
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            status = await fetch(host, port, path, headers, read_delay)
+        except (OSError, IndexError, ValueError):
+            status = None
+        elapsed = time.perf_counter() - start
+        if status == 200:
+            results['latencies'].append(elapsed)
+        else:
+            results['errors'] += 1
+
+
+async def run_load(host, port, path, concurrency, duration, headers='',
+                   read_delay=0):
+    results = {'latencies': [], 'errors': 0}
+    deadline = time.monotonic() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        worker(host, port, path, headers, read_delay, deadline, results)
+        for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def load(host, port, path, concurrency=100, duration=10, headers=None,
+         read_delay=0):
+    """Hammer `path` from `concurrency` connections for `duration`
+    seconds and summarize throughput and latency of the successful
+    requests."""
+    header_lines = ''.join(
+        f'{name}: {value}\r\n' for name, value in (headers or {}).items()
+    )
+    results, elapsed = asyncio.run(run_load(
+        host, port, path, concurrency, duration, header_lines, read_delay
+    ))
+    latencies = results['latencies']
+    summary = {
+        'requests': len(latencies),
+        'errors': results['errors'],
+        'requests_per_second': len(latencies) / elapsed,
+    }
+    if latencies:
+        summary['latency'] = summarize(latencies)
+    return summary
+
+
+def wait_for_port(host, port, timeout=30):
+    """Wait until a server accepts connections on the port."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Nothing is listening on {host}:{port}')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
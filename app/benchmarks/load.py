@@ -0,0 +1,214 @@
+"""
+In-process load generator for the api.
+
+Drives the real URLconf through the test client, without a server or
+sockets, from `--concurrency` threads. Each scenario is what one client
+does in a loop:
+
+- `token`: logs in for a token.
+- `crud`: creates, reads, updates and deletes one of its events.
+- `listing`: reads the all-events, upcoming and search listings.
+
+Throughput and latency percentiles, per scenario and per request, are
+printed as JSON. Save runs with `--output` and compare two of them, for
+example from two commits, with `benchmarks.compare`. The login throttles
+are turned off, and a run fails on the first request not answered as
+expected, rather than report the speed of the errors.
+"""
+
+import argparse
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from benchmarks.common import benchmark_database, report, setup, summarize
+from benchmarks.data import PASSWORD, generate, user_email
+
+SCENARIOS = ['token', 'crud', 'listing']
+NO_LOGIN_THROTTLES = {'login-ip': None, 'login-email': None}
+
+
+class RequestFailed(Exception):
+    """Raised when a request is not answered with the expected status."""
+
+
+class Recorder:
+    """Collects the latencies of the requests by name, and the first
+    failure of the run."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.failure = None
+        self._lock = threading.Lock()
+
+    @property
+    def failed(self):
+        return self.failure is not None
+
+    def request(self, name, send, expected=200):
+        start = time.perf_counter()
+        response = send()
+        elapsed = time.perf_counter() - start
+        if response.status_code != expected:
+            raise RequestFailed(
+                f'{name} answered {response.status_code} instead of '
+                f'{expected}: {response.content[:200]!r}'
+            )
+        with self._lock:
+            self.latencies[name].append(elapsed)
+        return response
+
+    def fail(self, failure):
+        """Keep the first failure, which stops the workers."""
+        with self._lock:
+            if self.failure is None:
+                self.failure = failure
+
+    def check(self):
+        """Raise the first failure of the run, if there was one."""
+        if self.failure is not None:
+            raise self.failure
+
+
+def login(client, recorder, email):
+    from django.urls import reverse
+
+    res = recorder.request('token', lambda: client.post(
+        reverse('user:token'), {'email': email, 'password': PASSWORD},
+        format='json',
+    ))
+    return res.data['token']
+
+
+def token_scenario(client, recorder, email, number):
+    login(client, recorder, email)
+
+
+def crud_scenario(client, recorder, email, number):
+    from django.urls import reverse
+
+    res = recorder.request('event_create', lambda: client.post(
+        reverse('event:event-list'), {
+            'title': f'Load {number}',
+            'venue': 'Online',
+            'ticket_price': '10.00',
+            'date': '2099-12-22',
+            'time': '13:00',
+        }, format='json',
+    ), expected=201)
+    url = reverse('event:event-detail', args=[res.data['id']])
+    recorder.request('event_retrieve', lambda: client.get(url))
+    recorder.request('event_update', lambda: client.patch(
+        url, {'title': f'Load {number} updated'}, format='json'
+    ))
+    recorder.request('event_delete', lambda: client.delete(url),
+                     expected=204)
+
+
+def listing_scenario(client, recorder, email, number):
+    from django.urls import reverse
+
+    recorder.request('all_events', lambda: client.get(
+        reverse('event:all-events'), {'page_size': 20}
+    ))
+    recorder.request('upcoming_events', lambda: client.get(
+        reverse('event:upcoming-events'), {'page_size': 20}
+    ))
+    recorder.request('search_events', lambda: client.get(
+        reverse('event:search-events'), {'q': 'concert'}
+    ))
+
+
+SCENARIO_FUNCTIONS = {
+    'token': token_scenario,
+    'crud': crud_scenario,
+    'listing': listing_scenario,
+}
+
+
+def worker(scenario, email, deadline, recorder):
+    from django.db import connections
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    try:
+        token = login(client, Recorder(), email)
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+        number = 0
+        while time.monotonic() < deadline and not recorder.failed:
+            scenario(client, recorder, email, number)
+            number += 1
+    except Exception as failure:
+        recorder.fail(failure)
+    finally:
+        connections.close_all()
+
+
+def run_scenario(name, concurrency, duration):
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=worker, args=(
+            SCENARIO_FUNCTIONS[name], user_email(number), deadline, recorder,
+        ))
+        for number in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    recorder.check()
+
+    requests = sum(len(samples) for samples in recorder.latencies.values())
+    return {
+        'scenario': name,
+        'concurrency': concurrency,
+        'seconds': elapsed,
+        'requests': requests,
+        'requests_per_second': requests / elapsed,
+        'latency': {
+            request: summarize(samples)
+            for request, samples in sorted(recorder.latencies.items())
+        },
+    }
+
+
+def run(scenarios, concurrency, duration, users, events):
+    from django.test import override_settings
+
+    generate(max(users, concurrency), events)
+    with override_settings(LOGIN_THROTTLE_RATES=NO_LOGIN_THROTTLES):
+        return [
+            run_scenario(name, concurrency, duration) for name in scenarios
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='Scenario to run, repeatable; default all.')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--events', type=int, default=100000)
+    parser.add_argument('--output', type=argparse.FileType('w'),
+                        default=sys.stdout)
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        results = run(
+            args.scenario or SCENARIOS, args.concurrency, args.duration,
+            args.users, args.events,
+        )
+    report('load', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Micro-benchmarks for the serializers and querysets behind the api.
+
+Times serializing one object and a page of objects with the user,
+event and enrollment serializers, and runs the querysets of the
+listings, filters, search and enrollments on a data set generated by
+`benchmarks.data`.
+"""
+
+import argparse
+
+from benchmarks.common import (
+    benchmark_database,
+    measure,
+    report,
+    setup,
+    summarize,
+)
+from benchmarks.data import generate
+
+PAGE_SIZE = 20
+
+
+def serializer_cases():
+    from django.contrib.auth import get_user_model
+    from core.models import Enrollment, Event
+    from enrollment.serializers import EnrollmentSerializer
+    from event.serializers import EventDetailSerializer, EventSerializer
+    from user.serializers import UserSerializer
+
+    user = get_user_model().objects.order_by('id').first()
+    events = list(Event.objects.order_by('-id')[:PAGE_SIZE])
+    enrollments = list(Enrollment.objects.order_by('-id')[:PAGE_SIZE])
+    payload = {
+        'title': 'Concert',
+        'venue': 'Online',
+        'ticket_price': '12.50',
+        'date': '2024-01-01',
+        'time': '13:00',
+    }
+    return {
+        'user': lambda: UserSerializer(user).data,
+        'event': lambda: EventSerializer(events[0]).data,
+        'event_detail': lambda: EventDetailSerializer(events[0]).data,
+        'event_page': lambda: EventSerializer(events, many=True).data,
+        'event_validate': lambda: EventSerializer(data=payload).is_valid(),
+        'enrollment_page': lambda: EnrollmentSerializer(
+            enrollments, many=True
+        ).data,
+    }
+
+
+def queryset_cases():
+    from django.contrib.auth import get_user_model
+    from core.models import Enrollment, Event
+    from event.filters import upcoming_q
+    from event.search import search_events
+
+    user = get_user_model().objects.order_by('id').first()
+    event = Event.objects.order_by('id').first()
+    return {
+        'event_page': lambda: list(Event.objects.order_by('-id')[:PAGE_SIZE]),
+        'event_get': lambda: Event.objects.get(pk=event.pk),
+        'event_count': lambda: Event.objects.count(),
+        'organizer_page': lambda: list(
+            Event.objects.filter(organizer=user).order_by('-id')[:PAGE_SIZE]
+        ),
+        'venue_page': lambda: list(
+            Event.objects.filter(venue='Venue 7')
+            .order_by('date', 'time')[:PAGE_SIZE]
+        ),
+        'upcoming_page': lambda: list(
+            Event.objects.filter(upcoming_q())
+            .order_by('date', 'time', 'id')[:PAGE_SIZE]
+        ),
+        'search_page': lambda: list(
+            search_events(Event.objects.all(), 'concert')[:PAGE_SIZE]
+        ),
+        'user_enrollments': lambda: list(
+            Enrollment.objects.filter(user=user).select_related('event')
+            .order_by('-id')[:PAGE_SIZE]
+        ),
+    }
+
+
+def run(users, events, repeat):
+    generate(users, events, enrollments_per_event=5)
+    return {
+        'serializers': {
+            name: summarize(measure(func, repeat=repeat))
+            for name, func in serializer_cases().items()
+        },
+        'querysets': {
+            name: summarize(measure(func, repeat=repeat))
+            for name, func in queryset_cases().items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--events', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        results = run(args.users, args.events, args.repeat)
+    report('micro', results)
+
+
+if __name__ == '__main__':
+    main()
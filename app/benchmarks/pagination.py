@@ -0,0 +1,133 @@
+"""
+Benchmark listing latency at increasing page depths.
+
+Times `/api/event/all-events/` end to end, with the listing cache
+cleared before every request (`api`) and served from it (`api_cached`),
+and compares the keyset page query with an OFFSET based page query on
+the same data; keyset latency should stay flat from the first page to
+the last.
+"""
+
+import argparse
+from datetime import date, time
+from decimal import Decimal
+
+from benchmarks.common import (
+    benchmark_database,
+    measure,
+    report,
+    setup,
+    summarize,
+)
+
+DEPTHS = [1, 10, 100, 1000, 10000]
+
+
+def seed_events(count, chunk_size=5000, start=0):
+    """Insert `count` events numbered from `start` for a single
+    organizer."""
+    from django.contrib.auth import get_user_model
+    from core.models import Event
+
+    User = get_user_model()
+    organizer = User.objects.filter(email='bench@example.com').first() \
+        or User.objects.create_user(
+            email='bench@example.com', password='bench123'
+        )
+    stop = start + count
+    for first in range(start, stop, chunk_size):
+        Event.objects.bulk_create(
+            Event(
+                organizer=organizer,
+                title=f'Event {number}',
+                venue=f'Venue {number % 100}',
+                ticket_price=Decimal('12.50'),
+                date=date(2024, 1, 1),
+                time=time(number % 24),
+            )
+            for number in range(first, min(first + chunk_size, stop))
+        )
+
+
+def cursor_for_depth(depth, page_size):
+    """Return the cursor that addresses page `depth` of the listing."""
+    from core.models import Event
+    from event.pagination import EventKeysetPagination
+
+    if depth == 1:
+        return None
+    last = Event.objects.order_by('-id')[(depth - 1) * page_size - 1]
+    paginator = EventKeysetPagination()
+    paginator.fields = ['id']
+    return paginator.encode_cursor(last)
+
+
+def uncached_get(client, url, params):
+    """Request the listing with the listing cache cleared first, so the
+    page is queried and serialized."""
+    from event.cache import get_listing_cache
+
+    get_listing_cache().clear()
+    return client.get(url, params)
+
+
+def run(events, page_size, repeat):
+    from django.urls import reverse
+    from rest_framework.request import Request
+    from rest_framework.test import APIClient, APIRequestFactory
+    from core.models import Event
+    from event.pagination import EventKeysetPagination
+
+    seed_events(events)
+    client = APIClient()
+    factory = APIRequestFactory()
+    url = reverse('event:all-events')
+    results = []
+    for depth in DEPTHS:
+        if (depth - 1) * page_size >= events:
+            break
+        params = {'page_size': page_size}
+        cursor = cursor_for_depth(depth, page_size)
+        if cursor:
+            params['cursor'] = cursor
+        offset = (depth - 1) * page_size
+        request = Request(factory.get(url, params))
+        results.append({
+            'page': depth,
+            'api': summarize(measure(
+                lambda: uncached_get(client, url, params), repeat=repeat
+            )),
+            'api_cached': summarize(measure(
+                lambda: client.get(url, params), repeat=repeat
+            )),
+            'keyset_query': summarize(measure(
+                lambda: EventKeysetPagination().paginate_queryset(
+                    Event.objects.all(), request
+                ),
+                repeat=repeat,
+            )),
+            'offset_query': summarize(measure(
+                lambda: list(
+                    Event.objects.order_by('-id')[offset:offset + page_size]
+                ),
+                repeat=repeat,
+            )),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        results = run(args.events, args.page_size, args.repeat)
+    report('pagination', results)
+
+
+if __name__ == '__main__':
+    main()
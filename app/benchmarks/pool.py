@@ -0,0 +1,135 @@
+"""
+Benchmark pooled connections against connecting per request.
+
+Each simulated request goes through the same connection handling as a
+real one: `request_started`, a small query, `request_finished`. With
+`POOL` set to None the backend connects and disconnects every time, like
+the stock backend; with the pool it reuses connections. The burst runs
+more threads than the pool has connections and reports how long they
+waited and the most connections PostgreSQL saw open.
+"""
+
+import argparse
+import threading
+import time
+
+from benchmarks.common import (
+    benchmark_database, measure, report, setup, summarize,
+)
+
+
+def simulate_request():
+    from django.core.signals import request_finished, request_started
+    from django.db import connection
+
+    request_started.send(sender=None)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM core_event')
+    finally:
+        request_finished.send(sender=None)
+
+
+def backend_count():
+    """Return how many connections the database has open."""
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT count(*) FROM pg_stat_activity WHERE datname = %s',
+            [connection.settings_dict['NAME']],
+        )
+        return cursor.fetchone()[0]
+
+
+def burst(threads, requests):
+    """Run `requests` requests from each of `threads` threads, return the
+    elapsed time, the failures and the peak of open connections."""
+    from django.db import connection
+
+    barrier = threading.Barrier(threads + 1)
+    failures = []
+    done = threading.Event()
+    peak = [0]
+
+    def run():
+        try:
+            barrier.wait()
+            for _ in range(requests):
+                try:
+                    simulate_request()
+                except Exception as error:
+                    failures.append(type(error).__name__)
+        finally:
+            connection.close()
+
+    def sample():
+        while not done.is_set():
+            peak[0] = max(peak[0], backend_count())
+            connection.close()
+            time.sleep(0.01)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    sampler = threading.Thread(target=sample)
+    for worker in workers:
+        worker.start()
+    sampler.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+    return elapsed, failures, peak[0]
+
+
+def run(repeat, threads, requests, max_size):
+    from django.db import connection
+    from core.db.pool import close_pools
+
+    modes = {
+        'connect_per_request': None,
+        'pooled': {'MAX_SIZE': max_size, 'WAIT_TIMEOUT': 30},
+    }
+    results = []
+    for mode, pool in modes.items():
+        close_pools()
+        connection.settings_dict['POOL'] = pool
+        samples = measure(simulate_request, repeat=repeat)
+        elapsed, failures, peak = burst(threads, requests)
+        result = {
+            'mode': mode,
+            'request': summarize(samples),
+            'burst': {
+                'threads': threads,
+                'requests': threads * requests,
+                'seconds': elapsed,
+                'requests_per_second': threads * requests / elapsed,
+                'failures': len(failures),
+                'peak_connections': peak,
+            },
+        }
+        if connection.get_pool() is not None:
+            result['pool'] = connection.get_pool().stats()
+        results.append(result)
+    close_pools()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--max-size', type=int, default=10)
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        results = run(args.repeat, args.threads, args.requests, args.max_size)
+    report('pool', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark rendering and parsing event payloads as JSON.
+
+Renders a listing of `--events` serialized events with DRF's stdlib
+`JSONRenderer` and with `FastJSONRenderer`, then parses the result with
+`JSONParser` and `FastJSONParser`. No database is needed.
+"""
+
+import argparse
+import io
+from datetime import date, time
+from decimal import Decimal
+
+from benchmarks.common import measure, report, setup, summarize
+
+
+def event_payload(count):
+    """Return `count` events as the event serializer outputs them."""
+    from event.fast import ValuesSerializer
+    from event.serializers import EventSerializer
+
+    rows = [
+        {
+            'id': number,
+            'title': f'Event {number} – Café',
+            'organizer': number % 50,
+            'venue': f'Venue {number % 100}',
+            'ticket_price': Decimal(number % 10000).scaleb(-2),
+            'date': date(2024, 1 + number % 12, 1 + number % 28),
+            'time': time(number % 24, number % 60),
+            'max_attendees': 10,
+        }
+        for number in range(count)
+    ]
+    return ValuesSerializer(EventSerializer).serialize(rows)
+
+
+def run(events, repeat):
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from core.parsers import FastJSONParser
+    from core.renderers import FastJSONRenderer
+
+    data = event_payload(events)
+    body = JSONRenderer().render(data)
+    assert FastJSONRenderer().render(data) == body
+
+    def parse(parser):
+        return parser.parse(
+            io.BytesIO(body), parser_context={'encoding': 'utf-8'}
+        )
+
+    results = {'events': events, 'bytes': len(body)}
+    for name, func in [
+        ('render_stdlib', lambda: JSONRenderer().render(data)),
+        ('render_fast', lambda: FastJSONRenderer().render(data)),
+        ('parse_stdlib', lambda: parse(JSONParser())),
+        ('parse_fast', lambda: parse(FastJSONParser())),
+    ]:
+        results[name] = summarize(measure(func, repeat=repeat))
+    results['render_speedup'] = (
+        results['render_stdlib']['mean_ms'] / results['render_fast']['mean_ms']
+    )
+    results['parse_speedup'] = (
+        results['parse_stdlib']['mean_ms'] / results['parse_fast']['mean_ms']
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    report('renderers', run(args.events, args.repeat))
+
+
+if __name__ == '__main__':
+    main()
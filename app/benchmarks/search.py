@@ -0,0 +1,91 @@
+"""
+Benchmark the event search at increasing table sizes.
+"""
+
+import argparse
+import random
+from datetime import date, time
+from decimal import Decimal
+
+from benchmarks.common import (
+    benchmark_database,
+    measure,
+    report,
+    setup,
+    summarize,
+)
+
+WORDS = [
+    'jazz', 'rock', 'python', 'django', 'yoga', 'running', 'chess',
+    'poker', 'brunch', 'gallery', 'cinema', 'lecture', 'startup',
+    'workshop', 'festival', 'market', 'concert', 'theatre', 'comedy',
+    'hackathon', 'meetup', 'wine', 'coffee', 'design', 'photography',
+]
+# Filler words give the themed words a realistic selectivity; with the
+# themed words alone every query would match a large share of the table.
+VOCABULARY = WORDS + [f'topic{number}' for number in range(5000)]
+QUERIES = ['jazz', 'pyth', 'running festival', 'wine tasting', 'hack']
+
+
+def sentence(rng, length):
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(length))
+
+
+def seed_events(count, chunk_size=5000, seed=0):
+    """Insert `count` events with random titles and descriptions."""
+    from django.contrib.auth import get_user_model
+    from core.models import Event
+
+    rng = random.Random(seed)
+    organizer = get_user_model().objects.create_user(
+        email='bench@example.com', password='bench123'
+    )
+    for start in range(0, count, chunk_size):
+        Event.objects.bulk_create(
+            Event(
+                organizer=organizer,
+                title=sentence(rng, 3),
+                description=sentence(rng, 12),
+                venue=f'Venue {number % 100}',
+                ticket_price=Decimal('12.50'),
+                date=date(2024, 1, 1),
+                time=time(number % 24),
+            )
+            for number in range(start, min(start + chunk_size, count))
+        )
+
+
+def run(events, page_size, repeat):
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    seed_events(events)
+    client = APIClient()
+    url = reverse('event:search-events')
+    return [
+        {
+            'query': text,
+            'first_page': summarize(measure(
+                lambda: client.get(url, {'q': text, 'page_size': page_size}),
+                repeat=repeat,
+            )),
+        }
+        for text in QUERIES
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=1000000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        results = run(args.events, args.page_size, args.repeat)
+    report('search', {'events': args.events, 'queries': results})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark serializing event listings on the slow and the fast path.
+
+Compares rows per second of `EventSerializer(many=True)` on model
+instances with `ValuesSerializer` on `.values()` rows, both with the
+rows already fetched and end to end including the query.
+"""
+
+import argparse
+
+from benchmarks.common import (
+    benchmark_database,
+    measure,
+    report,
+    setup,
+    summarize,
+)
+from benchmarks.pagination import seed_events
+
+SIZES = [100, 1000, 10000]
+
+
+def rows_per_second(samples, rows):
+    return rows / (sum(samples) / len(samples))
+
+
+def run(repeat):
+    from core.models import Event
+    from event.fast import ValuesSerializer
+    from event.serializers import EventSerializer
+
+    fast = ValuesSerializer(EventSerializer)
+    results = []
+    seeded = 0
+    for size in SIZES:
+        seed_events(size - seeded, start=seeded)
+        seeded = size
+        events = list(Event.objects.order_by('id'))
+        values = list(Event.objects.order_by('id').values(*fast.sources))
+        cases = {
+            'serializer': lambda: EventSerializer(events, many=True).data,
+            'values_serializer': lambda: fast.serialize(values),
+            'serializer_with_query': lambda: EventSerializer(
+                Event.objects.order_by('id'), many=True
+            ).data,
+            'values_serializer_with_query': lambda: fast.serialize(
+                Event.objects.order_by('id').values(*fast.sources)
+            ),
+        }
+        result = {'events': size}
+        for name, func in cases.items():
+            samples = measure(func, repeat=repeat)
+            result[name] = dict(
+                summarize(samples),
+                rows_per_second=rows_per_second(samples, size),
+            )
+        result['speedup'] = (
+            result['values_serializer']['rows_per_second']
+            / result['serializer']['rows_per_second']
+        )
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        results = run(args.repeat)
+    report('serialization', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark the overhead of the login throttles.
+
+Times the IP and email throttles of `user/token/` deciding on attempts
+spread over growing numbers of distinct keys, on the in-process
+`throttle` cache, next to DRF's `SimpleRateThrottle`, which keeps a
+list of timestamps per key. Also reports how many entries the cache
+holds afterwards: a counter per active key and window, capped by its
+size.
+"""
+
+import argparse
+import itertools
+
+from benchmarks.common import measure, report, setup, summarize
+
+KEYS = [1, 1000, 100000]
+
+
+def run(repeat, calls):
+    from django.test import override_settings
+    from rest_framework.parsers import JSONParser
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from rest_framework.throttling import SimpleRateThrottle
+    from core.cache import get_cache
+    from user.throttling import LoginEmailRateThrottle, LoginRateThrottle
+
+    class ListThrottle(SimpleRateThrottle):
+        rate = '1000000/min'
+
+        def get_cache_key(self, request, view):
+            return self.cache_format % {
+                'scope': 'list', 'ident': self.get_ident(request),
+            }
+
+    throttles = {
+        'login_ip': LoginRateThrottle,
+        'login_email': LoginEmailRateThrottle,
+        'drf_simple': ListThrottle,
+    }
+    factory = APIRequestFactory()
+    rates = {'login-ip': '1000000/min', 'login-email': '1000000/min'}
+    results = []
+    with override_settings(LOGIN_THROTTLE_RATES=rates):
+        cache = get_cache('throttle')
+        for keys in KEYS:
+            requests = []
+            for number in range(keys):
+                request = Request(factory.post(
+                    '/', {'email': f'user{number}@example.com'},
+                    format='json', REMOTE_ADDR=f'10.{number >> 16 & 255}.'
+                    f'{number >> 8 & 255}.{number & 255}',
+                ), parsers=[JSONParser()])
+                request.data
+                requests.append(request)
+            result = {'keys': keys}
+            for name, throttle_class in throttles.items():
+                cache.clear()
+                cycle = itertools.cycle(requests)
+
+                def check():
+                    for _ in range(calls):
+                        throttle_class().allow_request(next(cycle), None)
+
+                samples = measure(check, repeat=repeat, warmup=1)
+                result[name] = dict(
+                    summarize(samples),
+                    microseconds_per_check=(
+                        sum(samples) / len(samples) / calls * 1e6
+                    ),
+                )
+                if name.startswith('login'):
+                    result[name]['cache_entries'] = len(cache)
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--calls', type=int, default=10000,
+                        help='Throttle checks per sample.')
+    args = parser.parse_args()
+
+    setup()
+    results = run(args.repeat, args.calls)
+    report('throttling', results)
+
+
+if __name__ == '__main__':
+    main()
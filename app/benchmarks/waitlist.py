@@ -0,0 +1,115 @@
+"""
+Benchmark waitlist promotions under concurrent cancellations.
+
+Fills an event, queues as many users on its waitlist, then cancels every
+enrollment from a pool of threads; each cancellation hands its seat to
+the head of the waitlist. Reports promotions per second for increasing
+numbers of threads, which should scale since promotions skip the heads
+locked by other cancellations instead of waiting on them.
+"""
+
+import argparse
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+
+from benchmarks.common import benchmark_database, report, setup
+
+WORKERS = [1, 2, 4, 8, 16]
+
+
+def seed_event(seats, run):
+    """Create a full event with `seats` users waiting for a seat."""
+    from django.contrib.auth import get_user_model
+    from core.models import Enrollment, Event, WaitlistEntry
+
+    User = get_user_model()
+    organizer = User.objects.create_user(
+        email=f'bench-{run}@example.com', password='bench123'
+    )
+    event = Event.objects.create(
+        organizer=organizer,
+        title=f'Event {run}',
+        venue='Online',
+        ticket_price=Decimal('12.50'),
+        date=date(2024, 1, 1),
+        time='13:00',
+        max_attendees=seats,
+    )
+    users = User.objects.bulk_create(
+        User(email=f'bench-{run}-{number}@example.com')
+        for number in range(seats * 2)
+    )
+    Enrollment.objects.bulk_create(
+        Enrollment(user=user, event=event) for user in users[:seats]
+    )
+    WaitlistEntry.objects.bulk_create(
+        WaitlistEntry(user=user, event=event, ticket=ticket)
+        for ticket, user in enumerate(users[seats:], start=1)
+    )
+    Event.objects.filter(pk=event.pk).update(
+        seats_taken=seats, waitlist_tail=seats
+    )
+    return event
+
+
+def cancel_all(enrollments, workers):
+    """Cancel the enrollments from `workers` threads, return the time."""
+    from django.db import connection
+    from core.models import Enrollment
+
+    barrier = threading.Barrier(workers + 1)
+
+    def run(chunk):
+        try:
+            barrier.wait()
+            for enrollment in chunk:
+                Enrollment.objects.cancel(enrollment)
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=run, args=(enrollments[index::workers],))
+        for index in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def run(seats):
+    from core.models import Enrollment, WaitlistEntry
+
+    results = []
+    for workers in WORKERS:
+        event = seed_event(seats, workers)
+        enrollments = list(Enrollment.objects.filter(event=event))
+        elapsed = cancel_all(enrollments, workers)
+        promoted = seats - WaitlistEntry.objects.filter(event=event).count()
+        results.append({
+            'workers': workers,
+            'promoted': promoted,
+            'seconds': elapsed,
+            'promotions_per_second': promoted / elapsed,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seats', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+    with benchmark_database():
+        results = run(args.seats)
+    report('waitlist', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,3 +7,5 @@ from core import models
 
 admin.site.register(models.User)
 admin.site.register(models.Event)
+admin.site.register(models.Enrollment)
+admin.site.register(models.WaitlistEntry)
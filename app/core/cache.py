@@ -0,0 +1,240 @@
+"""
+Small cache backends shared by the apps.
+
+Backends are configured by alias in `settings.CORE_CACHES` and looked
+up with `get_cache(alias)`. Every backend counts hits, misses and
+evictions so callers can report how well a cache is doing.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+
+
+class BaseCache:
+    """Interface and hit/miss/eviction counters for the cache backends."""
+
+    def __init__(self, default_timeout=None, key_prefix=''):
+        self.default_timeout = default_timeout
+        self.key_prefix = key_prefix
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, key):
+        return f'{self.key_prefix}{key}'
+
+    def get_timeout(self, timeout):
+        return self.default_timeout if timeout is None else timeout
+
+    def get(self, key, default=None):
+        raise NotImplementedError
+
+    def set(self, key, value, timeout=None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def incr(self, key, delta=1, timeout=None):
+        """Atomically add `delta` to an integer, starting from zero.
+
+        A counter created by the call expires after `timeout` seconds,
+        or never without one.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def record(self, hit):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stats(self):
+        """Return the counters of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = 0
+
+
+class LocMemLRUCache(BaseCache):
+    """In-process cache evicting the least recently used entries.
+
+    Holds at most `max_entries` entries; values are stored as is, so
+    callers must not mutate what they get back.
+    """
+
+    def __init__(self, max_entries=1024, **kwargs):
+        super().__init__(**kwargs)
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        key = self.make_key(key)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] is not None \
+                    and entry[0] <= time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.record(hit=False)
+                return default
+            self._data.move_to_end(key)
+            self.record(hit=True)
+            return entry[1]
+
+    def set(self, key, value, timeout=None):
+        timeout = self.get_timeout(timeout)
+        expires = None if timeout is None else time.monotonic() + timeout
+        key = self.make_key(key)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            self._evict()
+
+    def _evict(self):
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(self.make_key(key), None)
+
+    def incr(self, key, delta=1, timeout=None):
+        key = self.make_key(key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] is not None and entry[0] <= now:
+                entry = (None if timeout is None else now + timeout, 0)
+            expires, value = entry
+            self._data[key] = (expires, value + delta)
+            self._data.move_to_end(key)
+            self._evict()
+            return value + delta
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache(BaseCache):
+    """Cache backed by a Redis compatible server.
+
+    Takes either a `location` url, connected through `redis-py`, or a
+    ready `client` exposing `get`, `set`, `delete`, `incrby`, `expire`
+    and `flushdb`, which lets tests pass a local stand-in. Evictions happen
+    on the server and are read from its `evicted_keys` statistic.
+    """
+
+    def __init__(self, location=None, client=None, **kwargs):
+        super().__init__(**kwargs)
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(location)
+        self.client = client
+
+    def get(self, key, default=None):
+        value = self.client.get(self.make_key(key))
+        self.record(hit=value is not None)
+        if value is None:
+            return default
+        return self.loads(value)
+
+    def set(self, key, value, timeout=None):
+        self.client.set(
+            self.make_key(key),
+            self.dumps(value),
+            ex=self.get_timeout(timeout),
+        )
+
+    def delete(self, key):
+        self.client.delete(self.make_key(key))
+
+    def incr(self, key, delta=1, timeout=None):
+        key = self.make_key(key)
+        value = self.client.incrby(key, delta)
+        if timeout is not None and value == delta:
+            # Created by this call.
+            self.client.expire(key, timeout)
+        return value
+
+    def clear(self):
+        self.client.flushdb()
+
+    def dumps(self, value):
+        """Pickle values, except integers which are stored as is so
+        that `incr` can work on them server side."""
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, value):
+        try:
+            return int(value)
+        except ValueError:
+            return pickle.loads(value)
+
+    def stats(self):
+        stats = super().stats()
+        info = getattr(self.client, 'info', None)
+        if info is not None:
+            stats['evictions'] = info('stats').get('evicted_keys', 0)
+        return stats
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(alias='default'):
+    """Return the cache configured under `alias` in CORE_CACHES."""
+    try:
+        return _caches[alias]
+    except KeyError:
+        pass
+    with _caches_lock:
+        if alias not in _caches:
+            config = dict(settings.CORE_CACHES[alias])
+            backend = import_string(config.pop('BACKEND'))
+            options = config.pop('OPTIONS', {})
+            _caches[alias] = backend(**options)
+    return _caches[alias]
+
+
+def cache_stats():
+    """Return the counters of every cache in use by alias."""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {alias: cache.stats() for alias, cache in caches.items()}
+
+
+def reset_caches(**kwargs):
+    """Drop the configured caches so they are rebuilt from settings."""
+    if kwargs.get('setting', 'CORE_CACHES') == 'CORE_CACHES':
+        with _caches_lock:
+            _caches.clear()
+
+
+setting_changed.connect(reset_caches)
@@ -0,0 +1,88 @@
+"""
+PostgreSQL backend handing out connections from a pool.
+
+Configured like the stock backend, plus an optional `POOL` dict:
+
+    'POOL': {
+        'MIN_SIZE': 0,
+        'MAX_SIZE': 10,
+        'MAX_LIFETIME': 3600,
+        'MAX_IDLE': 300,
+        'WAIT_TIMEOUT': 5,
+        'HEALTH_CHECK_AFTER': 30,
+    }
+
+Leave `CONN_MAX_AGE` at 0 so every request hands its connection back to
+the pool when it finishes; setting `POOL` to `None` opens a connection
+per request like the stock backend.
+"""
+
+import functools
+
+import psycopg2.extras
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+
+from core.db.pool import get_pool
+
+from .creation import DatabaseCreation
+
+POOL_OPTIONS = {
+    'MIN_SIZE': 'min_size',
+    'MAX_SIZE': 'max_size',
+    'MAX_LIFETIME': 'max_lifetime',
+    'MAX_IDLE': 'max_idle',
+    'WAIT_TIMEOUT': 'wait_timeout',
+    'HEALTH_CHECK_AFTER': 'health_check_after',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+    pool = None
+
+    def get_pool(self):
+        """Return the pool of this database, or None when not pooled."""
+        options = self.settings_dict.get('POOL', {})
+        if options is None or self.alias == NO_DB_ALIAS:
+            return None
+        return get_pool(
+            (self.alias, self.settings_dict['NAME']),
+            functools.partial(
+                base.Database.connect, **self.get_connection_params()
+            ),
+            **{POOL_OPTIONS[key]: value for key, value in options.items()},
+        )
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        connection = pool.get()
+        # The connection goes back to the pool it came from, even if the
+        # pools have been closed since.
+        self.pool = pool
+        # As in the stock backend, for connections new and reused.
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(
+            conn_or_curs=connection, loads=lambda x: x
+        )
+        return connection
+
+    def _close(self):
+        pool, self.pool = self.pool, None
+        if pool is None or self.connection is None:
+            return super()._close()
+        # Closed inside an atomic block, Django keeps the connection
+        # object around until the block exits, so it cannot be handed to
+        # anyone else.
+        with self.wrap_database_errors:
+            pool.put(self.connection, discard=self.in_atomic_block)
@@ -0,0 +1,130 @@
+"""
+Bulk loading of generated rows with PostgreSQL COPY.
+
+`copy_rows` streams rows into a table with `COPY ... FROM STDIN`,
+formatting them as psycopg2 reads, so memory use does not grow with the
+number of rows. Other database backends get chunked `bulk_create`
+calls instead.
+"""
+
+from datetime import date, datetime, time
+from itertools import islice
+
+from django.db import connections
+from django.utils import timezone
+
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+
+def copy_value(value):
+    """Format a python value for the COPY text format."""
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
+
+
+class CopyStream:
+    """Readable file of the rows in the COPY text format, generated on
+    demand."""
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.buffer = ''
+
+    def read(self, size=-1):
+        lines = [self.buffer]
+        length = len(self.buffer)
+        while size < 0 or length < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            line = '\t'.join([copy_value(value) for value in row]) + '\n'
+            lines.append(line)
+            length += len(line)
+        data = ''.join(lines)
+        if size < 0:
+            self.buffer = ''
+            return data
+        self.buffer = data[size:]
+        return data[:size]
+
+
+def column_defaults(model, fields, connection):
+    """Return the columns and values of the concrete fields of `model`
+    missing from `fields`.
+
+    Those columns get their field default, the current time for
+    `auto_now` and `auto_now_add` dates, or NULL.
+    """
+    columns, values = [], []
+    for field in model._meta.concrete_fields:
+        if field.primary_key or field.attname in fields:
+            continue
+        if getattr(field, 'auto_now', False) \
+                or getattr(field, 'auto_now_add', False):
+            value = timezone.now()
+        elif field.has_default():
+            value = field.get_default()
+        else:
+            value = None
+        columns.append(field.column)
+        values.append(field.get_db_prep_save(value, connection))
+    return columns, values
+
+
+def copy_rows(model, fields, rows, using='default', chunk_size=10000):
+    """Insert the rows, tuples of values for the `fields` attnames, into
+    the table of `model` and return how many were inserted.
+
+    The other columns are filled as by `column_defaults`. Values of
+    `rows` are saved as they are, without the conversions of the model
+    fields, so they must already be python values the database takes.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return bulk_create_rows(model, fields, rows, using, chunk_size)
+
+    fields = list(fields)
+    columns = [model._meta.get_field(name).column for name in fields]
+    default_columns, defaults = column_defaults(model, fields, connection)
+    counted = [0]
+
+    def generate():
+        for row in rows:
+            counted[0] += 1
+            yield tuple(row) + tuple(defaults)
+
+    quote = connection.ops.quote_name
+    sql = 'COPY {} ({}) FROM STDIN'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(column) for column in columns + default_columns),
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, CopyStream(generate()), 65536)
+    return counted[0]
+
+
+def bulk_create_rows(model, fields, rows, using='default', chunk_size=10000):
+    """Insert the rows with `bulk_create`, `chunk_size` at a time."""
+    rows = iter(rows)
+    inserted = 0
+    while True:
+        chunk = [
+            model(**dict(zip(fields, row)))
+            for row in islice(rows, chunk_size)
+        ]
+        if not chunk:
+            return inserted
+        model._base_manager.using(using).bulk_create(chunk)
+        inserted += len(chunk)
@@ -0,0 +1,298 @@
+"""
+Connection pool for the pooled PostgreSQL backend.
+
+Connections handed back to the pool are kept open for the next request
+instead of being closed, so requests skip the connect and
+authentication round trips. The pool is thread safe and serves the WSGI
+worker threads and the ASGI thread pools alike.
+"""
+
+import threading
+import time
+from collections import deque
+
+from psycopg2 import OperationalError, extensions
+
+
+class PoolTimeout(OperationalError):
+    """Raised when no connection frees up within the wait timeout."""
+
+
+class PooledConnection:
+    """Bookkeeping for a connection owned by the pool."""
+    __slots__ = ('connection', 'created', 'returned')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created = self.returned = time.monotonic()
+
+
+class ConnectionPool:
+    """Pool of at most `max_size` connections opened with `connect`.
+
+    - `min_size` connections are opened on first use and idle ones are
+      only closed for being idle longer than `max_idle` seconds while
+      the pool holds more than `min_size`.
+    - Connections older than `max_lifetime` seconds are closed instead
+      of being reused.
+    - Connections idle for more than `health_check_after` seconds are
+      pinged before being handed out; `None` only checks that they are
+      still open.
+    - When all connections are in use, callers wait up to
+      `wait_timeout` seconds for one before `PoolTimeout` is raised.
+    """
+
+    def __init__(self, connect, min_size=0, max_size=10, max_lifetime=3600,
+                 max_idle=300, wait_timeout=5, health_check_after=30):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.wait_timeout = wait_timeout
+        self.health_check_after = health_check_after
+
+        self._idle = deque()
+        self._in_use = {}
+        self._opening = 0
+        self._lock = threading.Condition()
+        self._filled = False
+        self.counters = dict.fromkeys((
+            'checkouts', 'created', 'closed', 'waits', 'timeouts',
+            'failed_checks',
+        ), 0)
+        self.wait_seconds = 0.0
+
+    @property
+    def size(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def get(self):
+        """Check a connection out of the pool."""
+        if not self._filled:
+            self.fill()
+        deadline = None
+        with self._lock:
+            while True:
+                pooled = self._take_idle()
+                if pooled is not None:
+                    # Counted as checked out while its health is checked,
+                    # so the pool does not open past `max_size` meanwhile.
+                    self._in_use[id(pooled.connection)] = pooled
+                    break
+                if self.size < self.max_size:
+                    self._opening += 1
+                    break
+                if deadline is None:
+                    deadline = time.monotonic() + self.wait_timeout
+                    self.counters['waits'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f'No database connection became available within '
+                        f'{self.wait_timeout} seconds.'
+                    )
+                started = time.monotonic()
+                self._lock.wait(remaining)
+                self.wait_seconds += time.monotonic() - started
+
+        if pooled is None:
+            pooled = self._open()
+            with self._lock:
+                self._opening -= 1
+                self._in_use[id(pooled.connection)] = pooled
+        elif not self._healthy(pooled):
+            self._discard(pooled)
+            return self.get()
+
+        with self._lock:
+            self.counters['checkouts'] += 1
+        return pooled.connection
+
+    def put(self, connection, discard=False):
+        """Hand a connection back, or close it when `discard` is set or
+        it cannot be reused.
+
+        The connection stays counted as checked out until it is idle or
+        closed.
+        """
+        with self._lock:
+            pooled = self._in_use.get(id(connection))
+        if pooled is None:
+            connection.close()
+            return
+
+        now = time.monotonic()
+        if discard or not self._reset(connection) \
+                or now - pooled.created >= self.max_lifetime:
+            self._discard(pooled)
+            return
+
+        pooled.returned = now
+        with self._lock:
+            # Not checked out anymore when the pool was closed meanwhile.
+            kept = self._in_use.pop(id(connection), None) is not None
+            if kept:
+                self._idle.append(pooled)
+                self._close_idle(now)
+                self._lock.notify()
+        if not kept:
+            connection.close()
+
+    def fill(self):
+        """Open connections until the pool holds `min_size`."""
+        self._filled = True
+        while True:
+            with self._lock:
+                if self.size >= self.min_size:
+                    return
+                self._opening += 1
+            pooled = self._open()
+            with self._lock:
+                self._opening -= 1
+                self._idle.append(pooled)
+                self._lock.notify()
+
+    def close(self):
+        """Close the idle connections; those in use are closed when they
+        are handed back."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+            self._in_use.clear()
+            self._filled = False
+        for pooled in idle:
+            self._close(pooled)
+
+    def stats(self):
+        """Return the size, utilization and counters of the pool."""
+        with self._lock:
+            in_use = len(self._in_use)
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'in_use': in_use,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'utilization': in_use / self.max_size,
+                'wait_seconds': self.wait_seconds,
+                **self.counters,
+            }
+
+    def _take_idle(self):
+        # Most recently returned first, so surplus connections go idle
+        # long enough to be closed.
+        if self._idle:
+            return self._idle.pop()
+        return None
+
+    def _close_idle(self, now):
+        while len(self._idle) > self.min_size \
+                and now - self._idle[0].returned >= self.max_idle:
+            pooled = self._idle.popleft()
+            threading.Thread(target=self._close, args=(pooled,)).start()
+
+    def _open(self):
+        # Stays counted in `_opening` until the caller files it as idle or
+        # in use, under the same lock.
+        try:
+            connection = self.connect()
+            # As Django hands connections out, so the health check does
+            # not open a transaction on those never checked out yet.
+            connection.autocommit = True
+        except Exception:
+            with self._lock:
+                self._opening -= 1
+                self._lock.notify()
+            raise
+        with self._lock:
+            self.counters['created'] += 1
+        return PooledConnection(connection)
+
+    def _healthy(self, pooled):
+        connection = pooled.connection
+        if connection.closed:
+            return False
+        if time.monotonic() - pooled.created >= self.max_lifetime:
+            return False
+        if self.health_check_after is not None and \
+                time.monotonic() - pooled.returned > self.health_check_after:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                # Handed back outside autocommit, the ping opened a
+                # transaction Django could not change the session in.
+                healthy = self._reset(connection)
+            except Exception:
+                healthy = False
+            if not healthy:
+                with self._lock:
+                    self.counters['failed_checks'] += 1
+                return False
+        return True
+
+    def _reset(self, connection):
+        """Roll back whatever the connection was left in; return whether
+        it can be reused."""
+        if connection.closed:
+            return False
+        status = connection.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_IDLE:
+            return True
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        try:
+            connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    def _discard(self, pooled):
+        self._close(pooled)
+        with self._lock:
+            self._in_use.pop(id(pooled.connection), None)
+            self._lock.notify()
+
+    def _close(self, pooled):
+        try:
+            pooled.connection.close()
+        except Exception:
+            pass
+        with self._lock:
+            self.counters['closed'] += 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, connect, **options):
+    """Return the pool registered under `key`, creating it with
+    `connect` and `options` on first use."""
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(connect, **options)
+        return _pools[key]
+
+
+def close_pools(database=None, alias=None):
+    """Close and forget the pools, or only those of the named database
+    or connection alias."""
+    with _pools_lock:
+        keys = [
+            key for key in _pools
+            if alias in (None, key[0]) and database in (None, key[1])
+        ]
+        pools = [_pools.pop(key) for key in keys]
+    for pool in pools:
+        pool.close()
+
+
+def pool_stats():
+    """Return the statistics of every pool by alias and database."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {
+        f'{alias}:{database}': pool.stats()
+        for (alias, database), pool in pools.items()
+    }
@@ -0,0 +1,49 @@
+"""
+Password hashers with their cost read from the settings.
+
+The hashers keep the algorithm names of the Django hashers they extend,
+so existing hashes stay valid, and take their work factor from
+`PASSWORD_HASHER_OPTIONS` instead of a class attribute. Changing the
+cost, or `PASSWORD_HASHER`, makes `must_update` true for the hashes made
+before, and those are rehashed the next time their user logs in.
+"""
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+def option(name):
+    return settings.PASSWORD_HASHER_OPTIONS[name]
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with `pbkdf2_iterations` iterations."""
+
+    @property
+    def iterations(self):
+        return option('pbkdf2_iterations')
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2 with the `argon2_*` costs; needs argon2-cffi."""
+
+    @property
+    def time_cost(self):
+        return option('argon2_time_cost')
+
+    @property
+    def memory_cost(self):
+        return option('argon2_memory_cost')
+
+    @property
+    def parallelism(self):
+        return option('argon2_parallelism')
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    """BCrypt of the SHA256 digest with `bcrypt_rounds` rounds; needs
+    bcrypt."""
+
+    @property
+    def rounds(self):
+        return option('bcrypt_rounds')
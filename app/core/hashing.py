@@ -0,0 +1,110 @@
+"""
+Password hashing on a bounded pool of threads.
+
+Hashing a password is deliberately slow and CPU bound. Run on the
+request threads, a burst of logins or signups takes every core and
+stalls the other requests; awaited from async code, it blocks the event
+loop. These functions run the hashers on `PASSWORD_HASHING_WORKERS`
+threads instead, which bounds how many passwords are hashed at once.
+The hashers of `core.hashers` spend their time in hashlib or in the
+argon2 and bcrypt libraries, which release the GIL, so the pool hashes
+on several cores in parallel.
+
+Anything touching the database, such as saving a rehashed password,
+stays on the calling thread.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the pool hashing the passwords."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASHING_WORKERS,
+                thread_name_prefix='password-hashing',
+            )
+        return _executor
+
+
+def reset_executor(**kwargs):
+    """Replace the pool when its size changes."""
+    global _executor
+    if kwargs.get('setting') != 'PASSWORD_HASHING_WORKERS':
+        return
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = None
+
+
+setting_changed.connect(reset_executor)
+
+
+def verify_password(password, encoded):
+    """Return whether the password matches the encoded hash, and
+    whether the hash must be updated to the preferred hasher and cost.
+
+    Same checks as `django.contrib.auth.hashers.check_password`, minus
+    calling the setter.
+    """
+    if password is None or not hashers.is_password_usable(encoded):
+        return False, False
+
+    preferred = hashers.get_hasher('default')
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False, False
+
+    hasher_changed = hasher.algorithm != preferred.algorithm
+    must_update = hasher_changed or preferred.must_update(encoded)
+    is_correct = hasher.verify(password, encoded)
+    if not is_correct and not hasher_changed and must_update:
+        hasher.harden_runtime(password, encoded)
+    return is_correct, must_update
+
+
+def make_password(password):
+    """Hash the password on the pool."""
+    return get_executor().submit(hashers.make_password, password).result()
+
+
+def check_password(password, encoded, setter=None):
+    """Check the password on the pool; when it is correct but hashed
+    with another hasher or cost, call `setter(password)` on this
+    thread."""
+    is_correct, must_update = get_executor().submit(
+        verify_password, password, encoded
+    ).result()
+    if setter and is_correct and must_update:
+        setter(password)
+    return is_correct
+
+
+async def amake_password(password):
+    """Hash the password on the pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), hashers.make_password, password
+    )
+
+
+async def acheck_password(password, encoded):
+    """Return whether the password matches, and whether the hash must be
+    updated, without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), verify_password, password, encoded
+    )
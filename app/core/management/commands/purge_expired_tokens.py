@@ -0,0 +1,46 @@
+"""
+Django command to delete the expired api tokens
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from user.tokens import expired_tokens
+
+
+class Command(BaseCommand):
+    """Django command deleting expired tokens in small batches, each in
+    its own short transaction, so the token table is never locked for
+    long."""
+
+    help = 'Delete the expired api tokens in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Seconds to sleep between batches.',
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        purged = 0
+
+        while True:
+            with transaction.atomic():
+                keys = list(
+                    expired_tokens(now).select_for_update(skip_locked=True)
+                    .values_list('key', flat=True)[:options['batch_size']]
+                )
+                if not keys:
+                    break
+                expired_tokens(now).filter(key__in=keys).delete()
+            purged += len(keys)
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Purged {purged} expired tokens')
+        )
@@ -0,0 +1,47 @@
+"""
+Django command to recount the statistics of the event organizers
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import OrganizerStats
+
+
+class Command(BaseCommand):
+    """Django command recounting the organizer statistics from the
+    events, for rows loaded around the ORM or gone out of step.
+
+    Walks the users in batches of ids, each recounted with one grouped
+    query in its own short transaction, which locks only that batch's
+    statistics rows.
+    """
+
+    help = 'Recount the statistics of the event organizers in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        users = get_user_model().objects.using(using).order_by('id')
+        stats = OrganizerStats.objects.db_manager(using)
+        last_id = 0
+        rebuilt = 0
+
+        while True:
+            ids = list(
+                users.filter(id__gt=last_id)
+                .values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            with transaction.atomic(using=using):
+                rebuilt += stats.rebuild(ids)
+            last_id = ids[-1]
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt the statistics of {rebuilt} '
+                               'organizers')
+        )
@@ -0,0 +1,153 @@
+"""
+Django command to generate users, tokens and events for load tests
+"""
+import time
+from datetime import date, timedelta, time as clock
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core.db.copy import copy_rows
+from core.models import Event, OrganizerStats
+
+TITLE_WORDS = [
+    'Concert', 'Workshop', 'Meetup', 'Conference', 'Festival', 'Lecture',
+    'Webinar', 'Hackathon', 'Exhibition', 'Tasting', 'Screening', 'Talk',
+]
+TOPICS = [
+    'Jazz', 'Python', 'Design', 'Startups', 'Photography', 'Wine',
+    'Climate', 'Robotics', 'Poetry', 'Cinema', 'Running', 'Chess',
+]
+CITIES = [
+    'Berlin', 'Lisbon', 'Nairobi', 'Austin', 'Osaka', 'Toronto', 'Lagos',
+    'Pune', 'Lyon', 'Bogota', 'Online',
+]
+
+
+class Command(BaseCommand):
+    """Django command loading generated users, tokens and events.
+
+    Rows are generated while PostgreSQL reads them through COPY, so
+    memory use stays flat however many rows are loaded; other databases
+    get chunked bulk inserts. All users share one password hash,
+    computed once.
+    """
+
+    help = 'Generate users, tokens and events for load tests and staging.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument(
+            '--tokens', type=int, default=None,
+            help='Users to create a token for, by default all of them.',
+        )
+        parser.add_argument('--events', type=int, default=10000)
+        parser.add_argument(
+            '--organizers', type=int, default=100,
+            help='How many of the users organize the events.',
+        )
+        parser.add_argument('--password', default='seed123')
+        parser.add_argument('--domain', default='seed.example.com')
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        self.using = options['database']
+        self.chunk_size = options['chunk_size']
+        domain = options['domain']
+        User = get_user_model()
+        users = User.objects.using(self.using).filter(
+            email__endswith=f'@{domain}'
+        )
+
+        self.load(
+            'users', User, ['email', 'name', 'password'],
+            self.user_rows(
+                users.count(), options['users'], domain,
+                make_password(options['password']),
+            ),
+        )
+
+        tokens = options['tokens']
+        if tokens is None:
+            tokens = options['users']
+        self.load_tokens(users.filter(auth_token__isnull=True), tokens)
+
+        if options['events']:
+            organizers = list(
+                users.order_by('id')
+                .values_list('id', flat=True)[:options['organizers']]
+            )
+            if not organizers:
+                raise CommandError('There are no users to organize events.')
+            self.load(
+                'events', Event,
+                ['title', 'description', 'organizer_id', 'date', 'time',
+                 'venue', 'ticket_price', 'max_attendees'],
+                self.event_rows(
+                    Event.objects.using(self.using).count(),
+                    options['events'], organizers,
+                ),
+            )
+            # COPY sends no signals, the organizers are counted afresh.
+            with transaction.atomic(using=self.using):
+                OrganizerStats.objects.db_manager(self.using).rebuild(
+                    organizers
+                )
+
+    def load(self, name, model, fields, rows):
+        start = time.perf_counter()
+        count = copy_rows(model, fields, rows, self.using, self.chunk_size)
+        self.report(name, count, start)
+
+    def load_tokens(self, users, count):
+        # The user ids are read between the loads, one chunk at a time:
+        # the connection cannot run queries while it is copying.
+        start = time.perf_counter()
+        created = timezone.now()
+        loaded = 0
+        while loaded < count:
+            ids = list(
+                users.order_by('id').values_list('id', flat=True)
+                [:min(count - loaded, self.chunk_size)]
+            )
+            if not ids:
+                break
+            loaded += copy_rows(
+                Token, ['key', 'user_id', 'created'],
+                ((Token.generate_key(), user_id, created) for user_id in ids),
+                self.using, self.chunk_size,
+            )
+        self.report('tokens', loaded, start)
+
+    def report(self, name, count, start):
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Loaded {count} {name} in {elapsed:.1f}s'
+        ))
+
+    def user_rows(self, start, count, domain, password):
+        for number in range(start, start + count):
+            yield f'user{number}@{domain}', f'User {number}', password
+
+    def event_rows(self, start, count, organizers):
+        first_day = date.today()
+        for number in range(start, start + count):
+            title = TITLE_WORDS[number % len(TITLE_WORDS)]
+            topic = TOPICS[number // len(TITLE_WORDS) % len(TOPICS)]
+            city = CITIES[number % len(CITIES)]
+            yield (
+                f'{topic} {title} #{number}',
+                f'A {title.lower()} about {topic.lower()} in {city}.',
+                organizers[number % len(organizers)],
+                first_day + timedelta(days=number % 365),
+                clock(9 + number % 12, 30 * (number % 2)),
+                f'{city} Hall {number % 50}',
+                Decimal(number % 20 * 5),
+                10 + number % 10 * 25,
+            )
@@ -0,0 +1,243 @@
+"""
+Request metrics in the Prometheus text format.
+
+`MetricsMiddleware` records, per resolved url name and method, the
+request latency, the number and time of SQL queries, the rendering time
+and the response size into the histograms below. `render()` writes them
+out together with the counters of the core caches and the database
+pools, which are read when the metrics are scraped.
+"""
+
+import bisect
+import threading
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304,
+)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'),
+        )
+        for name, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Cumulative histogram of observations per label values."""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, label_names, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [
+                    [0] * (len(self.buckets) + 1), 0, 0,
+                ]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            series = {
+                labels: (list(counts), total, count)
+                for labels, (counts, total, count) in self._series.items()
+            }
+        for label_values, (counts, total, count) in sorted(series.items()):
+            labels = list(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, bucket_count in zip(
+                self.buckets + (float('inf'),), counts
+            ):
+                cumulative += bucket_count
+                yield '_bucket', labels + [('le', format_value(bound))], \
+                    cumulative
+            yield '_sum', labels, total
+            yield '_count', labels, count
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """Monotonic counter per label values."""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, label_names):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = \
+                self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield '', list(zip(self.label_names, label_values)), value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Gauges:
+    """Gauges read from `collect()` when the metrics are rendered.
+
+    `collect` yields `(suffix, labels, value)` triples; each suffix is a
+    gauge of its own named `<prefix>_<suffix>`.
+    """
+    kind = 'gauge'
+
+    def __init__(self, prefix, documentation, collect):
+        self.prefix = prefix
+        self.documentation = documentation
+        self.collect = collect
+
+    def families(self):
+        families = {}
+        for suffix, labels, value in self.collect():
+            families.setdefault(f'{self.prefix}_{suffix}', []).append(
+                ('', labels, value)
+            )
+        return families.items()
+
+    def clear(self):
+        pass
+
+
+ROUTE_LABELS = ('route', 'method')
+
+requests_total = Counter(
+    'http_requests_total',
+    'Requests answered, by url name, method and status code.',
+    ROUTE_LABELS + ('status',),
+)
+request_duration = Histogram(
+    'http_request_duration_seconds',
+    'Time from the request reaching the middleware to its response.',
+    ROUTE_LABELS, LATENCY_BUCKETS,
+)
+request_queries = Histogram(
+    'http_request_db_queries',
+    'SQL queries run per request.',
+    ROUTE_LABELS, QUERY_BUCKETS,
+)
+request_query_duration = Histogram(
+    'http_request_db_duration_seconds',
+    'Time spent in SQL queries per request.',
+    ROUTE_LABELS, LATENCY_BUCKETS,
+)
+request_render_duration = Histogram(
+    'http_request_render_duration_seconds',
+    'Time spent rendering the response data to bytes.',
+    ROUTE_LABELS, LATENCY_BUCKETS,
+)
+response_size = Histogram(
+    'http_response_size_bytes',
+    'Size of the response bodies; streamed responses are left out.',
+    ROUTE_LABELS, SIZE_BUCKETS,
+)
+query_budget_exceeded = Counter(
+    'http_request_query_budget_exceeded_total',
+    'Requests that ran more queries than their budget.',
+    ROUTE_LABELS,
+)
+
+
+def collect_cache_stats():
+    from core.cache import cache_stats
+
+    for alias, stats in sorted(cache_stats().items()):
+        for name in ('hits', 'misses', 'evictions'):
+            yield name, [('cache', alias)], stats[name]
+
+
+def collect_pool_stats():
+    from core.db.pool import pool_stats
+
+    for pool, stats in sorted(pool_stats().items()):
+        for name in ('size', 'idle', 'in_use', 'max_size', 'waits',
+                     'timeouts', 'wait_seconds'):
+            yield name, [('pool', pool)], stats[name]
+
+
+METRICS = [
+    requests_total,
+    request_duration,
+    request_queries,
+    request_query_duration,
+    request_render_duration,
+    response_size,
+    query_budget_exceeded,
+    Gauges(
+        'core_cache',
+        'Lookups and evictions of the core caches, including the token '
+        'caches.',
+        collect_cache_stats,
+    ),
+    Gauges(
+        'db_pool',
+        'Size, utilization and waits of the database connection pools.',
+        collect_pool_stats,
+    ),
+]
+
+
+def render():
+    """Return every metric in the Prometheus text format."""
+    lines = []
+    for metric in METRICS:
+        if isinstance(metric, Gauges):
+            families = metric.families()
+        else:
+            families = [(metric.name, metric.samples())]
+        for name, samples in families:
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for suffix, labels, value in samples:
+                lines.append('{}{}{} {}'.format(
+                    name, suffix, format_labels(labels), format_value(value),
+                ))
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """Clear the recorded request metrics."""
+    for metric in METRICS:
+        metric.clear()
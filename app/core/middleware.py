@@ -0,0 +1,193 @@
+"""
+Request instrumentation middleware.
+"""
+
+import asyncio
+import contextvars
+import time
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from core import metrics
+
+_recorder = contextvars.ContextVar('query_recorder', default=None)
+
+# Methods recorded by name; the others are recorded as 'other', so
+# clients cannot add label values at will.
+HTTP_METHODS = frozenset((
+    'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE',
+    'CONNECT',
+))
+
+
+class QueryBudgetWarning(RuntimeWarning):
+    """A view ran more queries than its budget, or the same query over
+    and over (N+1)."""
+
+
+class QueryRecorder:
+    """Database execute wrapper counting and timing the queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper handing the queries to the recorder of the request
+    running them, if any."""
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """Wrap the queries of every new connection with `record_query`.
+
+    Connected to `connection_created` by the core app. The recorder is
+    looked up in the context of the query rather than installed on the
+    connections of the request's thread, so the queries of async
+    requests are counted whichever thread runs them.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def recording_queries(recorder):
+    """Record the queries run in the context of the block."""
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+def route_name(request):
+    """Return the url name a request resolved to."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unmatched>'
+    return match.view_name
+
+
+def method_label(request):
+    """Return the method a request is recorded under."""
+    if request.method in HTTP_METHODS:
+        return request.method
+    return 'other'
+
+
+def query_budget(request):
+    """Return the query budget of the view a request resolved to.
+
+    Views set `query_budget` to override `settings.QUERY_BUDGET`.
+    """
+    match = getattr(request, 'resolver_match', None)
+    view = getattr(match, 'func', None)
+    view = getattr(view, 'cls', getattr(view, 'view_class', view))
+    return getattr(view, 'query_budget', settings.QUERY_BUDGET)
+
+
+def check_query_budget(request, route, recorder):
+    """Count the requests running more queries than their view's budget
+    or repeating one query more than `settings.QUERY_REPEAT_LIMIT` times.
+
+    They also warn under DEBUG or with `settings.QUERY_BUDGET_WARNINGS`,
+    set in the test suite.
+    """
+    budget = query_budget(request)
+    sql, repeats = next(iter(recorder.statements.most_common(1)), ('', 0))
+    over_budget = budget is not None and recorder.count > budget
+    repeated = repeats > settings.QUERY_REPEAT_LIMIT
+    if not over_budget and not repeated:
+        return
+    metrics.query_budget_exceeded.inc(route, method_label(request))
+    if not settings.DEBUG and not settings.QUERY_BUDGET_WARNINGS:
+        return
+    message = f'{request.method} {route} ran {recorder.count} queries ' \
+        f'(budget {budget})'
+    if repeated:
+        message += f', one of them repeated {repeats} times: {sql}'
+    else:
+        message += ':\n' + '\n'.join(recorder.statements)
+    warnings.warn(message, QueryBudgetWarning)
+
+
+class MetricsMiddleware:
+    """Record the latency, queries, rendering time and response size of
+    every request by url name, see core.metrics.
+
+    Runs in the mode of the handler, so ASGI requests are not moved to
+    the single thread of the sync middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Marks the instance as a coroutine function, as Django's
+            # MiddlewareMixin does, so the handler awaits it.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with recording_queries(QueryRecorder()) as recorder:
+            response = self.get_response(request)
+        self.record(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        start = time.perf_counter()
+        with recording_queries(QueryRecorder()) as recorder:
+            response = await self.get_response(request)
+        self.record(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    def record(self, request, response, recorder, duration):
+        route = route_name(request)
+        labels = (route, method_label(request))
+        metrics.requests_total.inc(*labels, response.status_code)
+        metrics.request_duration.observe(duration, *labels)
+        metrics.request_queries.observe(recorder.count, *labels)
+        metrics.request_query_duration.observe(recorder.duration, *labels)
+        render_duration = getattr(request, '_render_duration', None)
+        if render_duration is not None:
+            metrics.request_render_duration.observe(render_duration, *labels)
+        if not response.streaming:
+            metrics.response_size.observe(len(response.content), *labels)
+        check_query_budget(request, route, recorder)
+
+    def process_template_response(self, request, response):
+        # Runs right before the response is rendered; DRF responses are
+        # rendered to bytes there.
+        start = time.perf_counter()
+
+        def rendered(response):
+            request._render_duration = time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_auto_20261018_1759'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['venue', 'date', 'time'], name='event_venue_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['ticket_price', 'id'], name='event_ticket_price_idx'),
+        ),
+    ]
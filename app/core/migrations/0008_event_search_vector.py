@@ -0,0 +1,71 @@
+# Generated by Django 3.2.25 on 2026-10-18 18:02
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The search vector is weighted title > venue > description and kept up
+# to date by a trigger, so it also covers bulk inserts, updates through
+# querysets and COPY. It holds both the stemmed (english) and unstemmed
+# (simple) lexemes so prefixes of inflected words match as well. Only PostgreSQL gets the trigger and GIN index;
+# other backends fall back to substring matching in event.search.
+CREATE_SEARCH_TRIGGER = """
+CREATE FUNCTION core_event_search_vector_update() RETURNS trigger AS $$
+DECLARE
+    config regconfig;
+BEGIN
+    NEW.search_vector := ''::tsvector;
+    FOREACH config IN ARRAY
+        ARRAY['pg_catalog.english', 'pg_catalog.simple']::regconfig[]
+    LOOP
+        NEW.search_vector := NEW.search_vector ||
+            setweight(to_tsvector(config, coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector(config, coalesce(NEW.venue, '')), 'B') ||
+            setweight(to_tsvector(config, coalesce(NEW.description, '')),
+                      'C');
+    END LOOP;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_event_search_vector_trigger
+BEFORE INSERT OR UPDATE OF title, venue, description, search_vector
+ON core_event
+FOR EACH ROW EXECUTE FUNCTION core_event_search_vector_update();
+
+UPDATE core_event SET search_vector = NULL;
+
+CREATE INDEX event_search_vector_idx ON core_event
+USING gin (search_vector);
+"""
+
+DROP_SEARCH_TRIGGER = """
+DROP INDEX IF EXISTS event_search_vector_idx;
+DROP TRIGGER IF EXISTS core_event_search_vector_trigger ON core_event;
+DROP FUNCTION IF EXISTS core_event_search_vector_update();
+"""
+
+
+def create_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH_TRIGGER)
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_auto_20261018_1800'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:21
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def count_organizer_stats(apps, schema_editor):
+    """Count the statistics of the organizers of existing events."""
+    Event = apps.get_model('core', 'Event')
+    OrganizerStats = apps.get_model('core', 'OrganizerStats')
+    db = schema_editor.connection.alias
+    today = timezone.localdate()
+    totals = Event.objects.using(db).values('organizer_id').annotate(
+        event_count=Count('id'),
+        upcoming_count=Count('id', filter=Q(date__gte=today)),
+        total_capacity=Sum('max_attendees'),
+        revenue_potential=Sum(
+            F('ticket_price') * F('max_attendees'),
+            output_field=models.DecimalField(),
+        ),
+        seats_taken=Sum('seats_taken'),
+    ).order_by()
+    OrganizerStats.objects.using(db).bulk_create(
+        (OrganizerStats(upcoming_since=today, **row) for row in totals),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_auto_20261018_1809'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizerStats',
+            fields=[
+                ('organizer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='event_stats', serialize=False, to='core.user')),
+                ('event_count', models.IntegerField(default=0)),
+                ('upcoming_count', models.IntegerField(default=0)),
+                ('upcoming_since', models.DateField()),
+                ('total_capacity', models.BigIntegerField(default=0)),
+                ('revenue_potential', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('seats_taken', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(
+            count_organizer_stats, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:34
+
+import datetime
+from django.db import DatabaseError, migrations, models, transaction
+
+# Events with a duration book their venue for the local wall clock range
+# from their date and time; no two bookings of a venue may overlap. The
+# equality on the venue needs the btree_gist extension: without it, when
+# the migrating role may not create it, or on other backends,
+# event.bookings checks the writes instead.
+CREATE_BTREE_GIST = 'CREATE EXTENSION IF NOT EXISTS btree_gist'
+
+CREATE_BOOKING_CONSTRAINT = """
+ALTER TABLE core_event ADD CONSTRAINT event_venue_no_overlap
+EXCLUDE USING gist (
+    venue WITH =,
+    tsrange(date + time, date + time + duration) WITH &&
+) WHERE (duration IS NOT NULL);
+"""
+
+DROP_BOOKING_CONSTRAINT = """
+ALTER TABLE core_event DROP CONSTRAINT IF EXISTS event_venue_no_overlap;
+"""
+
+
+def create_booking_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'btree_gist'"
+        )
+        if cursor.fetchone() is None:
+            return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute(CREATE_BTREE_GIST)
+    except DatabaseError:
+        # Not installed and not allowed to install it.
+        return
+    schema_editor.execute(CREATE_BOOKING_CONSTRAINT)
+
+
+def drop_booking_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_BOOKING_CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_organizerstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='duration',
+            field=models.DurationField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='event',
+            constraint=models.CheckConstraint(check=models.Q(('duration__isnull', True), ('duration__gt', datetime.timedelta(0)), _connector='OR'), name='event_duration_positive'),
+        ),
+        migrations.RunPython(
+            create_booking_constraint, drop_booking_constraint
+        ),
+    ]
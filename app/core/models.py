@@ -2,14 +2,23 @@
 Models definition for APIs.
 """
 
-from django.db import models
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+from django.db import models, router, transaction, IntegrityError
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Now
 from django.conf import settings
+from django.utils import timezone
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin
 )
 
+from core import hashing
+
 
 class UserManager(BaseUserManager):
     """Manager for the user model."""
@@ -48,13 +57,42 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = 'email'
 
+    def set_password(self, raw_password):
+        """Hash the password on the hashing pool, see core.hashing."""
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """Check the password on the hashing pool, rehashing it when
+        the hashing policy changed since it was set."""
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+
+        return hashing.check_password(raw_password, self.password, setter)
+
+
+class EventManager(models.Manager):
+    """Manager for events, leaving out the search vector, which is only
+    filtered and ranked on in the database, see event.search."""
+
+    def get_queryset(self):
+        return super().get_queryset().defer('search_vector')
+
 
 class Event(models.Model):
     """Model for event."""
+    COUNTER_FIELDS = ('seats_taken', 'waitlist_tail')
+
     title = models.CharField(max_length=255)
+    # Looked up through the (organizer, -id) index below, which also
+    # orders the organized listings; a foreign key index would duplicate
+    # it and take the organizer lookups from it.
     organizer = models.ForeignKey(
         settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False,
     )
     description = models.TextField(blank=True, default='')
     date = models.DateField()
@@ -62,6 +100,528 @@ class Event(models.Model):
     venue = models.CharField(max_length=255)
     ticket_price = models.DecimalField(max_digits=10, decimal_places=2,)
     max_attendees = models.PositiveIntegerField(default=10)
+    # How long the event books its venue from its date and time; events
+    # without one are never checked for double bookings, see
+    # event.bookings.
+    duration = models.DurationField(null=True, blank=True)
+    # Counters only changed atomically by the enrollment and waitlist
+    # managers, never written back by save().
+    seats_taken = models.PositiveIntegerField(default=0, editable=False)
+    waitlist_tail = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger on PostgreSQL, see migration 0008.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = EventManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['date', 'time', 'id'],
+                name='event_date_time_id_idx',
+            ),
+            models.Index(
+                fields=['organizer', '-id'],
+                name='event_organizer_id_idx',
+            ),
+            models.Index(
+                fields=['updated_at'],
+                name='event_updated_at_idx',
+            ),
+            models.Index(
+                fields=['venue', 'date', 'time'],
+                name='event_venue_date_idx',
+            ),
+            models.Index(
+                fields=['ticket_price', 'id'],
+                name='event_ticket_price_idx',
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=Q(seats_taken__lte=F('max_attendees')),
+                name='event_seats_within_capacity',
+            ),
+            models.CheckConstraint(
+                check=Q(duration__isnull=True)
+                | Q(duration__gt=timedelta(0)),
+                name='event_duration_positive',
+            ),
+        ]
 
     def __str__(self):
         return self.title
+
+    def snapshot(self):
+        """Return the values the organizer statistics and the calendar
+        count the event by, or None when some of them were not loaded."""
+        values = []
+        for name in EventSnapshot._fields:
+            field = self._meta.get_field(name)
+            if field.attname not in self.__dict__:
+                return None
+            values.append(field.to_python(self.__dict__[field.attname]))
+        return EventSnapshot(*values)
+
+    def save(self, *args, **kwargs):
+        """Save the event without writing back stale counters or the
+        fields that were not loaded.
+
+        The save and the updates of the organizer statistics and the
+        calendar it triggers run in one transaction.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
+
+EventSnapshot = namedtuple(
+    'EventSnapshot',
+    ['organizer', 'date', 'venue', 'ticket_price', 'max_attendees',
+     'seats_taken'],
+)
+
+
+class EventFullError(Exception):
+    """Raised when enrolling into an event without free seats."""
+
+
+class EventNotFullError(Exception):
+    """Raised when joining the waitlist of an event with free seats."""
+
+
+class AlreadyEnrolledError(Exception):
+    """Raised when joining the waitlist of an event the user attends."""
+
+
+class IdempotencyKeyReusedError(Exception):
+    """Raised when enrolling with the idempotency key of an enrollment
+    into another event."""
+
+
+class VenueBookedError(Exception):
+    """Raised when an event books its venue at a time another event has
+    booked it."""
+
+
+class EnrollmentManager(models.Manager):
+    """Manager for enrollments, keeping the seat counter of events."""
+
+    def enroll(self, user, event, idempotency_key=''):
+        """Enroll the user into the event and return the enrollment along
+        with whether it was created.
+
+        The seat is taken with a single conditional UPDATE, so concurrent
+        enrollments never overbook the event. Retries, identified by the
+        idempotency key or by the user already being enrolled, return the
+        existing enrollment without taking another seat; a key already
+        used for another event raises `IdempotencyKeyReusedError`.
+        """
+        existing = self.find_existing(user, event, idempotency_key)
+        if existing is not None:
+            return existing, False
+
+        try:
+            with transaction.atomic(using=self.db):
+                taken = Event.objects.using(self.db).filter(
+                    pk=event.pk,
+                    seats_taken__lt=F('max_attendees'),
+                ).update(seats_taken=F('seats_taken') + 1)
+                if not taken:
+                    raise EventFullError(event.pk)
+                OrganizerStats.objects.db_manager(self.db).add_seats(
+                    event.pk, 1
+                )
+                enrollment = self.create(
+                    user=user,
+                    event=event,
+                    idempotency_key=idempotency_key,
+                )
+                WaitlistEntry.objects.using(self.db).filter(
+                    user=user, event=event
+                ).delete()
+        except IntegrityError:
+            existing = self.find_existing(user, event, idempotency_key)
+            if existing is None:
+                raise
+            return existing, False
+
+        return enrollment, True
+
+    def find_existing(self, user, event, idempotency_key=''):
+        """Return the enrollment a retried request already created."""
+        condition = Q(event=event)
+        if idempotency_key:
+            condition |= Q(idempotency_key=idempotency_key)
+        existing = None
+        for enrollment in self.filter(condition, user=user):
+            if enrollment.event_id != event.pk:
+                raise IdempotencyKeyReusedError(idempotency_key)
+            existing = enrollment
+        return existing
+
+    def cancel(self, enrollment):
+        """Cancel the enrollment and hand its seat to the head of the
+        waitlist, or free it when nobody is waiting.
+
+        Handing the seat over leaves the event row untouched, so
+        cancellations of the same event promote their waitlist heads in
+        parallel; see `WaitlistManager.pop_head`.
+        """
+        with transaction.atomic(using=self.db):
+            deleted, _ = self.filter(pk=enrollment.pk).delete()
+            if not deleted:
+                return False
+
+            entry = WaitlistEntry.objects.db_manager(self.db).pop_head(
+                enrollment.event_id
+            )
+            if entry is not None:
+                self.create(user_id=entry.user_id, event_id=entry.event_id)
+                return True
+
+            Event.objects.using(self.db).filter(
+                pk=enrollment.event_id
+            ).update(seats_taken=F('seats_taken') - 1)
+            OrganizerStats.objects.db_manager(self.db).add_seats(
+                enrollment.event_id, -1
+            )
+            # The update waited for any concurrent waitlist join to commit,
+            # which could have seen the event full before the seat was
+            # freed; give the seat to it instead of leaving it stranded.
+            self.fill_from_waitlist(enrollment.event_id)
+        return True
+
+    def fill_from_waitlist(self, event_id):
+        """Promote the head of the waitlist into a free seat, if any."""
+        with transaction.atomic(using=self.db):
+            entry = WaitlistEntry.objects.db_manager(self.db).pop_head(
+                event_id
+            )
+            if entry is None:
+                return None
+            taken = Event.objects.using(self.db).filter(
+                pk=event_id,
+                seats_taken__lt=F('max_attendees'),
+            ).update(seats_taken=F('seats_taken') + 1)
+            if not taken:
+                transaction.set_rollback(True, using=self.db)
+                return None
+            OrganizerStats.objects.db_manager(self.db).add_seats(event_id, 1)
+            return self.create(user_id=entry.user_id, event_id=event_id)
+
+
+class Enrollment(models.Model):
+    """Model for a user's seat at an event."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    idempotency_key = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = EnrollmentManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'event'],
+                name='enrollment_unique_user_event',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'idempotency_key'],
+                condition=~Q(idempotency_key=''),
+                name='enrollment_unique_idempotency_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} - {self.event}'
+
+
+class WaitlistQuerySet(models.QuerySet):
+    """Queryset for the waitlist entries."""
+
+    def with_positions(self):
+        """Annotate entries with their 1-based position in the queue.
+
+        The position is the distance from the head ticket, found with a
+        single index seek; entries that left from the middle of the
+        queue are still counted, so it is an upper bound.
+        """
+        head = self.model.objects.filter(
+            event=OuterRef('event')
+        ).order_by('ticket').values('ticket')[:1]
+        return self.annotate(
+            position=F('ticket') - Subquery(head) + 1
+        )
+
+
+class WaitlistManager(models.Manager.from_queryset(WaitlistQuerySet)):
+    """Manager for the FIFO waitlists of full events."""
+
+    def join(self, user, event):
+        """Add the user at the tail of the event's waitlist and return
+        the entry along with whether it was created.
+
+        Tickets are issued from the event's tail counter by an UPDATE
+        that only matches while the event is full, so users are never
+        queued behind a free seat.
+        """
+        existing = self.filter(user=user, event=event).first()
+        if existing is not None:
+            return existing, False
+        if Enrollment.objects.using(self.db).filter(
+                user=user, event=event).exists():
+            raise AlreadyEnrolledError(event.pk)
+
+        try:
+            with transaction.atomic(using=self.db):
+                events = Event.objects.using(self.db).filter(pk=event.pk)
+                issued = events.filter(
+                    seats_taken__gte=F('max_attendees'),
+                ).update(waitlist_tail=F('waitlist_tail') + 1)
+                if not issued:
+                    raise EventNotFullError(event.pk)
+                ticket = events.values_list('waitlist_tail', flat=True)[0]
+                entry = self.create(user=user, event=event, ticket=ticket)
+        except IntegrityError:
+            existing = self.filter(user=user, event=event).first()
+            if existing is None:
+                raise
+            return existing, False
+
+        return entry, True
+
+    def pop_head(self, event_id):
+        """Remove and return the first entry of the waitlist.
+
+        Must run inside a transaction. Entries locked by a concurrent
+        promotion are skipped rather than waited for, so concurrent
+        cancellations each promote a different user.
+        """
+        entry = self.select_for_update(skip_locked=True).filter(
+            event_id=event_id
+        ).order_by('ticket').first()
+        if entry is not None:
+            self.filter(pk=entry.pk).delete()
+        return entry
+
+
+class WaitlistEntry(models.Model):
+    """Model for a user waiting for a seat at a full event."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    ticket = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = WaitlistManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['event', 'ticket'],
+                name='waitlist_unique_event_ticket',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'event'],
+                name='waitlist_unique_user_event',
+            ),
+        ]
+        verbose_name_plural = 'waitlist entries'
+
+    def __str__(self):
+        return f'{self.event} #{self.ticket} - {self.user}'
+
+
+class OrganizerStatsManager(models.Manager):
+    """Manager keeping the organizer statistics in step with the events.
+
+    Changes are added to the organizer's row by a single UPDATE, in the
+    transaction of the event or enrollment write that causes them.
+    """
+
+    def record(self, changes):
+        """Count changed events, given as `(old, new)` pairs of
+        `Event.snapshot`, old being None for created events and new
+        None for deleted ones.
+
+        Changes are summed per organizer, so a bulk write costs one
+        UPDATE per organizer. The upcoming count is only adjusted on rows
+        counted from today; the others are recounted when next read.
+        """
+        today = timezone.localdate()
+        deltas = defaultdict(lambda: dict.fromkeys(self.model.COUNTERS, 0))
+        created = set()
+        for old, new in changes:
+            if old is None:
+                created.add(new.organizer)
+            for snapshot, sign in ((old, -1), (new, 1)):
+                if snapshot is None:
+                    continue
+                delta = deltas[snapshot.organizer]
+                delta['event_count'] += sign
+                delta['upcoming_count'] += sign * (snapshot.date >= today)
+                delta['total_capacity'] += sign * snapshot.max_attendees
+                delta['revenue_potential'] += \
+                    sign * snapshot.ticket_price * snapshot.max_attendees
+                delta['seats_taken'] += sign * snapshot.seats_taken
+
+        for organizer, delta in deltas.items():
+            self.add(organizer, delta, today, create=organizer in created)
+
+    def add(self, organizer, delta, today, create=False):
+        """Add `delta` to the counters of the organizer's row, creating
+        the row when `create` is set and there is none yet."""
+        delta = {name: value for name, value in delta.items() if value}
+        if not delta:
+            return
+        changes = {name: F(name) + value for name, value in delta.items()}
+        upcoming = changes.pop('upcoming_count', None)
+        rows = self.filter(organizer_id=organizer)
+        if upcoming is not None and rows.filter(
+                upcoming_since=today).update(upcoming_count=upcoming,
+                                             updated_at=Now(), **changes):
+            return
+        if changes and rows.update(updated_at=Now(), **changes) \
+                or not create:
+            return
+        try:
+            with transaction.atomic(using=self.db):
+                self.create(organizer_id=organizer, upcoming_since=today,
+                            **delta)
+        except IntegrityError:
+            # Created concurrently, add to it instead.
+            self.add(organizer, delta, today)
+
+    def add_seats(self, event_id, delta):
+        """Add `delta` taken seats to the organizer of the event."""
+        organizer = Event.objects.using(self.db).filter(
+            pk=event_id
+        ).values('organizer_id')
+        self.filter(organizer_id=Subquery(organizer)).update(
+            seats_taken=F('seats_taken') + delta, updated_at=Now()
+        )
+
+    def for_organizer(self, organizer):
+        """Return the statistics of the organizer.
+
+        A row whose upcoming count dates from before today is recounted
+        first, locked so that concurrent event writes add to the new
+        count. Organizers without a row get unsaved, zeroed statistics.
+        """
+        today = timezone.localdate()
+        stats = self.filter(organizer=organizer).first()
+        if stats is None:
+            return self.model(organizer=organizer, upcoming_since=today)
+        if stats.upcoming_since < today:
+            with transaction.atomic(using=self.db):
+                stats = self.select_for_update().get(pk=stats.pk)
+                stats.upcoming_count = Event.objects.using(self.db).filter(
+                    organizer=organizer, date__gte=today
+                ).count()
+                stats.upcoming_since = today
+                stats.save(update_fields=[
+                    'upcoming_count', 'upcoming_since', 'updated_at',
+                ])
+        return stats
+
+    def rebuild(self, organizer_ids):
+        """Recount the statistics of the organizers from their events.
+
+        Must run in a transaction: the existing rows are locked while
+        their events are counted. Returns the number of rows written.
+        """
+        now = timezone.now()
+        today = timezone.localdate(now)
+        existing = {
+            stats.organizer_id: stats
+            for stats in self.select_for_update().filter(
+                organizer_id__in=organizer_ids
+            )
+        }
+        totals = Event.objects.using(self.db).filter(
+            organizer_id__in=organizer_ids
+        ).values('organizer_id').annotate(
+            event_count=Count('id'),
+            upcoming_count=Count('id', filter=Q(date__gte=today)),
+            total_capacity=Sum('max_attendees'),
+            revenue_potential=Sum(
+                F('ticket_price') * F('max_attendees'),
+                output_field=models.DecimalField(),
+            ),
+            seats_taken=Sum('seats_taken'),
+        ).order_by()
+        totals = {row.pop('organizer_id'): row for row in totals}
+
+        stale, missing = [], []
+        for organizer in set(existing) | set(totals):
+            stats = existing.get(organizer)
+            if stats is None:
+                stats = self.model(organizer_id=organizer)
+                missing.append(stats)
+            else:
+                stale.append(stats)
+            counters = totals.get(organizer) or dict.fromkeys(
+                self.model.COUNTERS, 0
+            )
+            for name, value in counters.items():
+                setattr(stats, name, value)
+            stats.upcoming_since = today
+            stats.updated_at = now
+        self.bulk_update(
+            stale, self.model.COUNTERS + ('upcoming_since', 'updated_at')
+        )
+        self.bulk_create(missing)
+        return len(stale) + len(missing)
+
+
+class OrganizerStats(models.Model):
+    """Totals over the events of an organizer, kept up to date as the
+    events and their enrollments change.
+
+    The upcoming count covers the events dated on or after
+    `upcoming_since`, the day it was last recounted.
+    """
+    COUNTERS = (
+        'event_count',
+        'upcoming_count',
+        'total_capacity',
+        'revenue_potential',
+        'seats_taken',
+    )
+
+    organizer = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='event_stats',
+    )
+    event_count = models.IntegerField(default=0)
+    upcoming_count = models.IntegerField(default=0)
+    upcoming_since = models.DateField()
+    total_capacity = models.BigIntegerField(default=0)
+    revenue_potential = models.DecimalField(
+        max_digits=16, decimal_places=2, default=0
+    )
+    seats_taken = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = OrganizerStatsManager()
+
+    def __str__(self):
+        return f'Stats of {self.organizer_id}'
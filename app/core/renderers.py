@@ -0,0 +1,126 @@
+"""
+Response renderers shared by the apis.
+"""
+
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class StreamingRenderer(BaseRenderer):
+    """Base for renderers that can also stream rows of values.
+
+    `render` handles regular response data such as errors, while
+    `stream` renders rows lazily for a `StreamingHttpResponse`, a chunk
+    of `rows_per_chunk` rows at a time.
+    """
+    charset = 'utf-8'
+    rows_per_chunk = 500
+
+    def stream(self, fields, rows):
+        """Yield the rendering of `rows`, sequences of values for
+        `fields`, as encoded chunks."""
+        chunk = [self.header(fields)]
+        for row in rows:
+            chunk.append(self.format_row(fields, row))
+            if len(chunk) >= self.rows_per_chunk:
+                yield ''.join(chunk).encode(self.charset)
+                chunk = []
+        if chunk:
+            yield ''.join(chunk).encode(self.charset)
+
+    def header(self, fields):
+        return ''
+
+    def format_row(self, fields, row):
+        raise NotImplementedError
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        if not items:
+            return b''
+        fields = list(items[0])
+        return b''.join(self.stream(
+            fields, ([item.get(field) for field in fields] for item in items)
+        ))
+
+
+class NDJSONRenderer(StreamingRenderer):
+    """Render one compact JSON document per line."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def format_row(self, fields, row):
+        return json.dumps(
+            dict(zip(fields, row)),
+            cls=JSONEncoder,
+            ensure_ascii=False,
+            separators=(',', ':'),
+        ) + '\n'
+
+
+class Echo:
+    """File-like object handing back what is written to it."""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(StreamingRenderer):
+    """Render a header line followed by one CSV line per row."""
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def __init__(self):
+        self.writer = csv.writer(Echo())
+
+    def header(self, fields):
+        return self.writer.writerow(fields)
+
+    def format_row(self, fields, row):
+        return self.writer.writerow(row)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON renderer backed by orjson, falling back to the stdlib one.
+
+    Output matches `JSONRenderer`: anything orjson does not encode the
+    same way (datetimes, decimals, lazy strings, ...) goes through the
+    DRF encoder, and U+2028/U+2029 are escaped. Indented output, ASCII
+    only output, non strict output and values orjson refuses, such as
+    integers over 64 bits, are rendered by `JSONRenderer`.
+    """
+    options = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if orjson else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.ensure_ascii or not self.compact \
+                or not self.strict \
+                or self.get_indent(
+                    accepted_media_type, renderer_context or {}
+                ) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=self.options,
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(b'\xe2\x80\xa9', b'\\u2029')
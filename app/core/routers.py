@@ -0,0 +1,174 @@
+"""
+Read replica routing.
+
+Reads are sent to the aliases in `settings.DATABASE_REPLICAS` only where
+a view opts in with `ReplicaReadMixin`; everything else, and every
+write, goes to the primary. Once a request has written, its later reads
+go to the primary too, and so do the reads of that user's requests for
+the next `DATABASE_REPLICA_LAG` seconds, until the replicas have caught
+up with the write.
+"""
+
+import asyncio
+import contextvars
+import random
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from core.cache import get_cache
+
+_state = contextvars.ContextVar('replica_routing', default=None)
+
+
+class RoutingState:
+    """Routing decisions of the current request."""
+    __slots__ = ('replica_reads', 'pinned', 'wrote')
+
+    def __init__(self):
+        self.replica_reads = False
+        self.pinned = False
+        self.wrote = False
+
+
+@contextmanager
+def routing():
+    """Route the reads and writes inside the block with a fresh state."""
+    token = _state.set(RoutingState())
+    try:
+        yield _state.get()
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Send the reads inside the block to a replica, or to the primary
+    when `enabled` is False, unless the request has written."""
+    state = _state.get()
+    if state is None:
+        with routing():
+            with replica_reads(enabled) as state:
+                yield state
+        return
+    previous, state.replica_reads = state.replica_reads, enabled
+    try:
+        yield state
+    finally:
+        state.replica_reads = previous
+
+
+def reading_from_replica():
+    """Return whether reads currently go to a replica."""
+    state = _state.get()
+    return bool(
+        settings.DATABASE_REPLICAS and state is not None
+        and state.replica_reads and not state.pinned
+    )
+
+
+def sticky_key(user):
+    return f'replica-primary:{user.pk}'
+
+
+def mark_written(user):
+    """Send the reads of `user` to the primary while the replicas may
+    not have their writes yet."""
+    if settings.DATABASE_REPLICAS and user.is_authenticated:
+        get_cache().set(
+            sticky_key(user), True, timeout=settings.DATABASE_REPLICA_LAG
+        )
+
+
+def has_written(user):
+    """Return whether `user` wrote within the replica lag."""
+    if not settings.DATABASE_REPLICAS or not user.is_authenticated:
+        return False
+    return bool(get_cache().get(sticky_key(user)))
+
+
+class ReplicaRouter:
+    """Database router sending opted in reads to the replicas.
+
+    Everything else is left to Django's default routing, which uses the
+    primary unless a query or instance names another database.
+    """
+
+    def db_for_read(self, model, **hints):
+        if reading_from_replica():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Give each request its own routing state and remember the users
+    whose requests wrote.
+
+    Runs in the mode of the handler, so ASGI requests are not moved to
+    the single thread of the sync middleware; the routing state is a
+    context variable, which follows the request into the threads the
+    sync code runs on.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Marks the instance as a coroutine function, as Django's
+            # MiddlewareMixin does, so the handler awaits it.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        with routing() as state:
+            response = self.get_response(request)
+        if state.wrote:
+            self.remember_writer(request)
+        return response
+
+    async def __acall__(self, request):
+        with routing() as state:
+            response = await self.get_response(request)
+        if state.wrote:
+            # Loading the user and setting the cache may block.
+            await sync_to_async(self.remember_writer)(request)
+        return response
+
+    def remember_writer(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None:
+            mark_written(user)
+
+
+class ReplicaReadMixin:
+    """Serve the `replica_actions` of a view from a replica, unless the
+    user wrote within the replica lag."""
+    replica_actions = ('list', 'retrieve')
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(False):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        # Authentication and permission checks read from the primary, a
+        # token created a moment ago may not have been replicated yet.
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions \
+                and not has_written(request.user):
+            _state.get().replica_reads = True
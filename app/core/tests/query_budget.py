@@ -0,0 +1,73 @@
+"""
+Query budget assertions for the test suites.
+"""
+
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+SIZES = (1, 100, 1000)
+
+
+def format_queries(queries):
+    """Return the captured queries as a numbered list."""
+    return '\n'.join(
+        f'{number}. {query["sql"]}'
+        for number, query in enumerate(queries, start=1)
+    )
+
+
+class QueryBudgetMixin:
+    """Assertions on the number of queries code runs.
+
+    Failures list the SQL of the offending run, so the query that was
+    added, or is now run per row, shows up in the test output.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, budget, using=DEFAULT_DB_ALIAS):
+        """Fail if the block runs more than `budget` queries."""
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        queries = context.captured_queries
+        if len(queries) > budget:
+            self.fail(
+                f'{len(queries)} queries run, the budget is {budget}:\n'
+                f'{format_queries(queries)}'
+            )
+
+    def assertConstantQueries(self, request, seed, sizes=SIZES,
+                              budget=None, prepare=None,
+                              using=DEFAULT_DB_ALIAS):
+        """Fail unless `request` runs as many queries at every size.
+
+        Before each run `seed(size)` grows the data to `size` rows and
+        `prepare()`, when given, returns the arguments of `request`;
+        neither counts towards the queries. With a `budget`, the count
+        must also stay within it. Returns what `request` returned at
+        each size.
+        """
+        runs = []
+        results = []
+        for size in sizes:
+            seed(size)
+            args = prepare() if prepare is not None else ()
+            with CaptureQueriesContext(connections[using]) as context:
+                results.append(request(*args))
+            runs.append((size, context.captured_queries))
+
+        counts = {size: len(queries) for size, queries in runs}
+        (small, small_queries), (large, large_queries) = runs[0], runs[-1]
+        if len(set(counts.values())) > 1:
+            self.fail(
+                f'Query count grows with the data: {counts}\n'
+                f'At {small} rows:\n{format_queries(small_queries)}\n'
+                f'At {large} rows:\n{format_queries(large_queries)}'
+            )
+        if budget is not None and counts[large] > budget:
+            self.fail(
+                f'{counts[large]} queries run, the budget is {budget}:\n'
+                f'{format_queries(large_queries)}'
+            )
+        return results
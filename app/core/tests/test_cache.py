@@ -0,0 +1,155 @@
+"""
+Tests for the cache backends.
+"""
+
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from core.cache import LocMemLRUCache, RedisCache, get_cache
+
+
+class FakeRedis:
+    """Local stand-in for a redis client."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiries = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        if isinstance(value, int):
+            value = str(value).encode()
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def incrby(self, key, delta):
+        value = int(self.data.get(key, b'0')) + delta
+        self.data[key] = str(value).encode()
+        return value
+
+    def expire(self, key, seconds):
+        self.expiries[key] = seconds
+
+    def flushdb(self):
+        self.data.clear()
+
+
+class LocMemLRUCacheTests(SimpleTestCase):
+    """Tests for the in-process LRU cache."""
+
+    def test_get_and_set(self):
+        """Test values are stored and counted as hits and misses."""
+        cache = LocMemLRUCache()
+        cache.set('a', [1, 2])
+
+        self.assertEqual(cache.get('a'), [1, 2])
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_least_recently_used_evicted(self):
+        """Test the least recently used entry makes room for new ones."""
+        cache = LocMemLRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    @patch('core.cache.time.monotonic')
+    def test_expired_entries_missed(self, patched_monotonic):
+        """Test entries are not returned after their timeout."""
+        patched_monotonic.return_value = 100
+        cache = LocMemLRUCache(default_timeout=10)
+        cache.set('a', 1)
+
+        patched_monotonic.return_value = 111
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_incr(self):
+        """Test counters start from zero and are incremented."""
+        cache = LocMemLRUCache()
+
+        self.assertEqual(cache.incr('version', 0), 0)
+        self.assertEqual(cache.incr('version'), 1)
+        self.assertEqual(cache.get('version'), 1)
+
+    @patch('core.cache.time.monotonic')
+    def test_incr_timeout(self, patched_monotonic):
+        """Test counters created with a timeout expire and start over,
+        and are evicted like other entries."""
+        patched_monotonic.return_value = 100
+        cache = LocMemLRUCache(max_entries=2)
+        cache.incr('a', timeout=10)
+
+        patched_monotonic.return_value = 105
+        self.assertEqual(cache.incr('a', timeout=10), 2)
+
+        patched_monotonic.return_value = 110
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.incr('a', timeout=10), 1)
+
+        cache.incr('b')
+        cache.incr('c')
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('a'))
+
+
+class RedisCacheTests(SimpleTestCase):
+    """Tests for the redis cache."""
+
+    def test_values_round_trip(self):
+        """Test values are pickled and counters kept as integers."""
+        client = FakeRedis()
+        cache = RedisCache(client=client, key_prefix='p:')
+        cache.set('data', {'a': [1]})
+        cache.incr('version', 3)
+
+        self.assertEqual(cache.get('data'), {'a': [1]})
+        self.assertEqual(cache.get('version'), 3)
+        self.assertEqual(client.data['p:version'], b'3')
+        self.assertIsNone(cache.get('missing'))
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_incr_timeout(self):
+        """Test counters get their timeout when created."""
+        client = FakeRedis()
+        cache = RedisCache(client=client)
+
+        cache.incr('a', timeout=10)
+        self.assertEqual(client.expiries, {'a': 10})
+        client.expiries.clear()
+        cache.incr('a', timeout=10)
+        cache.incr('b')
+
+        self.assertEqual(cache.get('a'), 2)
+        self.assertEqual(client.expiries, {})
+
+    def test_configured_by_alias(self):
+        """Test caches are built from the CORE_CACHES setting."""
+        client = FakeRedis()
+        caches = {
+            'shared': {
+                'BACKEND': 'core.cache.RedisCache',
+                'OPTIONS': {'client': client},
+            },
+        }
+
+        with override_settings(CORE_CACHES=caches):
+            cache = get_cache('shared')
+            cache.set('a', 1)
+
+            self.assertIs(get_cache('shared'), cache)
+            self.assertEqual(client.data['a'], b'1')
@@ -2,13 +2,22 @@
 Tests for custom management commands.
 """
 
+from datetime import timedelta
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.db import connections
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core.db.copy import CopyStream, copy_rows
+from core.models import Event, OrganizerStats
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -34,3 +43,132 @@ class CommandTests(SimpleTestCase):
         self.assertEqual(patched_check.call_count, 6)
 
         patched_check.assert_called_with(databases=['default'])
+
+
+@override_settings(AUTH_TOKEN_TTL=60)
+class PurgeExpiredTokensTests(TestCase):
+    """Test purging the expired tokens."""
+
+    def test_purge_expired_tokens(self):
+        """Test expired tokens are deleted in batches and fresh ones
+        kept."""
+        User = get_user_model()
+        expired = []
+        for number in range(5):
+            user = User.objects.create_user(email=f'user{number}@example.com')
+            expired.append(Token.objects.create(user=user).key)
+        Token.objects.update(created=timezone.now() - timedelta(minutes=2))
+        fresh = Token.objects.create(
+            user=User.objects.create_user(email='fresh@example.com')
+        )
+
+        call_command('purge_expired_tokens', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(
+            list(Token.objects.values_list('key', flat=True)), [fresh.key]
+        )
+
+
+class SeedDataTests(TestCase):
+    """Test generating data with the seed_data command."""
+
+    def seed(self, **options):
+        call_command('seed_data', stdout=StringIO(), **options)
+
+    def test_seed_data(self):
+        """Test users, tokens and events are loaded."""
+        self.seed(users=20, tokens=5, events=50, organizers=3,
+                  chunk_size=7)
+
+        users = get_user_model().objects.filter(
+            email__endswith='@seed.example.com'
+        )
+        self.assertEqual(users.count(), 20)
+        self.assertTrue(users.first().check_password('seed123'))
+        self.assertEqual(
+            len(set(users.values_list('password', flat=True))), 1
+        )
+        self.assertEqual(Token.objects.count(), 5)
+        self.assertEqual(Event.objects.count(), 50)
+        organizers = list(users.order_by('id').values_list('id', flat=True))
+        self.assertEqual(
+            set(Event.objects.values_list('organizer_id', flat=True)),
+            set(organizers[:3]),
+        )
+        event = Event.objects.first()
+        self.assertEqual(event.seats_taken, 0)
+        self.assertIsNotNone(event.updated_at)
+        self.assertEqual(
+            sum(OrganizerStats.objects.values_list('event_count', flat=True)),
+            50,
+        )
+
+    def test_seed_data_again(self):
+        """Test a second run adds to the data of the first."""
+        self.seed(users=5, events=5)
+        self.seed(users=5, tokens=2, events=5)
+
+        self.assertEqual(get_user_model().objects.count(), 10)
+        self.assertEqual(Token.objects.count(), 7)
+        self.assertEqual(Event.objects.count(), 10)
+
+    def test_seed_data_bulk_create_fallback(self):
+        """Test other databases get the rows through bulk_create."""
+        with patch.object(connections['default'], 'vendor', 'sqlite'):
+            self.seed(users=5, events=5, chunk_size=2)
+
+        self.assertEqual(get_user_model().objects.count(), 5)
+        self.assertEqual(Token.objects.count(), 5)
+        self.assertEqual(Event.objects.count(), 5)
+
+    def test_copy_escapes_values(self):
+        """Test tabs, newlines and backslashes survive the copy."""
+        name = 'Tab\there\\ and\nnewline\r'
+
+        copy_rows(get_user_model(), ['email', 'name', 'password'], [
+            ('copy@example.com', name, ''),
+        ])
+
+        user = get_user_model().objects.get(email='copy@example.com')
+        self.assertEqual(user.name, name)
+
+    def test_copy_stream_reads_in_pieces(self):
+        """Test the stream hands out the rows in pieces of the size
+        asked for."""
+        stream = CopyStream([(1, 'a'), (2, None), (3, True)])
+
+        pieces = iter(lambda: stream.read(4), '')
+
+        self.assertEqual(''.join(pieces), '1\ta\n2\t\\N\n3\tt\n')
+
+
+class RebuildStatsTests(TestCase):
+    """Test recounting the organizer statistics."""
+
+    def test_rebuild_stats(self):
+        """Test missing, stale and emptied rows are recounted."""
+        call_command('seed_data', users=6, events=12, organizers=3,
+                     stdout=StringIO())
+        organizers = list(
+            OrganizerStats.objects.order_by('pk')
+            .values_list('organizer_id', flat=True)
+        )
+        OrganizerStats.objects.filter(organizer_id=organizers[0]).delete()
+        OrganizerStats.objects.filter(organizer_id=organizers[1]).update(
+            event_count=100, upcoming_since=timezone.localdate()
+            - timedelta(days=3),
+        )
+        Event.objects.filter(organizer_id=organizers[2]).delete()
+        expected = {organizers[0]: 4, organizers[1]: 4, organizers[2]: 0}
+
+        out = StringIO()
+        call_command('rebuild_stats', batch_size=2, stdout=out)
+
+        self.assertIn('Rebuilt the statistics of 3 organizers',
+                      out.getvalue())
+        self.assertEqual(dict(
+            OrganizerStats.objects.values_list('organizer_id', 'event_count')
+        ), expected)
+        self.assertFalse(OrganizerStats.objects.exclude(
+            upcoming_since=timezone.localdate()
+        ).exists())
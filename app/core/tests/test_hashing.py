@@ -0,0 +1,183 @@
+"""
+Tests for the password hashing policy and pool.
+"""
+
+import threading
+import unittest
+from importlib.util import find_spec
+from unittest.mock import Mock, patch
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model, hashers
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import hashing
+
+TOKEN_URL = reverse('user:token')
+
+
+def hasher_options(**options):
+    """Return the hasher options of the settings with `options`
+    changed."""
+    return dict(settings.PASSWORD_HASHER_OPTIONS, **options)
+
+
+def hashers_preferring(name):
+    """Return the PASSWORD_HASHERS setting preferring hasher `name`."""
+    preferred = settings.PASSWORD_HASHER_CLASSES[name]
+    return [preferred] + [
+        path for path in settings.PASSWORD_HASHER_CLASSES.values()
+        if path != preferred
+    ]
+
+
+@override_settings(
+    PASSWORD_HASHER_OPTIONS=hasher_options(pbkdf2_iterations=1000)
+)
+class HashingPoolTests(SimpleTestCase):
+    """Tests for hashing passwords on the pool."""
+
+    def test_hashers_cost_from_settings(self):
+        """Test the cost of the hashers comes from the settings."""
+        encoded = hashing.make_password('test123')
+
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$1000$'))
+
+    def test_hashing_runs_on_pool(self):
+        """Test the hashers run on the pool threads."""
+        threads = []
+        make_password = hashers.make_password
+
+        def record(password):
+            threads.append(threading.current_thread().name)
+            return make_password(password)
+
+        with patch.object(hashers, 'make_password', record):
+            hashing.make_password('test123')
+
+        self.assertTrue(threads[0].startswith('password-hashing'))
+
+    def test_check_password(self):
+        """Test checking passwords against hashes."""
+        encoded = hashing.make_password('test123')
+        setter = Mock()
+
+        self.assertTrue(hashing.check_password('test123', encoded, setter))
+        self.assertFalse(hashing.check_password('wrong', encoded, setter))
+        self.assertFalse(hashing.check_password(None, encoded, setter))
+        self.assertFalse(hashing.check_password('test123', '!unusable'))
+        setter.assert_not_called()
+
+    def test_check_password_outdated_cost(self):
+        """Test the setter is called for a correct password hashed with
+        another cost."""
+        encoded = hashing.make_password('test123')
+        setter = Mock()
+
+        with self.settings(
+            PASSWORD_HASHER_OPTIONS=hasher_options(pbkdf2_iterations=2000)
+        ):
+            self.assertTrue(
+                hashing.check_password('test123', encoded, setter)
+            )
+
+        setter.assert_called_once_with('test123')
+
+    def test_async_hashing(self):
+        """Test the async functions hash and check on the pool."""
+        encoded = async_to_sync(hashing.amake_password)('test123')
+
+        self.assertEqual(
+            async_to_sync(hashing.acheck_password)('test123', encoded),
+            (True, False),
+        )
+        self.assertEqual(
+            async_to_sync(hashing.acheck_password)('wrong', encoded),
+            (False, False),
+        )
+
+    def test_pool_resized(self):
+        """Test the pool is replaced when its size changes."""
+        with self.settings(PASSWORD_HASHING_WORKERS=1):
+            self.assertEqual(hashing.get_executor()._max_workers, 1)
+            self.assertTrue(hashing.check_password(
+                'test123', hashing.make_password('test123')
+            ))
+
+    @unittest.skipUnless(
+        find_spec('argon2') is not None,
+        'argon2-cffi is not installed',
+    )
+    def test_argon2_policy(self):
+        """Test the argon2 costs come from the settings."""
+        with self.settings(
+            PASSWORD_HASHERS=hashers_preferring('argon2'),
+            PASSWORD_HASHER_OPTIONS=hasher_options(
+                argon2_time_cost=1, argon2_memory_cost=1024,
+                argon2_parallelism=1,
+            ),
+        ):
+            encoded = hashing.make_password('test123')
+
+        self.assertIn('$m=1024,t=1,p=1$', encoded)
+
+    @unittest.skipUnless(
+        find_spec('bcrypt') is not None,
+        'bcrypt is not installed',
+    )
+    def test_bcrypt_policy(self):
+        """Test the bcrypt rounds come from the settings."""
+        with self.settings(
+            PASSWORD_HASHERS=hashers_preferring('bcrypt'),
+            PASSWORD_HASHER_OPTIONS=hasher_options(bcrypt_rounds=4),
+        ):
+            encoded = hashing.make_password('test123')
+
+        self.assertTrue(encoded.startswith('bcrypt_sha256$$2b$04$'))
+
+
+@override_settings(
+    PASSWORD_HASHER_OPTIONS=hasher_options(pbkdf2_iterations=1000)
+)
+class RehashOnLoginTests(TestCase):
+    """Tests for upgrading password hashes when users log in."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com', password='test123'
+        )
+
+    def login(self, password='test123'):
+        return self.client.post(TOKEN_URL, {
+            'email': 'test@example.com',
+            'password': password,
+        })
+
+    def test_password_rehashed_on_login(self):
+        """Test logging in rehashes a password with an outdated cost."""
+        with self.settings(
+            PASSWORD_HASHER_OPTIONS=hasher_options(pbkdf2_iterations=2000)
+        ):
+            res = self.login()
+
+        self.assertEqual(res.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
+        self.assertTrue(self.user.check_password('test123'))
+
+    def test_password_kept_on_failed_login(self):
+        """Test a failed login leaves the password hash alone."""
+        encoded = self.user.password
+
+        with self.settings(
+            PASSWORD_HASHER_OPTIONS=hasher_options(pbkdf2_iterations=2000)
+        ):
+            res = self.login('wrong')
+
+        self.assertEqual(res.status_code, 400)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, encoded)
@@ -0,0 +1,252 @@
+"""
+Tests for the request metrics.
+"""
+
+import asyncio
+import re
+import warnings
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, \
+    TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import metrics
+from core.middleware import MetricsMiddleware, QueryBudgetWarning
+from core.models import Event
+from event.cache import get_listing_cache
+
+ALL_EVENTS_URL = reverse('event:all-events')
+ASYNC_ALL_EVENTS_URL = reverse('event:async-all-events')
+METRICS_URL = reverse('metrics')
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': '2023-12-22',
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+class MetricTypeTests(SimpleTestCase):
+    """Tests for the metric types and their text format."""
+
+    def test_histogram_samples(self):
+        """Test histograms render cumulative buckets, sum and count."""
+        histogram = metrics.Histogram('latency', 'Latency.', ('route',),
+                                      (0.1, 1))
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value, 'a:b')
+
+        samples = [
+            (suffix, dict(labels).get('le'), value)
+            for suffix, labels, value in histogram.samples()
+        ]
+
+        self.assertEqual(samples, [
+            ('_bucket', '0.1', 2),
+            ('_bucket', '1', 3),
+            ('_bucket', '+Inf', 4),
+            ('_sum', None, 2.65),
+            ('_count', None, 4),
+        ])
+
+    def test_label_values_escaped(self):
+        """Test quotes and backslashes in labels are escaped."""
+        self.assertEqual(
+            metrics.format_labels([('route', 'a"b\\c')]),
+            '{route="a\\"b\\\\c"}',
+        )
+
+
+@override_settings(METRICS_PUBLIC=True)
+class MetricsMiddlewareTests(TestCase):
+    """Tests for recording requests and serving the metrics."""
+
+    def setUp(self):
+        metrics.reset()
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            email='test@example.com', password='test123'
+        )
+        create_event(organizer=user)
+
+    def get_metrics(self):
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, 200)
+        return res.content.decode()
+
+    def test_request_recorded_by_url_name(self):
+        """Test requests are counted and timed by url name."""
+        self.client.get(ALL_EVENTS_URL)
+
+        text = self.get_metrics()
+
+        labels = 'route="event:all-events",method="GET"'
+        self.assertIn(
+            f'http_requests_total{{{labels},status="200"}} 1', text
+        )
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 1',
+                      text)
+        self.assertIn(f'http_request_db_queries_count{{{labels}}} 1', text)
+        self.assertIn(
+            f'http_request_render_duration_seconds_count{{{labels}}} 1', text
+        )
+        self.assertIn(f'http_response_size_bytes_count{{{labels}}} 1', text)
+
+    def test_queries_counted(self):
+        """Test the queries of a request are counted."""
+        with self.assertNumQueries(1):
+            self.client.get(ALL_EVENTS_URL, {'page_size': 5})
+
+        text = self.get_metrics()
+
+        self.assertIn(
+            'http_request_db_queries_sum{route="event:all-events",'
+            'method="GET"} 1',
+            text,
+        )
+
+    def test_cache_and_pool_stats_exported(self):
+        """Test the cache and pool counters are part of the metrics."""
+        self.client.get(ALL_EVENTS_URL)
+
+        text = self.get_metrics()
+
+        self.assertIn('core_cache_hits{cache="events"}', text)
+        self.assertIn('# TYPE db_pool_in_use gauge', text)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token_required(self):
+        """Test the metrics need the token when one is set."""
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, 401)
+
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(res.status_code, 200)
+
+    @override_settings(METRICS_PUBLIC=False)
+    def test_metrics_not_public_by_default(self):
+        """Test the metrics are not served without a token unless they
+        are made public or DEBUG is on."""
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, 404)
+
+        with override_settings(DEBUG=True):
+            res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, 200)
+
+    def test_unknown_methods_grouped(self):
+        """Test methods outside the standard ones share one label, so
+        clients cannot create series."""
+        for method in ('BREW', 'PROPFIND'):
+            self.client.generic(method, ALL_EVENTS_URL)
+
+        text = self.get_metrics()
+
+        self.assertIn(
+            'http_requests_total{route="event:all-events",method="other",'
+            'status="405"} 2',
+            text,
+        )
+        self.assertNotIn('BREW', text)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        """Test nothing is recorded when the metrics are disabled."""
+        self.client.get(ALL_EVENTS_URL)
+
+        self.assertNotIn('event:all-events', metrics.render())
+
+    @override_settings(QUERY_BUDGET=0)
+    def test_query_budget_warning(self):
+        """Test a warning is raised above the query budget."""
+        with self.assertWarns(QueryBudgetWarning) as context:
+            self.client.get(ALL_EVENTS_URL)
+
+        self.assertIn('event:all-events ran 1 queries', str(context.warning))
+        self.assertIn('SELECT', str(context.warning))
+        self.assertIn(
+            'http_request_query_budget_exceeded_total{route='
+            '"event:all-events",method="GET"} 1',
+            metrics.render(),
+        )
+
+    @override_settings(QUERY_BUDGET=0, QUERY_BUDGET_WARNINGS=False)
+    def test_query_budget_only_counted_in_production(self):
+        """Test requests over budget are only counted outside of DEBUG
+        and the tests."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', QueryBudgetWarning)
+            self.client.get(ALL_EVENTS_URL)
+
+        self.assertIn(
+            'http_request_query_budget_exceeded_total{route='
+            '"event:all-events",method="GET"} 1',
+            metrics.render(),
+        )
+
+    @override_settings(QUERY_REPEAT_LIMIT=2)
+    def test_repeated_query_warning(self):
+        """Test a query repeated for every row warns as an N+1."""
+        def view(request):
+            for event in Event.objects.all():
+                get_user_model().objects.get(pk=event.organizer_id)
+                get_user_model().objects.get(pk=event.organizer_id)
+                get_user_model().objects.get(pk=event.organizer_id)
+            return HttpResponse()
+
+        middleware = MetricsMiddleware(view)
+        with self.assertWarns(QueryBudgetWarning) as context:
+            middleware(RequestFactory().get('/'))
+
+        self.assertIn('repeated 3 times', str(context.warning))
+        self.assertIn(connection.ops.quote_name('core_user'),
+                      str(context.warning))
+
+
+class AsyncMetricsMiddlewareTests(TransactionTestCase):
+    """Tests for recording ASGI requests.
+
+    The async views query from pool threads with their own connections,
+    so the data has to be committed.
+    """
+
+    def setUp(self):
+        metrics.reset()
+        get_listing_cache().clear()
+        user = get_user_model().objects.create_user(
+            email='test@example.com', password='test123'
+        )
+        create_event(organizer=user)
+
+    async def test_async_request_recorded(self):
+        """Test the middleware is awaited in async mode and counts the
+        queries the async views run on their pool."""
+        async def view(request):
+            return HttpResponse()
+
+        self.assertTrue(
+            asyncio.iscoroutinefunction(MetricsMiddleware(view))
+        )
+
+        res = await AsyncClient().get(ASYNC_ALL_EVENTS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        queries = re.search(
+            r'http_request_db_queries_sum\{route="event:async-all-events",'
+            r'method="GET"\} (\d+)',
+            metrics.render(),
+        )
+        self.assertGreater(int(queries.group(1)), 0)
@@ -0,0 +1,341 @@
+"""
+Tests for the database connection pool.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+from django.db import (
+    DEFAULT_DB_ALIAS, OperationalError, connection, connections,
+)
+from django.test import SimpleTestCase, TestCase
+from psycopg2 import extensions
+
+from core.db.pool import (
+    ConnectionPool, PoolTimeout, close_pools, pool_stats,
+)
+
+
+class FakeInfo:
+
+    def __init__(self):
+        self.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, sql):
+        if self.connection.broken:
+            raise OperationalError('server closed the connection')
+
+
+class FakeConnection:
+    """Local stand-in for a psycopg2 connection."""
+
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.info = FakeInfo()
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+def create_pool(**options):
+    """Create and return a pool of fake connections."""
+    return ConnectionPool(FakeConnection, **options)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Tests for the connection pool."""
+
+    def test_connection_reused(self):
+        """Test a connection handed back is handed out again."""
+        pool = create_pool()
+
+        conn = pool.get()
+        pool.put(conn)
+
+        self.assertIs(pool.get(), conn)
+        self.assertEqual(pool.stats()['created'], 1)
+        self.assertEqual(pool.stats()['checkouts'], 2)
+
+    def test_min_size_opened_on_first_use(self):
+        """Test the pool opens its minimum size up front."""
+        pool = create_pool(min_size=3)
+
+        pool.get()
+
+        self.assertEqual(pool.stats()['size'], 3)
+        self.assertEqual(pool.stats()['idle'], 2)
+
+    def test_wait_timeout(self):
+        """Test checking out of an exhausted pool times out."""
+        pool = create_pool(max_size=1, wait_timeout=0.05)
+        pool.get()
+
+        with self.assertRaises(PoolTimeout):
+            pool.get()
+
+        self.assertEqual(pool.stats()['timeouts'], 1)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_waiter_served_when_connection_returned(self):
+        """Test a waiting caller gets the connection handed back."""
+        pool = create_pool(max_size=1, wait_timeout=5)
+        conn = pool.get()
+        received = []
+
+        waiter = threading.Thread(target=lambda: received.append(pool.get()))
+        waiter.start()
+        time.sleep(0.05)
+        pool.put(conn)
+        waiter.join()
+
+        self.assertEqual(received, [conn])
+        self.assertEqual(pool.stats()['waits'], 1)
+
+    def test_open_transaction_rolled_back(self):
+        """Test connections are handed back outside of a transaction."""
+        pool = create_pool()
+        conn = pool.get()
+        conn.info.transaction_status = extensions.TRANSACTION_STATUS_INERROR
+
+        pool.put(conn)
+
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertIs(pool.get(), conn)
+
+    def test_discarded_connection_closed(self):
+        """Test discarded connections are closed and replaced."""
+        pool = create_pool(max_size=1)
+        conn = pool.get()
+
+        pool.put(conn, discard=True)
+
+        self.assertTrue(conn.closed)
+        self.assertIsNot(pool.get(), conn)
+
+    def test_closed_connection_replaced(self):
+        """Test connections closed while idle are not handed out."""
+        pool = create_pool()
+        conn = pool.get()
+        pool.put(conn)
+        conn.closed = 1
+
+        self.assertIsNot(pool.get(), conn)
+
+    def test_max_lifetime(self):
+        """Test connections past their lifetime are closed."""
+        pool = create_pool(max_lifetime=0)
+        conn = pool.get()
+
+        pool.put(conn)
+
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_health_check(self):
+        """Test idle connections failing the check are replaced."""
+        pool = create_pool(health_check_after=0)
+        conn = pool.get()
+        pool.put(conn)
+        conn.broken = True
+
+        self.assertIsNot(pool.get(), conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['failed_checks'], 1)
+
+    def test_checked_connection_counted(self):
+        """Test a connection being health checked or reset still counts
+        toward the maximum size, so no other caller opens past it."""
+        pool = create_pool(max_size=1, wait_timeout=0, health_check_after=0)
+        conn = pool.get()
+        conn.info.transaction_status = extensions.TRANSACTION_STATUS_INERROR
+        timeouts = []
+
+        def get_elsewhere(*args):
+            try:
+                pool.get()
+            except PoolTimeout:
+                timeouts.append(pool.stats()['size'])
+            return FakeCursor(conn)
+
+        with patch.object(conn, 'rollback', side_effect=get_elsewhere):
+            pool.put(conn)
+        with patch.object(conn, 'cursor', side_effect=get_elsewhere):
+            self.assertIs(pool.get(), conn)
+
+        self.assertEqual(timeouts, [1, 1])
+        self.assertEqual(pool.stats()['created'], 1)
+
+    def test_idle_connections_closed(self):
+        """Test connections idle too long are closed down to the
+        minimum size."""
+        pool = create_pool(min_size=1, max_idle=0)
+        first, second = pool.get(), pool.get()
+
+        pool.put(first)
+        pool.put(second)
+
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_stats(self):
+        """Test the pool reports its utilization."""
+        pool = create_pool(max_size=4)
+        conns = [pool.get() for _ in range(3)]
+        pool.put(conns[0])
+
+        stats = pool.stats()
+
+        self.assertEqual(stats['size'], 3)
+        self.assertEqual(stats['in_use'], 2)
+        self.assertEqual(stats['idle'], 1)
+        self.assertEqual(stats['utilization'], 0.5)
+
+
+class PooledBackendTests(TestCase):
+    """Tests for the pooled PostgreSQL backend."""
+
+    def create_wrapper(self, alias='pool-test', **pool):
+        """Return a connection to the test database with its own pool."""
+        wrapper = type(connections[DEFAULT_DB_ALIAS])(
+            {**connection.settings_dict, 'POOL': pool or {}}, alias=alias
+        )
+        self.addCleanup(self.close_wrapper, wrapper)
+        return wrapper
+
+    def close_wrapper(self, wrapper):
+        wrapper.close()
+        close_pools(alias=wrapper.alias)
+
+    def test_connection_reused(self):
+        """Test closing hands the connection back for the next use."""
+        wrapper = self.create_wrapper()
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+
+        wrapper.close()
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        self.assertIs(wrapper.connection, raw)
+        self.assertFalse(raw.closed)
+        self.assertEqual(wrapper.get_pool().stats()['created'], 1)
+
+    def test_prefilled_connection_checked_out(self):
+        """Test a connection opened to fill the pool is health checked
+        and handed out in autocommit, as Django expects."""
+        wrapper = self.create_wrapper(MIN_SIZE=1, HEALTH_CHECK_AFTER=0)
+
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        self.assertTrue(wrapper.get_autocommit())
+        self.assertEqual(wrapper.get_pool().stats()['created'], 1)
+
+    def test_health_checked_after_transaction(self):
+        """Test the health check of a connection handed back outside
+        autocommit leaves no transaction open."""
+        wrapper = self.create_wrapper(HEALTH_CHECK_AFTER=0)
+        wrapper.set_autocommit(False)
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        raw = wrapper.connection
+        wrapper.close()
+
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        self.assertIs(wrapper.connection, raw)
+        self.assertTrue(wrapper.get_autocommit())
+
+    def test_transaction_rolled_back(self):
+        """Test a connection closed mid transaction is rolled back."""
+        wrapper = self.create_wrapper()
+        wrapper.set_autocommit(False)
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        raw = wrapper.connection
+
+        wrapper.close()
+
+        self.assertEqual(
+            raw.info.transaction_status, extensions.TRANSACTION_STATUS_IDLE
+        )
+        wrapper.ensure_connection()
+        self.assertTrue(wrapper.get_autocommit())
+
+    def test_closed_in_atomic_block_not_reused(self):
+        """Test a connection closed in an atomic block is not pooled."""
+        wrapper = self.create_wrapper()
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.in_atomic_block = True
+
+        wrapper.close()
+        wrapper.in_atomic_block = False
+        wrapper.connection = None
+
+        self.assertTrue(raw.closed)
+        self.assertEqual(wrapper.get_pool().stats()['size'], 0)
+
+    def test_pool_timeout_raises_database_error(self):
+        """Test an exhausted pool fails like a refused connection."""
+        first = self.create_wrapper(MAX_SIZE=1, WAIT_TIMEOUT=0.05)
+        second = self.create_wrapper(MAX_SIZE=1, WAIT_TIMEOUT=0.05)
+        self.assertIs(first.get_pool(), second.get_pool())
+        first.ensure_connection()
+
+        with self.assertRaises(OperationalError):
+            second.ensure_connection()
+
+    def test_pool_disabled(self):
+        """Test `POOL: None` connects per use."""
+        wrapper = type(connections[DEFAULT_DB_ALIAS])(
+            {**connection.settings_dict, 'POOL': None}, alias='no-pool'
+        )
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+
+        wrapper.close()
+
+        self.assertIsNone(wrapper.get_pool())
+        self.assertTrue(raw.closed)
+
+    def test_pool_stats(self):
+        """Test the stats of every pool are reported."""
+        wrapper = self.create_wrapper()
+        wrapper.ensure_connection()
+
+        stats = pool_stats()
+
+        key = f'pool-test:{connection.settings_dict["NAME"]}'
+        self.assertEqual(stats[key]['in_use'], 1)
+
+    @patch('core.db.pool.ConnectionPool.get')
+    def test_no_db_connection_not_pooled(self, get):
+        """Test the connections made to create databases bypass the
+        pool."""
+        with connection._nodb_cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        get.assert_not_called()
@@ -0,0 +1,425 @@
+"""
+Query budgets of every api route.
+
+Each route is requested with 1, 100 and 1,000 rows of every kind in the
+database and must run the same number of queries each time, within its
+budget. A route added without a test here fails `test_every_route_covered`.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import URLResolver, get_resolver, resolve, reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Enrollment, Event, OrganizerStats, WaitlistEntry
+from core.tests.query_budget import QueryBudgetMixin
+from event.cache import get_listing_cache
+
+# Django's admin, not part of the api.
+EXEMPT_NAMESPACES = {'admin'}
+
+# The async views run the sync views on executor threads, whose
+# connections are outside the test transaction; they are held to the
+# budgets of the views they wrap.
+ASYNC_ROUTES = {
+    'event:async-all-events': ('event:all-events', []),
+    'event:async-upcoming-events': ('event:upcoming-events', []),
+    'event:async-event-detail': ('event:event-detail', [1]),
+}
+
+
+def route_names(resolver=None, namespace=''):
+    """Return the names of every route of the url configuration."""
+    names = set()
+    for pattern in (resolver or get_resolver()).url_patterns:
+        if isinstance(pattern, URLResolver):
+            prefix = namespace
+            if pattern.namespace:
+                if pattern.namespace in EXEMPT_NAMESPACES:
+                    continue
+                prefix += f'{pattern.namespace}:'
+            names |= route_names(pattern, prefix)
+        elif pattern.name:
+            names.add(namespace + pattern.name)
+    return names
+
+
+def covers(*routes):
+    """Mark a test as holding `routes` to a query budget."""
+    def decorator(test):
+        test.routes = routes
+        return test
+    return decorator
+
+
+def create_user(email, password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+        name='Test User',
+    )
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Concert',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': date(2099, 12, 22),
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+class RouteQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Tests holding every route to a constant query count."""
+
+    def setUp(self):
+        self.organizer = create_user('organizer@example.com')
+        self.attendee = create_user('attendee@example.com')
+        self.waiter = create_user('waiter@example.com')
+        self.rows = 0
+        self.counter = 0
+
+    def seed(self, size):
+        """Grow the data to `size` full events of the organizer, each
+        with the attendee enrolled and the waiter on the waitlist."""
+        events = Event.objects.bulk_create(
+            Event(
+                organizer=self.organizer,
+                title=f'Concert {number}',
+                description='An evening of music',
+                venue='Online',
+                ticket_price=Decimal(number % 50),
+                date=date(2099, 1 + number % 12, 1 + number % 28),
+                time='13:00',
+                max_attendees=1,
+                seats_taken=1,
+                waitlist_tail=1,
+            )
+            for number in range(self.rows, size)
+        )
+        Enrollment.objects.bulk_create(
+            Enrollment(user=self.attendee, event=event) for event in events
+        )
+        WaitlistEntry.objects.bulk_create(
+            WaitlistEntry(user=self.waiter, event=event, ticket=1)
+            for event in events
+        )
+        OrganizerStats.objects.rebuild([self.organizer.pk])
+        self.rows = size
+        # Listings cached at a smaller size would be served without a
+        # query.
+        get_listing_cache().clear()
+
+    def unique(self):
+        self.counter += 1
+        return self.counter
+
+    def call(self, method, url, data=None, expected=status.HTTP_200_OK):
+        """Request `url` and check the status code."""
+        res = getattr(self.client, method)(url, data, format='json')
+        if res.streaming:
+            b''.join(res.streaming_content)
+        else:
+            self.assertEqual(res.status_code, expected, res.content)
+        self.assertEqual(res.status_code, expected)
+        return res
+
+    def assertRouteQueries(self, budget, method, url, data=None, user=None,
+                           expected=status.HTTP_200_OK, prepare=None):
+        """Assert a request runs at most `budget` queries at any size.
+
+        `prepare` returns the url and data of each request, for requests
+        needing a fresh target.
+        """
+        def request(url=url, data=data):
+            return self.call(method, url, data, expected)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+        # Every assertion grows the data from scratch.
+        with transaction.atomic():
+            self.rows = 0
+            self.assertConstantQueries(
+                request, self.seed, budget=budget, prepare=prepare
+            )
+            transaction.set_rollback(True)
+
+    def test_every_route_covered(self):
+        """Test every route of the api has a query budget test."""
+        covered = set(ASYNC_ROUTES)
+        for name in dir(self):
+            covered.update(getattr(getattr(self, name), 'routes', ()))
+
+        self.assertEqual(route_names() - covered, set())
+
+    def test_async_routes_wrap_covered_views(self):
+        """Test the async routes run the views tested here."""
+        for name, (sync_name, args) in ASYNC_ROUTES.items():
+            view = resolve(reverse(name, args=args)).func.__wrapped__
+            sync_view = resolve(reverse(sync_name, args=args)).func
+
+            self.assertIs(view.cls, sync_view.cls)
+
+    @covers('api-schema', 'api-docs', 'metrics')
+    @override_settings(METRICS_PUBLIC=True)
+    def test_schema_docs_and_metrics(self):
+        """Test the schema, docs and metrics run no queries."""
+        self.assertRouteQueries(0, 'get', reverse('api-schema'))
+        self.assertRouteQueries(0, 'get', reverse('api-docs'))
+        self.assertRouteQueries(0, 'get', reverse('metrics'))
+
+    @covers('user:create')
+    def test_user_create(self):
+        """Test signing up."""
+        def prepare():
+            return reverse('user:create'), {
+                'email': f'new-{self.unique()}@example.com',
+                'password': 'test123',
+                'name': 'New User',
+            }
+
+        self.assertRouteQueries(
+            2, 'post', None, expected=status.HTTP_201_CREATED,
+            prepare=prepare,
+        )
+
+    @covers('user:token', 'user:token-refresh')
+    def test_tokens(self):
+        """Test logging in and refreshing the token."""
+        def prepare_login():
+            Token.objects.filter(user=self.attendee).delete()
+            return reverse('user:token'), {
+                'email': 'attendee@example.com',
+                'password': 'test123',
+            }
+
+        self.assertRouteQueries(6, 'post', None, prepare=prepare_login)
+
+        def prepare_refresh():
+            Token.objects.get_or_create(user=self.attendee)
+            return reverse('user:token-refresh'), None
+
+        self.assertRouteQueries(
+            5, 'post', None, user=self.attendee, prepare=prepare_refresh
+        )
+
+    @covers('user:me')
+    def test_me(self):
+        """Test reading and updating the profile."""
+        url = reverse('user:me')
+
+        self.assertRouteQueries(0, 'get', url, user=self.attendee)
+        # Updates read the user again rather than save the cached one.
+        self.assertRouteQueries(
+            3, 'patch', url, {'name': 'Renamed'}, user=self.attendee
+        )
+
+    @covers('event:api-root', 'enrollment:api-root')
+    def test_api_roots(self):
+        """Test the router roots run no queries."""
+        self.assertRouteQueries(0, 'get', reverse('event:api-root'))
+        self.assertRouteQueries(0, 'get', reverse('enrollment:api-root'))
+
+    @covers('event:event-list')
+    def test_organized_events(self):
+        """Test listing and creating organized events."""
+        url = reverse('event:event-list')
+
+        self.assertRouteQueries(1, 'get', url, user=self.organizer)
+        self.assertRouteQueries(
+            1, 'get', url, {'page_size': 20, 'ordering': 'ticket_price'},
+            user=self.organizer,
+        )
+        self.assertRouteQueries(4, 'post', url, {
+            'title': 'Created',
+            'venue': 'Online',
+            'ticket_price': '10.00',
+            'date': '2099-12-22',
+            'time': '13:00',
+        }, user=self.organizer, expected=status.HTTP_201_CREATED)
+
+    @covers('event:event-detail')
+    def test_organized_event_detail(self):
+        """Test reading, updating and deleting an organized event."""
+        event = create_event(self.organizer)
+        url = reverse('event:event-detail', args=[event.id])
+
+        self.assertRouteQueries(2, 'get', url, user=self.organizer)
+        self.assertRouteQueries(
+            4, 'patch', url, {'title': 'Renamed'}, user=self.organizer
+        )
+
+        def prepare():
+            event = create_event(self.organizer)
+            return reverse('event:event-detail', args=[event.id]), None
+
+        self.assertRouteQueries(
+            7, 'delete', None, user=self.organizer,
+            expected=status.HTTP_204_NO_CONTENT, prepare=prepare,
+        )
+
+    @covers('event:event-stats')
+    def test_organizer_stats(self):
+        """Test reading the organizer statistics."""
+        self.assertRouteQueries(
+            1, 'get', reverse('event:event-stats'), user=self.organizer
+        )
+
+    @covers('event:event-bulk')
+    def test_bulk(self):
+        """Test creating and updating events in bulk."""
+        url = reverse('event:event-bulk')
+        payload = [
+            {
+                'title': f'Bulk {number}',
+                'venue': 'Online',
+                'ticket_price': '10.00',
+                'date': '2099-12-22',
+                'time': '13:00',
+            }
+            for number in range(10)
+        ]
+        self.assertRouteQueries(
+            4, 'post', url, payload, user=self.organizer,
+            expected=status.HTTP_201_CREATED,
+        )
+
+        events = [create_event(self.organizer) for _ in range(10)]
+        self.assertRouteQueries(4, 'patch', url, [
+            {'id': event.id, 'title': 'Updated'} for event in events
+        ], user=self.organizer)
+
+    @covers('event:all-events', 'event:upcoming-events')
+    def test_public_listings(self):
+        """Test the public listings, plain and paginated."""
+        for name in ('event:all-events', 'event:upcoming-events'):
+            url = reverse(name)
+            self.assertRouteQueries(1, 'get', url, {'page_size': 20})
+            self.assertRouteQueries(
+                1, 'get', url, {'page_size': 20, 'venue': 'Online'}
+            )
+        self.assertRouteQueries(1, 'get', reverse('event:all-events'))
+
+    @covers('event:search-events')
+    def test_search(self):
+        """Test searching events."""
+        self.assertRouteQueries(
+            1, 'get', reverse('event:search-events'), {'q': 'concert'}
+        )
+
+    @covers('event:event-calendar')
+    def test_calendar(self):
+        """Test counting events per day, plain and per venue."""
+        url = reverse('event:event-calendar')
+        window = {'date_from': '2099-01-01', 'date_to': '2099-12-31'}
+
+        self.assertRouteQueries(1, 'get', url, window)
+        self.assertRouteQueries(1, 'get', url, dict(window, by_venue=True))
+
+    @covers('event:export-events')
+    def test_export(self):
+        """Test streaming the export."""
+        self.assertRouteQueries(1, 'get', reverse('event:export-events'))
+
+    @covers('enrollment:enrollment-list', 'enrollment:enrollment-detail')
+    def test_enrollments(self):
+        """Test listing, creating, reading and cancelling enrollments."""
+        url = reverse('enrollment:enrollment-list')
+        self.assertRouteQueries(1, 'get', url, user=self.attendee)
+
+        def prepare_enroll():
+            event = create_event(self.organizer)
+            return url, {'event': event.id}
+
+        self.assertRouteQueries(
+            8, 'post', None, user=self.attendee,
+            expected=status.HTTP_201_CREATED, prepare=prepare_enroll,
+        )
+
+        def prepare_read():
+            enrollment = Enrollment.objects.filter(user=self.attendee)[0]
+            return reverse(
+                'enrollment:enrollment-detail', args=[enrollment.id]
+            ), None
+
+        self.assertRouteQueries(
+            1, 'get', None, user=self.attendee, prepare=prepare_read
+        )
+
+        def prepare_cancel():
+            event = create_event(
+                self.organizer, max_attendees=1, seats_taken=1,
+                waitlist_tail=1,
+            )
+            WaitlistEntry.objects.create(
+                user=self.waiter, event=event, ticket=1
+            )
+            enrollment = Enrollment.objects.create(
+                user=self.attendee, event=event
+            )
+            return reverse(
+                'enrollment:enrollment-detail', args=[enrollment.id]
+            ), None
+
+        self.assertRouteQueries(
+            7, 'delete', None, user=self.attendee,
+            expected=status.HTTP_204_NO_CONTENT, prepare=prepare_cancel,
+        )
+
+    @covers('enrollment:waitlistentry-list',
+            'enrollment:waitlistentry-detail')
+    def test_waitlist(self):
+        """Test listing, joining, reading and leaving waitlists."""
+        url = reverse('enrollment:waitlistentry-list')
+        self.assertRouteQueries(1, 'get', url, user=self.waiter)
+
+        def prepare_join():
+            event = create_event(
+                self.organizer, max_attendees=1, seats_taken=1
+            )
+            return url, {'event': event.id}
+
+        self.assertRouteQueries(
+            9, 'post', None, user=self.waiter,
+            expected=status.HTTP_201_CREATED, prepare=prepare_join,
+        )
+
+        def prepare_read():
+            entry = WaitlistEntry.objects.filter(user=self.waiter)[0]
+            return reverse(
+                'enrollment:waitlistentry-detail', args=[entry.id]
+            ), None
+
+        self.assertRouteQueries(
+            1, 'get', None, user=self.waiter, prepare=prepare_read
+        )
+
+        def prepare_leave():
+            event = create_event(
+                self.organizer, max_attendees=1, seats_taken=1,
+                waitlist_tail=1,
+            )
+            entry = WaitlistEntry.objects.create(
+                user=self.waiter, event=event, ticket=1
+            )
+            return reverse(
+                'enrollment:waitlistentry-detail', args=[entry.id]
+            ), None
+
+        self.assertRouteQueries(
+            2, 'delete', None, user=self.waiter,
+            expected=status.HTTP_204_NO_CONTENT, prepare=prepare_leave,
+        )
@@ -0,0 +1,121 @@
+"""
+Tests for the fast JSON renderer and parser.
+"""
+
+import io
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+SAMPLE = OrderedDict([
+    ('id', 1),
+    ('title', 'Café \u2028 line \u2029 paragraph'),
+    ('ticket_price', Decimal('12.95')),
+    ('price_text', '12.95'),
+    ('date', date(2023, 12, 22)),
+    ('time', time(13, 0)),
+    ('created', datetime(2023, 1, 2, 3, 4, 5, 6, tzinfo=timezone.utc)),
+    ('naive', datetime(2023, 1, 2, 3, 4, 5)),
+    ('duration', timedelta(hours=1)),
+    ('uuid', uuid.UUID(int=1)),
+    ('message', gettext_lazy('Not found.')),
+    ('nested', [{'a': None, 'b': True}, (1, 2.5)]),
+    ('ids', {1: 'one'}),
+])
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """Tests for the fast JSON renderer."""
+
+    def test_output_matches_json_renderer(self):
+        """Test the output is the same as the stdlib renderer's."""
+        self.assertEqual(
+            FastJSONRenderer().render(SAMPLE),
+            JSONRenderer().render(SAMPLE),
+        )
+
+    def test_line_separators_escaped(self):
+        """Test U+2028 and U+2029 are escaped."""
+        rendered = FastJSONRenderer().render({'title': '\u2028\u2029'})
+
+        self.assertEqual(rendered, b'{"title":"\\u2028\\u2029"}')
+
+    def test_indent_falls_back(self):
+        """Test indented output is rendered like the stdlib renderer."""
+        media_type = 'application/json; indent=4'
+
+        self.assertEqual(
+            FastJSONRenderer().render(SAMPLE, media_type),
+            JSONRenderer().render(SAMPLE, media_type),
+        )
+
+    def test_big_integers_fall_back(self):
+        """Test values orjson refuses are still rendered."""
+        self.assertEqual(
+            FastJSONRenderer().render({'big': 2 ** 70}),
+            JSONRenderer().render({'big': 2 ** 70}),
+        )
+
+    def test_none_renders_empty(self):
+        """Test no data renders an empty body."""
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    @patch('core.renderers.orjson', None)
+    def test_without_orjson(self):
+        """Test the stdlib renderer is used when orjson is missing."""
+        self.assertEqual(
+            FastJSONRenderer().render(SAMPLE),
+            JSONRenderer().render(SAMPLE),
+        )
+
+
+class FastJSONParserTests(SimpleTestCase):
+    """Tests for the fast JSON parser."""
+
+    def parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(
+            io.BytesIO(body), parser_context={'encoding': encoding}
+        )
+
+    def test_parse_matches_json_parser(self):
+        """Test documents parse the same as with the stdlib parser."""
+        body = '{"title": "Café", "price": 12.95, "ids": [1, 2]}'.encode()
+
+        self.assertEqual(
+            self.parse(FastJSONParser(), body),
+            self.parse(JSONParser(), body),
+        )
+
+    def test_invalid_json_rejected(self):
+        """Test malformed documents raise a parse error."""
+        with self.assertRaises(ParseError):
+            self.parse(FastJSONParser(), b'{"title": ')
+
+    def test_non_finite_numbers_rejected(self):
+        """Test NaN is rejected like the strict stdlib parser does."""
+        with self.assertRaises(ParseError):
+            self.parse(FastJSONParser(), b'{"price": NaN}')
+
+    def test_other_encodings_fall_back(self):
+        """Test bodies in other encodings go through the stdlib."""
+        body = '{"title": "Café"}'.encode('latin-1')
+
+        data = self.parse(FastJSONParser(), body, encoding='latin-1')
+
+        self.assertEqual(data, {'title': 'Café'})
+
+    @patch('core.parsers.orjson', None)
+    def test_without_orjson(self):
+        """Test the stdlib parser is used when orjson is missing."""
+        self.assertEqual(self.parse(FastJSONParser(), b'[1]'), [1])
@@ -0,0 +1,245 @@
+"""
+Tests for the read replica routing.
+"""
+
+import asyncio
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, \
+    override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.cache import get_cache
+from core.models import Event
+from core.routers import (
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    has_written,
+    reading_from_replica,
+    replica_reads,
+)
+from event.async_views import async_view
+from event.cache import get_listing_cache
+from user.tokens import sign_token
+
+REPLICA = 'replica_1'
+ALL_EVENTS_URL = reverse('event:all-events')
+SEARCH_URL = reverse('event:search-events')
+EVENTS_URL = reverse('event:event-list')
+
+
+def detail_url(event_id):
+    """Return the detail url of an organized event."""
+    return reverse('event:event-detail', args=[event_id])
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+        name='Test User',
+    )
+
+
+def create_event(organizer, using='default', **params):
+    """Create and return a sample event in the `using` database."""
+    default = {
+        'title': 'Event',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': '2099-12-22',
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.using(using).create(organizer=organizer, **default)
+
+
+def replicate(*objs):
+    """Copy rows of the primary to the replica."""
+    for obj in objs:
+        type(obj).objects.using(REPLICA).bulk_create([obj])
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRouterTests(TestCase):
+    """Tests for routing reads to the replica.
+
+    The replica is a separate test database here, so rows created in
+    only one of them show where a read went.
+    """
+    databases = {'default', REPLICA}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        replicate(self.user)
+        get_listing_cache().clear()
+        get_cache().clear()
+
+    def test_reads_outside_views_use_primary(self):
+        """Test reads only go to a replica where a view opts in."""
+        router = ReplicaRouter()
+
+        self.assertIsNone(router.db_for_read(Event))
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Event), REPLICA)
+
+    def test_write_pins_primary(self):
+        """Test reads after a write in the same request use the
+        primary."""
+        router = ReplicaRouter()
+
+        with replica_reads() as state:
+            self.assertIsNone(router.db_for_write(Event))
+
+            self.assertFalse(reading_from_replica())
+            self.assertIsNone(router.db_for_read(Event))
+            self.assertTrue(state.wrote)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test everything goes to the primary without replicas."""
+        with replica_reads():
+            self.assertIsNone(ReplicaRouter().db_for_read(Event))
+
+    def test_all_events_read_from_replica(self):
+        """Test the all events listing is read from the replica."""
+        create_event(self.user, title='Primary')
+        create_event(self.user, using=REPLICA, title='Replica')
+
+        res = self.client.get(ALL_EVENTS_URL)
+
+        self.assertEqual(
+            [event['title'] for event in res.data], ['Replica']
+        )
+
+    def test_search_read_from_replica(self):
+        """Test search reads from the replica."""
+        create_event(self.user, title='Concert primary')
+        create_event(self.user, using=REPLICA, title='Concert replica')
+
+        res = self.client.get(SEARCH_URL, {'q': 'concert'})
+
+        self.assertEqual(
+            [event['title'] for event in res.data['results']],
+            ['Concert replica'],
+        )
+
+    def test_retrieve_read_from_replica(self):
+        """Test event retrieves are read from the replica while the
+        authentication reads the primary."""
+        event = create_event(self.user, using=REPLICA, title='Replica')
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {sign_token(token)}'
+        )
+
+        res = self.client.get(detail_url(event.id))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['title'], 'Replica')
+
+    def test_other_actions_use_primary(self):
+        """Test the organized events listing stays on the primary."""
+        create_event(self.user, title='Primary')
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(EVENTS_URL)
+
+        self.assertEqual(
+            [event['title'] for event in res.data], ['Primary']
+        )
+
+    def test_reads_after_write_use_primary(self):
+        """Test a user reads their own writes until the replica lag is
+        over."""
+        self.client.force_authenticate(self.user)
+        payload = {
+            'title': 'Created',
+            'venue': 'Online',
+            'ticket_price': '10.00',
+            'date': '2099-12-22',
+            'time': '13:00',
+        }
+        res = self.client.post(EVENTS_URL, payload)
+        self.assertEqual(res.status_code, 201)
+
+        res = self.client.get(detail_url(res.data['id']))
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.data['title'], 'Created')
+
+        get_cache().clear()
+        res = self.client.get(ALL_EVENTS_URL)
+        self.assertEqual(res.data, [])
+
+    def test_other_users_read_from_replica(self):
+        """Test the stickiness only applies to the user who wrote."""
+        self.client.force_authenticate(self.user)
+        self.client.post(EVENTS_URL, {
+            'title': 'Created',
+            'venue': 'Online',
+            'ticket_price': '10.00',
+            'date': '2099-12-22',
+            'time': '13:00',
+        })
+        other = create_user(email='other@example.com')
+        replicate(other)
+
+        self.client.force_authenticate(other)
+        res = self.client.get(ALL_EVENTS_URL)
+
+        self.assertEqual(res.data, [])
+
+    @override_settings(DATABASE_REPLICA_LAG=0)
+    def test_replica_listing_cached_for_replica_lag(self):
+        """Test listings read from the replica expire with the lag."""
+        create_event(self.user, using=REPLICA, title='First')
+        self.client.get(ALL_EVENTS_URL)
+        create_event(self.user, using=REPLICA, title='Second')
+
+        res = self.client.get(ALL_EVENTS_URL)
+
+        self.assertEqual(len(res.data), 2)
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    """Tests for the routing state of requests."""
+
+    def setUp(self):
+        get_cache().clear()
+
+    def writing_view(self, request):
+        ReplicaRouter().db_for_write(Event)
+        return HttpResponse()
+
+    def get_request(self, user_id):
+        request = RequestFactory().get('/')
+        request.user = SimpleNamespace(pk=user_id, is_authenticated=True)
+        return request
+
+    def test_sync_request_remembers_writer(self):
+        """Test a user whose request wrote reads from the primary."""
+        request = self.get_request(1)
+
+        ReplicaRoutingMiddleware(self.writing_view)(request)
+
+        self.assertTrue(has_written(request.user))
+
+    async def test_async_request_stays_async(self):
+        """Test the middleware is awaited in async mode and its state
+        follows the request into the pool of the async views."""
+        request = self.get_request(2)
+        middleware = ReplicaRoutingMiddleware(async_view(self.writing_view))
+
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        await middleware(request)
+
+        self.assertTrue(has_written(request.user))
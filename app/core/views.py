@@ -0,0 +1,30 @@
+"""
+Views for the core app.
+"""
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from core import metrics
+
+
+def metrics_view(request):
+    """Serve the request metrics in the Prometheus text format.
+
+    When `METRICS_TOKEN` is set, scrapers must send it as a bearer
+    token. Without one, the metrics are only served under DEBUG or when
+    `METRICS_PUBLIC` is set.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        if not constant_time_compare(
+            request.headers.get('Authorization', ''), f'Bearer {token}'
+        ):
+            return HttpResponse(status=401)
+    elif not settings.DEBUG and not settings.METRICS_PUBLIC:
+        return HttpResponse(status=404)
+    return HttpResponse(
+        metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
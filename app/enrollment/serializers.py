@@ -0,0 +1,26 @@
+"""
+Serializers for the enrollment api.
+"""
+
+from rest_framework import serializers
+
+from core.models import Enrollment, WaitlistEntry
+
+
+class EnrollmentSerializer(serializers.ModelSerializer):
+    """Serializer for the enrollment model."""
+
+    class Meta:
+        model = Enrollment
+        fields = ['id', 'event', 'created_at']
+        read_only_fields = ['id', 'created_at']
+
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    """Serializer for the waitlist entries."""
+    position = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = WaitlistEntry
+        fields = ['id', 'event', 'position', 'created_at']
+        read_only_fields = ['id', 'created_at']
@@ -0,0 +1,157 @@
+"""
+Concurrency tests for enrolling into events.
+"""
+
+import threading
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Enrollment, Event, WaitlistEntry
+
+ENROLLMENTS_URL = reverse('enrollment:enrollment-list')
+
+
+def run_concurrently(targets):
+    """Start every target at the same time and wait for all of them."""
+    barrier = threading.Barrier(len(targets))
+    results = [None] * len(targets)
+
+    def run(index, target):
+        try:
+            barrier.wait()
+            results[index] = target()
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=run, args=(index, target))
+        for index, target in enumerate(targets)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class ConcurrentEnrollmentTests(TransactionTestCase):
+    """Tests hammering a single event from many threads."""
+
+    def setUp(self):
+        self.users = [
+            get_user_model().objects.create_user(
+                email=f'user{number}@example.com',
+                password='test123',
+            )
+            for number in range(20)
+        ]
+        self.event = Event.objects.create(
+            organizer=self.users[0],
+            title='Popular Event',
+            venue='Online',
+            ticket_price=Decimal('10.00'),
+            date='2023-12-22',
+            time='13:00',
+            max_attendees=5,
+        )
+
+    def enroll(self, user, key=''):
+        def request():
+            client = APIClient()
+            client.force_authenticate(user)
+            return client.post(
+                ENROLLMENTS_URL,
+                {'event': self.event.id},
+                HTTP_IDEMPOTENCY_KEY=key,
+            ).status_code
+        return request
+
+    def test_no_overbooking(self):
+        """Test concurrent enrollments never exceed the capacity."""
+        statuses = run_concurrently([self.enroll(user) for user in self.users])
+
+        self.assertEqual(statuses.count(status.HTTP_201_CREATED), 5)
+        self.assertEqual(statuses.count(status.HTTP_409_CONFLICT), 15)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 5)
+        self.assertEqual(
+            Enrollment.objects.filter(event=self.event).count(), 5
+        )
+
+    def test_concurrent_retries_take_one_seat(self):
+        """Test concurrent retries of one request take a single seat."""
+        user = self.users[1]
+
+        statuses = run_concurrently(
+            [self.enroll(user, key='retry') for _ in range(8)]
+        )
+
+        self.assertEqual(statuses.count(status.HTTP_201_CREATED), 1)
+        self.assertEqual(statuses.count(status.HTTP_200_OK), 7)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 1)
+
+    def test_concurrent_cancellations_promote_distinct_users(self):
+        """Test concurrent cancellations each promote a different user
+        from the waitlist, in queue order."""
+        attendees, waiting = self.users[:5], self.users[5:]
+        enrollments = [
+            Enrollment.objects.enroll(user, self.event)[0]
+            for user in attendees
+        ]
+        for user in waiting:
+            WaitlistEntry.objects.join(user, self.event)
+
+        run_concurrently([
+            lambda enrollment=enrollment: Enrollment.objects.cancel(
+                enrollment
+            )
+            for enrollment in enrollments
+        ])
+
+        promoted = set(
+            Enrollment.objects.filter(event=self.event)
+            .values_list('user_id', flat=True)
+        )
+        self.assertEqual(promoted, {user.id for user in waiting[:5]})
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 5)
+        self.assertEqual(WaitlistEntry.objects.count(), len(waiting) - 5)
+
+    def test_join_racing_cancellation_gets_seat(self):
+        """Test a user joining while the last attendee cancels is never
+        left waiting behind a free seat."""
+        self.event.max_attendees = 1
+        self.event.save()
+        enrollment, _ = Enrollment.objects.enroll(self.users[0], self.event)
+
+        for _ in range(10):
+            joiner = self.users[1]
+            run_concurrently([
+                lambda: Enrollment.objects.cancel(enrollment),
+                lambda: self.join_or_enroll(joiner),
+            ])
+            self.event.refresh_from_db()
+            self.assertEqual(self.event.seats_taken, 1)
+            self.assertFalse(WaitlistEntry.objects.exists())
+
+            Enrollment.objects.filter(event=self.event).delete()
+            Event.objects.filter(pk=self.event.pk).update(seats_taken=0)
+            enrollment, _ = Enrollment.objects.enroll(
+                self.users[0], self.event
+            )
+
+    def join_or_enroll(self, user):
+        """Join the waitlist, or enroll when a seat is free."""
+        from core.models import EventNotFullError
+        try:
+            WaitlistEntry.objects.join(user, self.event)
+        except EventNotFullError:
+            Enrollment.objects.enroll(user, self.event)
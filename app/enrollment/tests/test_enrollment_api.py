@@ -0,0 +1,205 @@
+"""
+Tests for the enrollment api.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Enrollment, Event
+
+ENROLLMENTS_URL = reverse('enrollment:enrollment-list')
+
+
+def enrollment_detail_url(enrollment_id):
+    """Get and return an enrollment detail url."""
+    return reverse('enrollment:enrollment-detail', args=[enrollment_id])
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+    )
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event 1',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': '2023-12-22',
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+class PublicEnrollmentApiTests(TestCase):
+    """Tests for unauthenticated requests to the enrollment api."""
+
+    def test_auth_required(self):
+        """Test auth is required to enroll."""
+        res = APIClient().get(ENROLLMENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateEnrollmentApiTests(TestCase):
+    """Tests for authenticated requests to the enrollment api."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.organizer = create_user(email='organizer@example.com')
+        self.event = create_event(organizer=self.organizer, max_attendees=2)
+
+    def test_enroll(self):
+        """Test enrolling takes a seat of the event."""
+        res = self.client.post(ENROLLMENTS_URL, {'event': self.event.id})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            Enrollment.objects.filter(user=self.user, event=self.event)
+            .exists()
+        )
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 1)
+
+    def test_enroll_twice_returns_existing(self):
+        """Test enrolling again does not take a second seat."""
+        first = self.client.post(ENROLLMENTS_URL, {'event': self.event.id})
+
+        res = self.client.post(ENROLLMENTS_URL, {'event': self.event.id})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['id'], first.data['id'])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 1)
+
+    def test_idempotency_key_replays_enrollment(self):
+        """Test a retried request with the same key returns the original
+        enrollment."""
+        first = self.client.post(
+            ENROLLMENTS_URL,
+            {'event': self.event.id},
+            HTTP_IDEMPOTENCY_KEY='abc',
+        )
+
+        res = self.client.post(
+            ENROLLMENTS_URL, {'event': self.event.id},
+            HTTP_IDEMPOTENCY_KEY='abc',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['id'], first.data['id'])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 1)
+
+    def test_idempotency_key_reused_for_other_event(self):
+        """Test a key already used for another event is rejected rather
+        than replaying the enrollment into that event."""
+        self.client.post(
+            ENROLLMENTS_URL,
+            {'event': self.event.id},
+            HTTP_IDEMPOTENCY_KEY='abc',
+        )
+        other = create_event(organizer=self.organizer)
+
+        res = self.client.post(
+            ENROLLMENTS_URL, {'event': other.id}, HTTP_IDEMPOTENCY_KEY='abc'
+        )
+
+        self.assertEqual(
+            res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertFalse(Enrollment.objects.filter(event=other).exists())
+
+    def test_enroll_full_event_fails(self):
+        """Test enrolling into a full event returns a conflict."""
+        for number in range(2):
+            Enrollment.objects.enroll(
+                create_user(email=f'user{number}@example.com'), self.event
+            )
+
+        res = self.client.post(ENROLLMENTS_URL, {'event': self.event.id})
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 2)
+
+    def test_enroll_missing_event_fails(self):
+        """Test enrolling into an unknown event returns an error."""
+        res = self.client.post(ENROLLMENTS_URL, {'event': 0})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_limited_to_user(self):
+        """Test only the user's enrollments are listed."""
+        Enrollment.objects.enroll(self.user, self.event)
+        Enrollment.objects.enroll(
+            create_user(email='other@example.com'), self.event
+        )
+
+        res = self.client.get(ENROLLMENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+        self.assertEqual(res.data[0]['event'], self.event.id)
+
+    def test_cancel_frees_seat(self):
+        """Test cancelling an enrollment frees its seat."""
+        enrollment, _ = Enrollment.objects.enroll(self.user, self.event)
+
+        res = self.client.delete(enrollment_detail_url(enrollment.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Enrollment.objects.filter(id=enrollment.id).exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 0)
+
+    def test_cancel_other_user_enrollment_fails(self):
+        """Test users cannot cancel other users' enrollments."""
+        enrollment, _ = Enrollment.objects.enroll(
+            create_user(email='other@example.com'), self.event
+        )
+
+        res = self.client.delete(enrollment_detail_url(enrollment.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 1)
+
+    def test_event_update_keeps_seats_taken(self):
+        """Test saving a stale event does not overwrite its seats."""
+        stale = Event.objects.get(id=self.event.id)
+        Enrollment.objects.enroll(self.user, self.event)
+
+        stale.title = 'Updated Event'
+        stale.save()
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.title, 'Updated Event')
+        self.assertEqual(self.event.seats_taken, 1)
+
+    def test_capacity_below_enrollments_rejected(self):
+        """Test organizers cannot cut capacity below the enrollments."""
+        Enrollment.objects.enroll(self.user, self.event)
+        Enrollment.objects.enroll(
+            create_user(email='other@example.com'), self.event
+        )
+        self.client.force_authenticate(self.organizer)
+        url = reverse('event:event-detail', args=[self.event.id])
+
+        res = self.client.patch(url, {'max_attendees': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
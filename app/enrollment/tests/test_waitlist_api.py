@@ -0,0 +1,161 @@
+"""
+Tests for the waitlist api.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Enrollment, Event, WaitlistEntry
+
+WAITLIST_URL = reverse('enrollment:waitlistentry-list')
+
+
+def waitlist_detail_url(entry_id):
+    """Get and return a waitlist entry detail url."""
+    return reverse('enrollment:waitlistentry-detail', args=[entry_id])
+
+
+def enrollment_detail_url(enrollment_id):
+    """Get and return an enrollment detail url."""
+    return reverse('enrollment:enrollment-detail', args=[enrollment_id])
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+    )
+
+
+class WaitlistApiTests(TestCase):
+    """Tests for waiting for seats at full events."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.attendee = create_user(email='attendee@example.com')
+        self.event = Event.objects.create(
+            organizer=self.attendee,
+            title='Full Event',
+            venue='Online',
+            ticket_price=Decimal('10.00'),
+            date='2023-12-22',
+            time='13:00',
+            max_attendees=1,
+        )
+        self.enrollment, _ = Enrollment.objects.enroll(
+            self.attendee, self.event
+        )
+
+    def join(self, user):
+        entry, _ = WaitlistEntry.objects.join(user, self.event)
+        return entry
+
+    def test_join_full_event(self):
+        """Test joining the waitlist of a full event."""
+        res = self.client.post(WAITLIST_URL, {'event': self.event.id})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['position'], 1)
+
+    def test_join_event_with_free_seats_fails(self):
+        """Test users are sent to enroll when seats are free."""
+        Enrollment.objects.cancel(self.enrollment)
+
+        res = self.client.post(WAITLIST_URL, {'event': self.event.id})
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_join_when_enrolled_fails(self):
+        """Test attendees cannot join the waitlist of their event."""
+        self.client.force_authenticate(self.attendee)
+
+        res = self.client.post(WAITLIST_URL, {'event': self.event.id})
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_join_twice_returns_existing(self):
+        """Test joining again keeps the original place in the queue."""
+        first = self.client.post(WAITLIST_URL, {'event': self.event.id})
+
+        res = self.client.post(WAITLIST_URL, {'event': self.event.id})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['id'], first.data['id'])
+
+    def test_positions_follow_queue(self):
+        """Test positions count from the head of the queue."""
+        self.join(create_user(email='first@example.com'))
+        self.join(create_user(email='second@example.com'))
+        entry = self.join(self.user)
+
+        res = self.client.get(waitlist_detail_url(entry.id))
+        self.assertEqual(res.data['position'], 3)
+
+        Enrollment.objects.cancel(self.enrollment)
+        res = self.client.get(waitlist_detail_url(entry.id))
+        self.assertEqual(res.data['position'], 2)
+
+    def test_list_limited_to_user(self):
+        """Test only the user's entries are listed."""
+        self.join(create_user(email='other@example.com'))
+        self.join(self.user)
+
+        res = self.client.get(WAITLIST_URL)
+
+        self.assertEqual(len(res.data), 1)
+        self.assertEqual(res.data[0]['position'], 2)
+
+    def test_cancel_promotes_head(self):
+        """Test a cancelled seat goes to the head of the waitlist."""
+        head = create_user(email='head@example.com')
+        self.join(head)
+        self.join(self.user)
+        self.client.force_authenticate(self.attendee)
+
+        res = self.client.delete(enrollment_detail_url(self.enrollment.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTrue(
+            Enrollment.objects.filter(user=head, event=self.event).exists()
+        )
+        self.assertFalse(
+            WaitlistEntry.objects.filter(user=head).exists()
+        )
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 1)
+
+    def test_cancel_without_waitlist_frees_seat(self):
+        """Test a cancelled seat is freed when nobody waits."""
+        Enrollment.objects.cancel(self.enrollment)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, 0)
+
+    def test_leave_waitlist(self):
+        """Test users can leave the waitlist."""
+        entry = self.join(self.user)
+
+        res = self.client.delete(waitlist_detail_url(entry.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(WaitlistEntry.objects.exists())
+
+    def test_enrolling_directly_leaves_waitlist(self):
+        """Test enrolling into a freed seat removes the waitlist entry."""
+        self.join(self.user)
+        self.event.max_attendees = 2
+        self.event.save()
+
+        Enrollment.objects.enroll(self.user, self.event)
+
+        self.assertFalse(WaitlistEntry.objects.filter(user=self.user).exists())
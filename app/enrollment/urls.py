@@ -0,0 +1,21 @@
+"""
+Urls for the enrollment api.
+"""
+
+from django.urls import (
+    path,
+    include
+)
+from rest_framework.routers import DefaultRouter
+
+from enrollment import views
+
+router = DefaultRouter()
+router.register('enrollments', views.EnrollmentViewSet)
+router.register('waitlist', views.WaitlistViewSet)
+
+app_name = 'enrollment'
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
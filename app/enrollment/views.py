@@ -0,0 +1,136 @@
+"""
+Views for the enrollment api.
+"""
+
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import mixins, status, viewsets
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.models import (
+    AlreadyEnrolledError,
+    Enrollment,
+    EventFullError,
+    EventNotFullError,
+    IdempotencyKeyReusedError,
+    WaitlistEntry,
+)
+from enrollment.serializers import (
+    EnrollmentSerializer,
+    WaitlistEntrySerializer,
+)
+from user.authentication import CachedTokenAuthentication
+
+IDEMPOTENCY_KEY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+
+
+class EventFull(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _('The event has no free seats left.')
+    default_code = 'event_full'
+
+
+class EventNotFull(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _('The event has free seats, enroll instead.')
+    default_code = 'event_not_full'
+
+
+class AlreadyEnrolled(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _('You are already enrolled into this event.')
+    default_code = 'already_enrolled'
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = _('The idempotency key was used to enroll into '
+                       'another event.')
+    default_code = 'idempotency_key_reused'
+
+
+class EnrollmentViewSet(mixins.ListModelMixin,
+                        mixins.RetrieveModelMixin,
+                        mixins.DestroyModelMixin,
+                        viewsets.GenericViewSet):
+    """Viewset for enrolling the user into events and cancelling.
+
+    Enrolling is idempotent: retrying it, with or without the same
+    `Idempotency-Key` header, returns the existing enrollment with 200.
+    Reusing a key for another event is rejected with 422.
+    """
+    queryset = Enrollment.objects.all()
+    serializer_class = EnrollmentSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Limit the enrollments to the authenticated user."""
+        return self.queryset.filter(user=self.request.user).order_by('-id')
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        idempotency_key = request.META.get(IDEMPOTENCY_KEY_HEADER, '')[:255]
+
+        try:
+            enrollment, created = Enrollment.objects.enroll(
+                user=request.user,
+                event=serializer.validated_data['event'],
+                idempotency_key=idempotency_key,
+            )
+        except EventFullError:
+            raise EventFull()
+        except IdempotencyKeyReusedError:
+            raise IdempotencyKeyReused()
+
+        return Response(
+            self.get_serializer(enrollment).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    def perform_destroy(self, instance):
+        """Cancel the enrollment, freeing its seat."""
+        Enrollment.objects.cancel(instance)
+
+
+class WaitlistViewSet(mixins.ListModelMixin,
+                      mixins.RetrieveModelMixin,
+                      mixins.DestroyModelMixin,
+                      viewsets.GenericViewSet):
+    """Viewset for waiting for a seat at full events.
+
+    Cancelled enrollments are handed to the head of the waitlist, which
+    turns its entry into an enrollment.
+    """
+    queryset = WaitlistEntry.objects.all()
+    serializer_class = WaitlistEntrySerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Limit the entries to the authenticated user."""
+        return self.queryset.with_positions().filter(
+            user=self.request.user
+        ).order_by('-id')
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            entry, created = WaitlistEntry.objects.join(
+                user=request.user,
+                event=serializer.validated_data['event'],
+            )
+        except EventNotFullError:
+            raise EventNotFull()
+        except AlreadyEnrolledError:
+            raise AlreadyEnrolled()
+
+        return Response(
+            self.get_serializer(self.get_queryset().get(pk=entry.pk)).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
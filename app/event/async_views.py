@@ -0,0 +1,96 @@
+"""
+Async variants of the event listing and detail views.
+
+Under ASGI a sync view holds a worker thread until its response has been
+sent, so slow clients tie up threads. These views hand the ORM and
+serialization work of the regular views to a bounded thread pool and
+release the thread as soon as the response is rendered; the event loop
+then writes it out however slow the client reads.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import close_old_connections
+
+from event import views
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the pool running the database work of the async views.
+
+    Its `EVENT_ASYNC_WORKERS` threads bound how many requests query the
+    database at once, and so how many connections the views hold.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.EVENT_ASYNC_WORKERS,
+                thread_name_prefix='event-async',
+            )
+        return _executor
+
+
+def reset_executor(**kwargs):
+    """Replace the pool when its size changes."""
+    global _executor
+    if kwargs.get('setting') != 'EVENT_ASYNC_WORKERS':
+        return
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = None
+
+
+setting_changed.connect(reset_executor)
+
+
+def render_in_pool(view, request, *args, **kwargs):
+    """Run a sync view and render its response on a pool thread.
+
+    The pool threads are outside the request cycle, so they drop stale
+    or broken connections themselves, like `request_started` and
+    `request_finished` do for the handler threads.
+    """
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_view(view):
+    """Return an async view running `view` on the pool, in the context of
+    the request, so the routing state of core.routers follows it."""
+    async def wrapper(request, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            get_executor(),
+            functools.partial(
+                context.run, render_in_pool, view, request, *args, **kwargs
+            ),
+        )
+
+    return functools.update_wrapper(wrapper, view)
+
+
+all_events = async_view(views.GetAllEvents.as_view({'get': 'list'}))
+upcoming_events = async_view(
+    views.GetUpcomingEvents.as_view({'get': 'list'})
+)
+organized_event_detail = async_view(
+    views.OrganizedEventViewSet.as_view({'get': 'retrieve'})
+)
@@ -0,0 +1,118 @@
+"""
+Venue double-booking checks of the event api.
+
+An event with a duration books its venue for the local wall clock range
+from its date and time. Where core migration 0012 could create it, an
+exclusion constraint over the venue and that range, backed by a GiST
+index, rejects overlapping bookings as they are written. Without it, the
+written events are checked against the other bookings of their venues
+with an interval tree, in the transaction of the write; on PostgreSQL an
+advisory lock per venue keeps concurrent checks from passing together.
+"""
+
+import functools
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    IntegrityError,
+    connections,
+    transaction,
+)
+
+from core.models import Event, VenueBookedError
+from event.intervals import IntervalTree
+
+CONSTRAINT_NAME = 'event_venue_no_overlap'
+
+
+@functools.lru_cache(maxsize=None)
+def has_booking_constraint(using):
+    """Return whether the database checks the bookings itself."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_constraint WHERE conname = %s',
+            [CONSTRAINT_NAME],
+        )
+        return cursor.fetchone() is not None
+
+
+def booked_range(event):
+    """Return the `(start, end)` the event books its venue for, or None
+    when it has no duration."""
+    if event.duration is None:
+        return None
+    start = datetime.combine(
+        Event._meta.get_field('date').to_python(event.date),
+        Event._meta.get_field('time').to_python(event.time),
+    )
+    return start, start + event.duration
+
+
+def check_bookings(events, using=DEFAULT_DB_ALIAS):
+    """Raise `VenueBookedError` when one of `events` books its venue at a
+    time booked by another saved event or by another of `events`.
+
+    Events with a primary key are taken to be saved, with the values
+    they have, and the others not to be saved yet. Does nothing where
+    the exclusion constraint checks the writes. Saved bookings are
+    looked up `EVENT_MAX_DURATION_DAYS` back, the longest duration the
+    api accepts.
+    """
+    bookings = defaultdict(list)
+    for event in events:
+        booked = booked_range(event)
+        if booked is not None:
+            bookings[event.venue].append((*booked, event))
+    if not bookings or has_booking_constraint(using):
+        return
+
+    connection = connections[using]
+    longest = timedelta(days=settings.EVENT_MAX_DURATION_DAYS)
+    for venue in sorted(bookings):
+        booked = bookings[venue]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_advisory_xact_lock(hashtext(%s))', [venue]
+                )
+        saved = Event.objects.using(using).filter(
+            venue=venue,
+            duration__isnull=False,
+            date__gte=(min(start for start, _, _ in booked) - longest).date(),
+            date__lte=max(end for _, end, _ in booked).date(),
+        ).exclude(
+            pk__in=[event.pk for _, _, event in booked if event.pk]
+        ).values_list('pk', 'date', 'time', 'duration')
+        intervals = []
+        for pk, day, time, duration in saved:
+            start = datetime.combine(day, time)
+            intervals.append((start, start + duration, pk))
+        tree = IntervalTree(intervals + booked)
+
+        for start, end, event in booked:
+            for other in tree.overlapping(start, end):
+                if other is not event:
+                    raise VenueBookedError(
+                        event.pk, getattr(other, 'pk', other)
+                    )
+
+
+@contextmanager
+def booking_conflicts(using=DEFAULT_DB_ALIAS):
+    """Run the block in a transaction, raising `VenueBookedError` for the
+    writes the exclusion constraint rejects."""
+    try:
+        with transaction.atomic(using=using):
+            yield
+    except IntegrityError as exc:
+        diag = getattr(exc.__cause__, 'diag', None)
+        if getattr(diag, 'constraint_name', None) != CONSTRAINT_NAME:
+            raise
+        raise VenueBookedError() from exc
@@ -0,0 +1,102 @@
+"""
+Response cache for the event listings.
+
+Cached listings are keyed on a version counter that is bumped whenever
+an event is saved or deleted, so stale entries are never read again and
+age out of the cache after `EVENT_LISTING_CACHE_TTL` seconds.
+
+The counter is only seen by the processes sharing the cache: with the
+default per-process cache, a listing cached by one worker outlives the
+writes made through the others until it expires. Deployments running
+more than one worker should share the cache with REDIS_URL.
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.encoding import iri_to_uri
+from rest_framework.response import Response
+
+from core.cache import get_cache
+from core.routers import reading_from_replica
+from event.conditional import VALIDATOR_HEADERS
+
+CACHE_ALIAS = 'events'
+VERSION_KEY = 'version'
+
+# Filters relative to the current time, whose results change without any
+# event being written.
+CLOCK_PARAMS = ('upcoming',)
+
+
+def get_listing_cache():
+    """Return the cache holding the event listings."""
+    return get_cache(CACHE_ALIAS)
+
+
+def current_version():
+    """Return the current version of the event table."""
+    return get_listing_cache().incr(VERSION_KEY, 0)
+
+
+def bump_version():
+    """Invalidate every cached listing.
+
+    The version is bumped right away and again once the transaction
+    commits, so a listing cached from a concurrent read of the old rows
+    does not survive the commit.
+    """
+    cache = get_listing_cache()
+    cache.incr(VERSION_KEY)
+    transaction.on_commit(lambda: cache.incr(VERSION_KEY))
+
+
+def listing_key(request):
+    """Return the cache key of a listing request."""
+    query = '&'.join(sorted(request.GET.urlencode().split('&')))
+    return 'listing:{version}:{format}:{path}?{query}'.format(
+        version=current_version(),
+        format=request.accepted_renderer.format,
+        path=iri_to_uri(request.path),
+        query=query,
+    )
+
+
+class CachedListMixin:
+    """Serve the `list` action from the listing cache.
+
+    The validator headers of a cached listing are replayed with it, so
+    conditional requests are answered from the cache as well. Listings
+    are kept for `EVENT_LISTING_CACHE_TTL` seconds, or only for the
+    replica lag when read from a replica, as they may predate the last
+    version bump. Listings filtered on the current time are not cached.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if any(param in request.query_params for param in CLOCK_PARAMS):
+            return super().list(request, *args, **kwargs)
+        cache = get_listing_cache()
+        key = listing_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code == 200:
+                timeout = settings.EVENT_LISTING_CACHE_TTL
+                if reading_from_replica():
+                    timeout = min(timeout, settings.DATABASE_REPLICA_LAG)
+                cache.set(key, {
+                    'data': response.data,
+                    'headers': {
+                        header: response[header]
+                        for header in VALIDATOR_HEADERS
+                        if response.has_header(header)
+                    },
+                }, timeout=timeout)
+            return response
+
+        response = get_conditional_response(
+            request, etag=entry['headers'].get('ETag')
+        ) or Response(entry['data'])
+        for header, value in entry['headers'].items():
+            response[header] = value
+        return response
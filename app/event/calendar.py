@@ -0,0 +1,177 @@
+"""
+Calendar of the event api.
+
+Events are counted per day with one GROUP BY over the date index and
+the counts are cached a month per entry. Every month has its own version
+counter, bumped when an event dated in it is created, deleted, moved in
+or out of it or changes venue, so a change only invalidates the months
+it touches. As with the listings, the versions are only shared by the
+processes sharing the cache, so months also age out of it after
+`EVENT_LISTING_CACHE_TTL` seconds.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from rest_framework import serializers
+
+from core.models import Event
+from core.routers import reading_from_replica
+from event.cache import get_listing_cache
+
+
+def month_of(day):
+    """Return the first day of the month of `day`."""
+    return day.replace(day=1)
+
+
+def next_month(month):
+    """Return the first day of the month after `month`."""
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def months_between(start, end):
+    """Return the first days of the months from `start` to `end`."""
+    months = []
+    month = month_of(start)
+    while month <= end:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def version_key(month):
+    """Return the cache key of the version of a month."""
+    return f'calendar-version:{month:%Y-%m}'
+
+
+def invalidate_months(days):
+    """Invalidate the cached calendar months of `days`.
+
+    Like `bump_version`, the months are bumped right away and again
+    once the transaction commits.
+    """
+    cache = get_listing_cache()
+    keys = {version_key(month_of(day)) for day in days}
+
+    def bump():
+        for key in keys:
+            cache.incr(key)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def daily_counts(queryset, start, end, by_venue=False):
+    """Return the rows of the number of events per day, or per day and
+    venue, between `start` and `end`."""
+    fields = ['date', 'venue'] if by_venue else ['date']
+    return queryset.filter(date__range=(start, end)).values(
+        *fields
+    ).annotate(events=Count('id')).order_by()
+
+
+def count_days(queryset, start, end, by_venue=False):
+    """Return the counts of `daily_counts` by day, and by venue within
+    the day with `by_venue`, leaving out empty days."""
+    rows = daily_counts(queryset, start, end, by_venue)
+    if not by_venue:
+        return {row['date']: row['events'] for row in rows}
+    days = {}
+    for row in rows:
+        days.setdefault(row['date'], {})[row['venue']] = row['events']
+    return days
+
+
+def calendar_days(start, end, by_venue=False):
+    """Return the counts of `count_days` over all events for every
+    month from `start` to `end`, reading the cached months and counting
+    the others with a single query over the span they cover.
+
+    Months are kept for `EVENT_LISTING_CACHE_TTL` seconds, or only for
+    the replica lag when counted on a replica, as they may predate the
+    last version bump.
+    """
+    cache = get_listing_cache()
+    variant = 'venues' if by_venue else 'days'
+    keys = {
+        month: 'calendar:{variant}:{month:%Y-%m}:{version}'.format(
+            variant=variant, month=month,
+            version=cache.incr(version_key(month), 0),
+        )
+        for month in months_between(start, end)
+    }
+    days, missing = {}, []
+    for month, key in keys.items():
+        entry = cache.get(key)
+        if entry is None:
+            missing.append(month)
+        else:
+            days.update(entry)
+
+    if missing:
+        counted = count_days(
+            Event.objects.all(), missing[0],
+            next_month(missing[-1]) - timedelta(days=1), by_venue,
+        )
+        timeout = settings.EVENT_LISTING_CACHE_TTL
+        if reading_from_replica():
+            timeout = min(timeout, settings.DATABASE_REPLICA_LAG)
+        for month in missing:
+            entry = {
+                day: value for day, value in counted.items()
+                if month_of(day) == month
+            }
+            cache.set(keys[month], entry, timeout=timeout)
+            days.update(entry)
+    return days
+
+
+class CalendarSerializer(serializers.Serializer):
+    """Validate the window of the calendar, by default the current
+    month."""
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    by_venue = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        today = timezone.localdate()
+        attrs.setdefault('date_from', month_of(today))
+        attrs.setdefault(
+            'date_to', next_month(attrs['date_from']) - timedelta(days=1)
+        )
+        if attrs['date_from'] > attrs['date_to']:
+            msg = _('date_from must not be after date_to.')
+            raise serializers.ValidationError(msg)
+        span = (attrs['date_to'] - attrs['date_from']).days + 1
+        if span > settings.EVENT_CALENDAR_MAX_DAYS:
+            msg = _('The window must not be longer than {days} days.')
+            raise serializers.ValidationError(
+                msg.format(days=settings.EVENT_CALENDAR_MAX_DAYS)
+            )
+        return attrs
+
+
+def calendar(date_from, date_to, by_venue=False):
+    """Return the calendar of the events between `date_from` and
+    `date_to`, with every day of the window in order."""
+    days = calendar_days(date_from, date_to, by_venue)
+    entries = []
+    day = date_from
+    while day <= date_to:
+        counts = days.get(day)
+        if by_venue:
+            venues = counts or {}
+            entries.append({
+                'date': day,
+                'events': sum(venues.values()),
+                'venues': venues,
+            })
+        else:
+            entries.append({'date': day, 'events': counts or 0})
+        day += timedelta(days=1)
+    return {'date_from': date_from, 'date_to': date_to, 'days': entries}
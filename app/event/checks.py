@@ -0,0 +1,26 @@
+"""
+System checks of the event app.
+"""
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from event.cache import CACHE_ALIAS
+
+
+@register(Tags.caches, deploy=True)
+def check_listing_cache_shared(app_configs, **kwargs):
+    """Warn when the listing cache is kept per process, where writes
+    made through one worker do not expire the listings of the others."""
+    backend = settings.CORE_CACHES[CACHE_ALIAS]['BACKEND']
+    if backend != 'core.cache.LocMemLRUCache':
+        return []
+    return [Warning(
+        'The event listing cache is kept per process.',
+        hint=(
+            'Set REDIS_URL to share it when running more than one '
+            'worker, or listings stay stale for up to '
+            'EVENT_LISTING_CACHE_TTL seconds after a write.'
+        ),
+        id='event.W001',
+    )]
@@ -0,0 +1,80 @@
+"""
+Conditional GET support for the event api.
+"""
+
+import calendar
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def make_etag(request, *parts):
+    """Return a strong ETag for the response to `request` built from
+    the `parts` identifying the state of the data it shows."""
+    key = '|'.join(map(str, [
+        request.get_full_path(),
+        request.accepted_renderer.format,
+        *parts,
+    ]))
+    return quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+
+def to_timestamp(value):
+    """Return the unix timestamp of a datetime, or None."""
+    if value is None:
+        return None
+    return calendar.timegm(value.utctimetuple())
+
+
+def set_validators(response, etag, last_modified):
+    """Set the ETag and Last-Modified headers on a response."""
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """Answer `list` and `retrieve` with 304 Not Modified when the
+    client already has the current representation.
+
+    Details are validated with a single column query before the row is
+    fetched. Listings are validated on an ETag hashed from the rows of
+    the page they return, which costs the page query but no scan of the
+    whole listing; they do not send Last-Modified, as a delete does not
+    move it.
+    """
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        etag = make_etag(request, repr(response.data))
+        return set_validators(
+            get_conditional_response(request, etag=etag) or response,
+            etag, None,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            updated_at = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).values_list('updated_at', flat=True).first()
+        except (TypeError, ValueError, ValidationError):
+            updated_at = None
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = make_etag(request, updated_at.isoformat())
+        last_modified = to_timestamp(updated_at)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
@@ -0,0 +1,28 @@
+"""
+Streaming export of the events.
+"""
+
+from django.conf import settings
+
+from event.fast import get_values_serializer
+from event.serializers import EventSerializer
+
+EXPORT_FIELDS = tuple(EventSerializer.Meta.fields)
+
+
+def export_rows(queryset, serializer_class=EventSerializer, chunk_size=None):
+    """Yield the events of the queryset as lists of output values.
+
+    Rows are read through a server-side cursor `chunk_size` rows at a
+    time, so memory use does not grow with the size of the table.
+    """
+    serializer = get_values_serializer(serializer_class)
+    converters = [convert for _, _, convert in serializer.fields]
+    rows = queryset.values_list(*serializer.sources).iterator(
+        chunk_size=chunk_size or settings.EVENT_EXPORT_CHUNK_SIZE
+    )
+    for row in rows:
+        yield [
+            None if value is None else convert(value)
+            for convert, value in zip(converters, row)
+        ]
@@ -0,0 +1,117 @@
+"""
+Filters for the event api.
+"""
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+
+def upcoming_q():
+    """Return the condition matching events that have not started."""
+    now = timezone.localtime()
+    return Q(date__gt=now.date()) | Q(date=now.date(), time__gte=now.time())
+
+
+class EventFilterSerializer(serializers.Serializer):
+    """Validate the filter parameters of the event listings."""
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    venue = serializers.CharField(required=False, max_length=255)
+    min_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0, required=False
+    )
+    max_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=0, required=False
+    )
+    organizer = serializers.IntegerField(required=False)
+    free = serializers.BooleanField(required=False)
+    upcoming = serializers.BooleanField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('date_from') and attrs.get('date_to') \
+                and attrs['date_from'] > attrs['date_to']:
+            msg = _('date_from must not be after date_to.')
+            raise serializers.ValidationError(msg)
+        if attrs.get('min_price') is not None \
+                and attrs.get('max_price') is not None \
+                and attrs['min_price'] > attrs['max_price']:
+            msg = _('min_price must not be above max_price.')
+            raise serializers.ValidationError(msg)
+        return attrs
+
+
+class EventFilterBackend(BaseFilterBackend):
+    """Filter events by date range, venue, price band and organizer.
+
+    Every filter maps onto one of the event indexes, see the Meta of
+    `core.models.Event`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        serializer = EventFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        if 'date_from' in params:
+            queryset = queryset.filter(date__gte=params['date_from'])
+        if 'date_to' in params:
+            queryset = queryset.filter(date__lte=params['date_to'])
+        if 'venue' in params:
+            queryset = queryset.filter(venue=params['venue'])
+        if params.get('min_price') is not None:
+            queryset = queryset.filter(ticket_price__gte=params['min_price'])
+        if params.get('max_price') is not None:
+            queryset = queryset.filter(ticket_price__lte=params['max_price'])
+        if 'organizer' in params:
+            queryset = queryset.filter(organizer_id=params['organizer'])
+        if params.get('free'):
+            queryset = queryset.filter(ticket_price=0)
+        if params.get('upcoming'):
+            queryset = queryset.filter(upcoming_q())
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': name,
+                'required': False,
+                'in': 'query',
+                'schema': {'type': 'string'},
+            }
+            for name in EventFilterSerializer().fields
+        ]
+
+
+class EventOrderingFilter(OrderingFilter):
+    """Order events by a whitelisted field.
+
+    Ordering by date also orders by time, and the id is always appended
+    so the ordering is total and can back the keyset pagination.
+    """
+    ordering_fields = ['id', 'date', 'ticket_price']
+    expanded_fields = {
+        'date': ['date', 'time'],
+    }
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+
+        expanded = []
+        for field in ordering:
+            direction = '-' if field.startswith('-') else ''
+            expanded += [
+                direction + name
+                for name in self.expanded_fields.get(
+                    field.lstrip('-'), [field.lstrip('-')]
+                )
+            ]
+        names = [field.lstrip('-') for field in expanded]
+        if 'id' not in names:
+            direction = '-' if expanded[-1].startswith('-') else ''
+            expanded.append(direction + 'id')
+        return expanded
@@ -0,0 +1,65 @@
+"""
+Interval tree for the venue booking checks of the event api.
+"""
+
+
+class IntervalTree:
+    """Static interval tree over half-open `[start, end)` intervals.
+
+    The intervals are sorted by start and laid out as an implicit
+    balanced tree over that list, the middle item of every slice being
+    the root of its subtree. Each node also keeps the latest end in its
+    subtree, so a query skips the subtrees that end before it starts and
+    the right subtrees that start after it ends: finding the `k`
+    intervals overlapping a range takes O(log n + k).
+    """
+
+    def __init__(self, intervals):
+        """Build the tree from `(start, end, value)` triples, in O(n log
+        n). Empty intervals are left out, they overlap nothing."""
+        self.items = sorted(
+            (item for item in intervals if item[0] < item[1]),
+            key=lambda item: item[0],
+        )
+        self.max_end = [None] * len(self.items)
+        self._build(0, len(self.items))
+
+    def _build(self, low, high):
+        if low >= high:
+            return None
+        middle = (low + high) // 2
+        ends = [
+            self.items[middle][1],
+            self._build(low, middle),
+            self._build(middle + 1, high),
+        ]
+        self.max_end[middle] = max(end for end in ends if end is not None)
+        return self.max_end[middle]
+
+    def __len__(self):
+        return len(self.items)
+
+    def overlapping(self, start, end):
+        """Return the values of the intervals overlapping `[start, end)`,
+        in the order of their starts."""
+        found = []
+        if start >= end:
+            return found
+        self._search(0, len(self.items), start, end, found)
+        return found
+
+    def _search(self, low, high, start, end, found):
+        if low >= high:
+            return
+        middle = (low + high) // 2
+        if self.max_end[middle] <= start:
+            # Everything in this subtree ends before the range starts.
+            return
+        self._search(low, middle, start, end, found)
+        item_start, item_end, value = self.items[middle]
+        if item_start >= end:
+            # This item and the whole right subtree start after the range.
+            return
+        if item_end > start:
+            found.append(value)
+        self._search(middle + 1, high, start, end, found)
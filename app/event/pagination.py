@@ -0,0 +1,209 @@
+"""
+Keyset (cursor) pagination for the event api.
+"""
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import BooleanField, F, Func, Q, Value
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class Row(Func):
+    """Row constructor `(a, b, ...)`."""
+    template = '(%(expressions)s)'
+
+
+class RowComparison(Func):
+    """Row-value comparison `(a, b, ...) > (x, y, ...)`, or `<` when
+    `descending`."""
+    template = '%(expressions)s'
+    output_field = BooleanField()
+
+    def __init__(self, fields, values, descending=False):
+        super().__init__(Row(*fields), Row(*values))
+        self.arg_joiner = ' < ' if descending else ' > '
+
+
+class KeysetPagination(BasePagination):
+    """Paginate a queryset by seeking past the last row of the previous page.
+
+    Pages are addressed by an opaque cursor holding the ordering values of
+    the last row sent, so every page is fetched with an index seek
+    (`WHERE (date, time, id) > (...)`) instead of an OFFSET scan.
+    Unless `paginate_by_default` is set, pagination is opt-in: it only
+    applies when the client sends `cursor` or `page_size`, otherwise the
+    full listing is returned.
+    """
+    ordering = ('-id',)
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    paginate_by_default = False
+    invalid_cursor_message = _('Invalid cursor')
+
+    @property
+    def page_size(self):
+        return settings.EVENT_PAGE_SIZE
+
+    @property
+    def max_page_size(self):
+        return settings.EVENT_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if (not self.paginate_by_default
+                and self.cursor_query_param not in params
+                and self.page_size_query_param not in params):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+        self.limit = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.seek(position))
+
+        rows = list(queryset[:self.limit + 1])
+        self.has_next = len(rows) > self.limit
+        self.page = rows[:self.limit]
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        """Return the ordering the keyset is built on.
+
+        An ordering requested through the view's ordering filter wins
+        over the default ordering of the paginator.
+        """
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    return tuple(ordering)
+        return self.ordering
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def seek(self, position):
+        """Build the condition selecting the rows after `position`.
+
+        When every field is sorted the same way this is the row-value
+        comparison `(a, b, ...) > (x, y, ...)` (`<` when descending),
+        which the planner turns into a range scan on the matching
+        composite index. Mixed directions have no row-value form and
+        expand to `a > x OR (a = x AND b < y) OR ...`, each comparison
+        flipped for descending fields, which is applied as a filter.
+        """
+        directions = {field.startswith('-') for field in self.ordering}
+        if len(directions) == 1:
+            return RowComparison(
+                [F(name) for name in self.fields],
+                [Value(position[name]) for name in self.fields],
+                descending=directions.pop(),
+            )
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {
+                prev: position[prev] for prev in self.fields[:index]
+            }
+            condition |= Q(**equal, **{f'{name}__{lookup}': position[name]})
+        return condition
+
+    def encode_cursor(self, row):
+        position = [self.row_value(row, field) for field in self.fields]
+        payload = json.dumps(position, default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return {
+                field: self.to_python(model, field, value)
+                for field, value in zip(self.fields, values)
+            }
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_python(self, model, field, value):
+        """Convert a cursor value back into the field's python type."""
+        try:
+            return model._meta.get_field(field).to_python(value)
+        except FieldDoesNotExist:
+            return value
+
+    def row_value(self, row, field):
+        if isinstance(row, dict):
+            return row[field]
+        return getattr(row, field)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            self.encode_cursor(self.page[-1])
+        )
+        return replace_query_param(
+            url, self.page_size_query_param, self.limit
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                },
+                'results': schema,
+            },
+        }
+
+
+class EventKeysetPagination(KeysetPagination):
+    """Newest-first pagination for event listings."""
+    ordering = ('-id',)
+
+
+class UpcomingEventKeysetPagination(KeysetPagination):
+    """Chronological pagination for upcoming event listings."""
+    ordering = ('date', 'time', 'id')
+
+
+class SearchKeysetPagination(KeysetPagination):
+    """Most relevant first pagination for search results."""
+    ordering = ('-rank', '-id')
+    paginate_by_default = True
@@ -0,0 +1,67 @@
+"""
+Full-text search over events.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Cast
+
+# The search vector holds the lexemes of both configurations, see the
+# trigger in core migration 0008.
+SEARCH_CONFIGS = ['english', 'simple']
+TERM_RE = re.compile(r'\w+')
+
+
+def search_terms(text):
+    """Split the search text into words."""
+    return TERM_RE.findall(text)
+
+
+def search_query(terms):
+    """Return a query matching every term as a prefix of a stemmed or
+    unstemmed word."""
+    query = None
+    for term in terms:
+        term_query = None
+        for config in SEARCH_CONFIGS:
+            config_query = SearchQuery(
+                f'{term}:*', config=config, search_type='raw'
+            )
+            term_query = config_query if term_query is None \
+                else term_query | config_query
+        query = term_query if query is None else query & term_query
+    return query
+
+
+def search_events(queryset, text):
+    """Return the events of `queryset` matching every word of `text`,
+    annotated with their `rank`.
+
+    On PostgreSQL the words are prefix matched against the indexed
+    search vector and ranked by relevance; the rank is cast to double
+    precision so it round trips exactly through pagination cursors.
+    Other backends fall back to case insensitive substring matching with
+    an equal rank.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset.none().annotate(
+            rank=Value(0.0, output_field=FloatField())
+        )
+
+    if connections[queryset.db].vendor == 'postgresql':
+        query = search_query(terms)
+        return queryset.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F('search_vector'), query), FloatField())
+        )
+
+    for term in terms:
+        queryset = queryset.filter(
+            Q(title__icontains=term)
+            | Q(venue__icontains=term)
+            | Q(description__icontains=term)
+        )
+    return queryset.annotate(rank=Value(1.0, output_field=FloatField()))
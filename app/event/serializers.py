@@ -2,8 +2,15 @@
 Serialziers for the event api.
 """
 
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.translation import gettext as _
 from rest_framework import serializers
-from core.models import Event
+from core.models import Event, OrganizerStats
+from event.bookings import check_bookings
+from event.calendar import invalidate_months
 
 
 class EventSerializer(serializers.ModelSerializer):
@@ -13,9 +20,29 @@ class EventSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
         fields = ['id', 'title', 'organizer',
-                  'venue', 'ticket_price', 'date', 'time', 'max_attendees']
+                  'venue', 'ticket_price', 'date', 'time', 'max_attendees',
+                  'duration']
         read_only_fields = ['id', 'organizer']
 
+    def validate_max_attendees(self, value):
+        """Do not allow fewer seats than attendees already enrolled."""
+        if self.instance is not None and value < self.instance.seats_taken:
+            msg = _('Cannot have fewer seats than enrolled attendees.')
+            raise serializers.ValidationError(msg)
+        return value
+
+    def validate_duration(self, value):
+        """Keep durations positive and within the longest one the venue
+        booking checks look back for."""
+        longest = timedelta(days=settings.EVENT_MAX_DURATION_DAYS)
+        if value is not None and not timedelta(0) < value <= longest:
+            msg = _('The duration must be positive and at most {days} '
+                    'days.')
+            raise serializers.ValidationError(
+                msg.format(days=settings.EVENT_MAX_DURATION_DAYS)
+            )
+        return value
+
 
 class EventDetailSerializer(EventSerializer):
     """Detail serializer for the event model.
@@ -23,3 +50,113 @@ class EventDetailSerializer(EventSerializer):
        EVent image."""
     class Meta(EventSerializer.Meta):
         fields = EventSerializer.Meta.fields + ['description']
+
+
+class EventBulkListSerializer(serializers.ListSerializer):
+    """List serializer writing many events with a few statements.
+
+    Creates go through `bulk_create` and updates through `bulk_update`,
+    `EVENT_BULK_BATCH_SIZE` rows per statement; neither sends the model
+    signals, so the venue bookings, organizer statistics and calendar
+    months are handled here and callers must invalidate the listings. For
+    updates `instance` holds the events that may be changed and every
+    item names the one it changes by `id`.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+        max_items = settings.EVENT_BULK_MAX_ITEMS
+        if len(data) > max_items:
+            msg = _('Ensure there are no more than {count} events.')
+            raise serializers.ValidationError(
+                msg.format(count=max_items), code='max_length'
+            )
+        if self.instance is None:
+            return super().to_internal_value(data)
+
+        events = {event.pk: event for event in self.instance}
+        seen = set()
+        validated, errors = [], []
+        for item in data:
+            try:
+                event = events[int(item['id'])]
+            except (KeyError, TypeError, ValueError):
+                errors.append({'id': [_('Unknown event.')]})
+                continue
+            if event.pk in seen:
+                errors.append({'id': [_('Duplicate event.')]})
+                continue
+            seen.add(event.pk)
+
+            self.child.instance = event
+            try:
+                attrs = self.child.run_validation(item)
+            except serializers.ValidationError as exc:
+                errors.append(exc.detail)
+            else:
+                validated.append(dict(attrs, id=event.pk))
+                errors.append({})
+            finally:
+                self.child.instance = None
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def create(self, validated_data):
+        events = [Event(**attrs) for attrs in validated_data]
+        check_bookings(events)
+        events = Event.objects.bulk_create(
+            events,
+            batch_size=settings.EVENT_BULK_BATCH_SIZE,
+        )
+        OrganizerStats.objects.record(
+            (None, event.snapshot()) for event in events
+        )
+        invalidate_months(event.date for event in events)
+        return events
+
+    def update(self, instance, validated_data):
+        events = {event.pk: event for event in instance}
+        now = timezone.now()
+        fields = {'updated_at'}
+        updated, changes = [], []
+        for attrs in validated_data:
+            attrs = dict(attrs)
+            event = events[attrs.pop('id')]
+            old = event.snapshot()
+            for name, value in attrs.items():
+                setattr(event, name, value)
+            event.updated_at = now
+            fields.update(attrs)
+            updated.append(event)
+            changes.append((old, event.snapshot()))
+        check_bookings(updated)
+        Event.objects.bulk_update(
+            updated, sorted(fields),
+            batch_size=settings.EVENT_BULK_BATCH_SIZE,
+        )
+        OrganizerStats.objects.record(changes)
+        invalidate_months(
+            snapshot.date for old, new in changes
+            if (old.date, old.venue) != (new.date, new.venue)
+            for snapshot in (old, new)
+        )
+        return updated
+
+
+class EventBulkSerializer(EventDetailSerializer):
+    """Serializer for creating and updating events in bulk."""
+    class Meta(EventDetailSerializer.Meta):
+        list_serializer_class = EventBulkListSerializer
+
+
+class OrganizerStatsSerializer(serializers.ModelSerializer):
+    """Serializer for the statistics of an organizer's events."""
+
+    class Meta:
+        model = OrganizerStats
+        fields = ['event_count', 'upcoming_count', 'total_capacity',
+                  'seats_taken', 'revenue_potential', 'updated_at']
+        read_only_fields = fields
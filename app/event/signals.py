@@ -0,0 +1,85 @@
+"""
+Signal handlers for the event api.
+"""
+
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from core.models import Event, EventSnapshot, OrganizerStats
+from event.bookings import check_bookings
+from event.cache import bump_version
+from event.calendar import invalidate_months
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_listings(sender, **kwargs):
+    """Invalidate the cached listings when an event changes."""
+    bump_version()
+
+
+@receiver(pre_save, sender=Event)
+def load_replaced_values(sender, instance, raw, using, **kwargs):
+    """Read the values a save replaces, unless the write path recorded
+    them when it loaded the event."""
+    if raw or instance.pk is None \
+            or getattr(instance, '_loaded_snapshot', None) is not None:
+        return
+    row = Event.objects.using(using).filter(pk=instance.pk).values_list(
+        *EventSnapshot._fields
+    ).first()
+    instance._loaded_snapshot = row and EventSnapshot(*row)
+
+
+@receiver(post_save, sender=Event)
+def count_saved_event(sender, instance, created, raw, using, update_fields,
+                      **kwargs):
+    """Count a created or changed event in its organizer's statistics
+    and invalidate the calendar months it moved out of and into."""
+    if raw:
+        return
+    new = instance.snapshot()
+    old = None if created else instance._loaded_snapshot
+    if old is not None:
+        # Only the saved fields changed, and save() leaves the counters.
+        if update_fields is None:
+            update_fields = old._fields
+        new = old._replace(**{
+            name: getattr(new, name) for name in old._fields
+            if name != 'seats_taken' and (
+                name in update_fields
+                or sender._meta.get_field(name).attname in update_fields
+            )
+        })
+    OrganizerStats.objects.db_manager(using).record([(old, new)])
+    if old is None or (old.date, old.venue) != (new.date, new.venue):
+        invalidate_months(
+            snapshot.date for snapshot in (old, new) if snapshot is not None
+        )
+    instance._loaded_snapshot = new
+
+
+@receiver(post_save, sender=Event)
+def check_saved_booking(sender, instance, raw, using, **kwargs):
+    """Reject a saved event double-booking its venue, where the database
+    does not check it itself."""
+    if not raw:
+        check_bookings([instance], using)
+
+
+@receiver(pre_delete, sender=Event)
+def count_deleted_event(sender, instance, using, **kwargs):
+    """Remove an event about to be deleted from its organizer's
+    statistics and its calendar month, in the transaction of the
+    delete."""
+    old = instance.snapshot()
+    if old is None:
+        instance.refresh_from_db(using=using)
+        old = instance.snapshot()
+    OrganizerStats.objects.db_manager(using).record([(old, None)])
+    invalidate_months([old.date])
@@ -0,0 +1,125 @@
+"""
+Tests for the async event views.
+"""
+
+import asyncio
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from core.models import Event
+from event.async_views import get_executor
+from user.tokens import sign_token
+
+ALL_EVENTS_URL = reverse('event:all-events')
+ASYNC_ALL_EVENTS_URL = reverse('event:async-all-events')
+UPCOMING_EVENTS_URL = reverse('event:upcoming-events')
+ASYNC_UPCOMING_EVENTS_URL = reverse('event:async-upcoming-events')
+
+
+def async_detail_url(event_id):
+    """Return the async detail url of an event."""
+    return reverse('event:async-event-detail', args=[event_id])
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+        name='Test User',
+    )
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': '2099-12-22',
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+class AsyncEventViewTests(TransactionTestCase):
+    """Tests for the async event listings and detail.
+
+    The views query from pool threads with their own connections, so the
+    data has to be committed. The async client takes headers by name and
+    the query string in the url.
+    """
+
+    def setUp(self):
+        self.client = AsyncClient()
+        self.user = create_user()
+        self.events = [
+            create_event(organizer=self.user, title=f'Event {number}')
+            for number in range(3)
+        ]
+
+    async def test_all_events_matches_sync_view(self):
+        """Test the async listing returns what the sync one does."""
+        sync_res = await sync_to_async(self.sync_get)(ALL_EVENTS_URL)
+
+        res = await self.client.get(ASYNC_ALL_EVENTS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content, sync_res.content)
+        self.assertTrue(res.has_header('ETag'))
+
+    async def test_upcoming_events_paginated(self):
+        """Test query parameters reach the wrapped view."""
+        sync_res = await sync_to_async(self.sync_get)(
+            UPCOMING_EVENTS_URL, {'page_size': 2}
+        )
+
+        res = await self.client.get(
+            f'{ASYNC_UPCOMING_EVENTS_URL}?page_size=2'
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['results'], sync_res.json()['results'])
+        self.assertIn('/async/upcoming-events/?cursor=', res.json()['next'])
+
+    async def test_detail_requires_authentication(self):
+        """Test the async detail is only served to the organizer."""
+        url = async_detail_url(self.events[0].id)
+
+        res = await self.client.get(url)
+        self.assertEqual(res.status_code, 401)
+
+        signed = await sync_to_async(self.signed_token)(self.user)
+        res = await self.client.get(url, authorization=f'Token {signed}')
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(b'"title":"Event 0"', res.content)
+
+        other = await sync_to_async(create_user)(email='other@example.com')
+        signed = await sync_to_async(self.signed_token)(other)
+        res = await self.client.get(url, authorization=f'Token {signed}')
+        self.assertEqual(res.status_code, 404)
+
+    async def test_concurrent_requests(self):
+        """Test concurrent requests are all answered through the pool."""
+        with override_settings(EVENT_ASYNC_WORKERS=2):
+            responses = await asyncio.gather(*[
+                self.client.get(ASYNC_ALL_EVENTS_URL) for _ in range(6)
+            ])
+            self.assertEqual(get_executor()._max_workers, 2)
+
+        self.assertEqual({res.status_code for res in responses}, {200})
+        self.assertEqual(len({res.content for res in responses}), 1)
+
+    def sync_get(self, url, params=None):
+        from django.test import Client
+        return Client().get(url, params)
+
+    def signed_token(self, user):
+        return sign_token(Token.objects.create(user=user))
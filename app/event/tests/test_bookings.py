@@ -0,0 +1,258 @@
+"""
+Tests for the venue double-booking checks.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from importlib import import_module
+from unittest.mock import MagicMock, Mock, patch
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Event, VenueBookedError
+from event.bookings import (
+    CONSTRAINT_NAME,
+    booking_conflicts,
+    check_bookings,
+    has_booking_constraint,
+)
+
+EVENTS_URL = reverse('event:event-list')
+BULK_URL = reverse('event:event-bulk')
+
+
+def event_detail_url(event_id):
+    """Get and return a detail event url."""
+    return reverse('event:event-detail', args=[event_id])
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+        name='Test User',
+    )
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event 1',
+        'venue': 'Main Hall',
+        'ticket_price': Decimal('12.95'),
+        'date': date(2030, 3, 10),
+        'time': '13:00',
+        'duration': timedelta(hours=2),
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+def event_payload(**params):
+    """Return the payload of a sample event."""
+    payload = {
+        'title': 'Event',
+        'venue': 'Main Hall',
+        'ticket_price': '10.00',
+        'date': '2030-03-10',
+        'time': '14:00',
+        'duration': '01:00:00',
+    }
+    payload.update(params)
+    return payload
+
+
+class VenueBookingApiTests(TestCase):
+    """Tests for rejecting events that double-book their venue."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.booked = create_event(create_user('other@example.com'))
+
+    def test_overlapping_event_rejected(self):
+        """Test an event overlapping a booking of its venue is rejected."""
+        res = self.client.post(EVENTS_URL, event_payload())
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['detail'].code, 'venue_booked')
+        self.assertEqual(Event.objects.count(), 1)
+
+    def test_booking_across_midnight(self):
+        """Test bookings are compared over the days they span."""
+        create_event(self.user, date=date(2030, 3, 9), time='22:00',
+                     duration=timedelta(hours=4), venue='Club')
+
+        res = self.client.post(EVENTS_URL, event_payload(
+            venue='Club', date='2030-03-10', time='01:00',
+        ))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_free_slots_accepted(self):
+        """Test adjacent bookings, other venues and events without a
+        duration do not conflict."""
+        for payload in (event_payload(time='15:00'),
+                        event_payload(venue='Annex'),
+                        event_payload(duration=None)):
+            res = self.client.post(EVENTS_URL, payload, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_update_into_booking_rejected(self):
+        """Test moving an event over a booking is rejected and leaves it
+        unchanged."""
+        event = create_event(self.user, time='16:00')
+
+        res = self.client.patch(event_detail_url(event.id), {'time': '14:00'})
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        event.refresh_from_db()
+        self.assertEqual(event.time.hour, 16)
+
+    def test_update_own_booking(self):
+        """Test an event does not conflict with its own booking."""
+        event = create_event(self.user, time='16:00')
+
+        res = self.client.patch(
+            event_detail_url(event.id), {'duration': '03:00:00'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_bulk_conflicts_rejected(self):
+        """Test bulk events conflicting with each other or with a booking
+        reject the whole request."""
+        for payload in (
+            [event_payload(venue='Annex'), event_payload(venue='Annex')],
+            [event_payload(venue='Annex'), event_payload()],
+        ):
+            res = self.client.post(BULK_URL, payload, format='json')
+
+            self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+            self.assertEqual(Event.objects.count(), 1)
+
+    def test_bulk_update_swapping_slots(self):
+        """Test bulk updates are checked against the new values of the
+        other updated events."""
+        first = create_event(self.user, venue='Annex', time='10:00')
+        second = create_event(self.user, venue='Annex', time='12:00')
+
+        res = self.client.patch(BULK_URL, [
+            {'id': first.id, 'time': '12:00'},
+            {'id': second.id, 'time': '10:00'},
+        ], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(EVENT_MAX_DURATION_DAYS=1)
+    def test_duration_validated(self):
+        """Test durations must be positive and not too long."""
+        for duration in ('00:00:00', '-01:00:00', '1 00:00:01'):
+            res = self.client.post(
+                EVENTS_URL, event_payload(venue='Annex', duration=duration)
+            )
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('duration', res.data)
+
+
+class BookingCheckTests(TestCase):
+    """Tests for the checks behind the api."""
+
+    def setUp(self):
+        self.user = create_user()
+
+    def test_fallback_checks_saves(self):
+        """Test saving through the ORM is checked without the
+        constraint."""
+        create_event(self.user)
+
+        with patch('event.bookings.has_booking_constraint',
+                   return_value=False):
+            with self.assertRaises(VenueBookedError):
+                with booking_conflicts():
+                    create_event(self.user, time='14:30')
+
+        self.assertEqual(Event.objects.count(), 1)
+
+    def test_fallback_looks_back_longest_duration(self):
+        """Test bookings that started before the day of an event are
+        found up to the longest duration back."""
+        create_event(self.user, date=date(2030, 3, 1),
+                     duration=timedelta(days=5))
+        event = Event(
+            organizer=self.user, title='Late', venue='Main Hall',
+            ticket_price=Decimal(1), date=date(2030, 3, 5), time='09:00',
+            duration=timedelta(hours=1),
+        )
+
+        with patch('event.bookings.has_booking_constraint',
+                   return_value=False):
+            with self.assertRaises(VenueBookedError):
+                check_bookings([event])
+
+    def test_constraint_violations_translated(self):
+        """Test writes the exclusion constraint rejects raise a booking
+        error, and other integrity errors go through."""
+        def violation(constraint_name):
+            exc = IntegrityError()
+            exc.__cause__ = Exception()
+            exc.__cause__.diag = Mock(constraint_name=constraint_name)
+            return exc
+
+        with self.assertRaises(VenueBookedError):
+            with booking_conflicts():
+                raise violation(CONSTRAINT_NAME)
+        with self.assertRaises(IntegrityError):
+            with booking_conflicts():
+                raise violation('event_seats_within_capacity')
+
+    def test_constraint_skipped_without_extension_privilege(self):
+        """Test the migration leaves the checks to the api when the
+        extension is available but the role may not create it."""
+        migration = import_module('core.migrations.0012_event_duration')
+        schema_editor = MagicMock()
+        schema_editor.connection.vendor = 'postgresql'
+        schema_editor.connection.alias = connection.alias
+        cursor = schema_editor.connection.cursor.return_value.__enter__
+        cursor.return_value.fetchone.return_value = (1,)
+        executed = []
+
+        def execute(sql):
+            executed.append(sql)
+            if sql == migration.CREATE_BTREE_GIST:
+                with connection.cursor() as cursor:
+                    # Fails like a role lacking the privilege would.
+                    cursor.execute('SELECT * FROM no_such_table')
+
+        schema_editor.execute.side_effect = execute
+
+        migration.create_booking_constraint(None, schema_editor)
+
+        self.assertEqual(executed, [migration.CREATE_BTREE_GIST])
+        self.assertEqual(Event.objects.count(), 0)
+
+    def test_exclusion_constraint(self):
+        """Test the database rejects double bookings written around the
+        ORM checks."""
+        if not has_booking_constraint(connection.alias):
+            self.skipTest('the btree_gist extension is not available')
+        create_event(self.user)
+
+        with self.assertRaises(VenueBookedError):
+            with booking_conflicts():
+                Event.objects.bulk_create([Event(
+                    organizer=self.user, title='Bulk', venue='Main Hall',
+                    ticket_price=Decimal(1), date=date(2030, 3, 10),
+                    time='14:00', duration=timedelta(hours=1),
+                )])
@@ -0,0 +1,237 @@
+"""
+Tests for creating and updating events in bulk.
+"""
+
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Enrollment, Event
+
+BULK_URL = reverse('event:event-bulk')
+ALL_EVENTS_URL = reverse('event:all-events')
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+        name='Test User',
+    )
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event 1',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': '2023-12-22',
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+def event_payload(number, **params):
+    """Return the payload of a sample event."""
+    payload = {
+        'title': f'Event {number}',
+        'venue': 'Online',
+        'ticket_price': '12.95',
+        'date': '2023-12-22',
+        'time': '13:00',
+    }
+    payload.update(params)
+    return payload
+
+
+class BulkCreateEventTests(TestCase):
+    """Tests for creating events in bulk."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_from_json(self):
+        """Test a JSON array of events is created for the user."""
+        payload = [event_payload(number) for number in range(3)]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 3)
+        events = Event.objects.filter(organizer=self.user).order_by('id')
+        self.assertEqual(
+            [event.title for event in events],
+            ['Event 0', 'Event 1', 'Event 2'],
+        )
+        self.assertEqual([item['id'] for item in res.data],
+                         [event.id for event in events])
+
+    def test_bulk_create_from_ndjson(self):
+        """Test an NDJSON stream of events is created."""
+        body = '\n'.join(
+            json.dumps(event_payload(number)) for number in range(3)
+        ) + '\n'
+
+        res = self.client.post(
+            BULK_URL, body, content_type='application/x-ndjson'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Event.objects.filter(organizer=self.user).count(), 3)
+
+    def test_malformed_ndjson_rejected(self):
+        """Test a broken NDJSON line is reported."""
+        body = json.dumps(event_payload(1)) + '\n{not json\n'
+
+        res = self.client.post(
+            BULK_URL, body, content_type='application/x-ndjson'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('line 2', res.data['detail'])
+
+    def test_bulk_create_reports_errors_per_item(self):
+        """Test one invalid event fails the batch and is reported at its
+        position."""
+        payload = [
+            event_payload(0),
+            event_payload(1, ticket_price='free'),
+            event_payload(2),
+        ]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('ticket_price', res.data[1])
+        self.assertEqual(res.data[2], {})
+        self.assertFalse(Event.objects.exists())
+
+    @override_settings(EVENT_BULK_MAX_ITEMS=2)
+    def test_bulk_create_size_limited(self):
+        """Test requests over the item limit are rejected."""
+        payload = [event_payload(number) for number in range(3)]
+
+        res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Event.objects.exists())
+
+    @override_settings(EVENT_BULK_BATCH_SIZE=2)
+    def test_bulk_create_in_batches(self):
+        """Test events are inserted a batch per statement."""
+        payload = [event_payload(number) for number in range(5)]
+        self.client.post(BULK_URL, [event_payload(5)], format='json')
+
+        with self.assertNumQueries(6):
+            # Savepoint and release, one insert per batch, then one
+            # update of the organizer statistics.
+            res = self.client.post(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Event.objects.count(), 6)
+
+    def test_bulk_create_invalidates_listing_cache(self):
+        """Test the cached all events listing sees the new events."""
+        self.client.get(ALL_EVENTS_URL)
+
+        self.client.post(BULK_URL, [event_payload(1)], format='json')
+        res = self.client.get(ALL_EVENTS_URL)
+
+        self.assertEqual(len(res.data), 1)
+
+
+class BulkUpdateEventTests(TestCase):
+    """Tests for updating events in bulk."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_update(self):
+        """Test the named events are updated and others left alone."""
+        first = create_event(organizer=self.user)
+        second = create_event(organizer=self.user)
+        untouched = create_event(organizer=self.user)
+        payload = [
+            {'id': first.id, 'title': 'First'},
+            {'id': second.id, 'venue': 'Hall', 'ticket_price': '5.00'},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        untouched.refresh_from_db()
+        self.assertEqual(first.title, 'First')
+        self.assertEqual(second.venue, 'Hall')
+        self.assertEqual(second.ticket_price, Decimal('5.00'))
+        self.assertEqual(untouched.title, 'Event 1')
+        self.assertGreater(first.updated_at, untouched.updated_at)
+
+    def test_bulk_update_other_users_event_rejected(self):
+        """Test events of other organizers cannot be updated."""
+        other = create_event(organizer=create_user(email='o@example.com'))
+        own = create_event(organizer=self.user)
+        payload = [
+            {'id': own.id, 'title': 'Mine'},
+            {'id': other.id, 'title': 'Theirs'},
+            {'title': 'No id'},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('id', res.data[1])
+        self.assertIn('id', res.data[2])
+        own.refresh_from_db()
+        self.assertEqual(own.title, 'Event 1')
+
+    def test_bulk_update_duplicate_id_rejected(self):
+        """Test an event cannot be named twice in one request."""
+        event = create_event(organizer=self.user)
+        payload = [
+            {'id': event.id, 'title': 'A'},
+            {'id': event.id, 'title': 'B'},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', res.data[1])
+
+    def test_bulk_update_keeps_seat_counters(self):
+        """Test seats can not drop below enrollments and the counters
+        are left alone."""
+        event = create_event(organizer=self.user, max_attendees=5)
+        Enrollment.objects.enroll(create_user(email='a@example.com'), event)
+        Enrollment.objects.enroll(create_user(email='b@example.com'), event)
+
+        res = self.client.patch(
+            BULK_URL, [{'id': event.id, 'max_attendees': 1}], format='json'
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('max_attendees', res.data[0])
+
+        res = self.client.patch(
+            BULK_URL, [{'id': event.id, 'max_attendees': 3}], format='json'
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        event.refresh_from_db()
+        self.assertEqual(event.max_attendees, 3)
+        self.assertEqual(event.seats_taken, 2)
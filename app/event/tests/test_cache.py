@@ -0,0 +1,154 @@
+"""
+Tests for the cached event listings.
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Event
+from core.tests.test_cache import FakeRedis
+from event.cache import get_listing_cache
+from event.checks import check_listing_cache_shared
+
+ALL_EVENTS_URL = reverse('event:all-events')
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event 1',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': '2023-12-22',
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+class CachedListingTests(TestCase):
+    """Tests for caching the all events listing."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='test123',
+        )
+        self.event = create_event(organizer=self.user)
+
+    def test_repeated_listing_served_from_cache(self):
+        """Test the listing is not queried again once cached."""
+        first = self.client.get(ALL_EVENTS_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(ALL_EVENTS_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+
+    def test_variants_cached_separately(self):
+        """Test paginated listings do not share the plain listing entry."""
+        self.client.get(ALL_EVENTS_URL)
+
+        res = self.client.get(ALL_EVENTS_URL, {'page_size': 1})
+
+        self.assertEqual(res.data['results'][0]['id'], self.event.id)
+
+    def test_save_invalidates_listing(self):
+        """Test a changed event is listed right away."""
+        self.client.get(ALL_EVENTS_URL)
+
+        self.event.title = 'Updated Event'
+        self.event.save()
+        res = self.client.get(ALL_EVENTS_URL)
+
+        self.assertEqual(res.data[0]['title'], 'Updated Event')
+
+    def test_delete_invalidates_listing(self):
+        """Test a deleted event disappears from the listing."""
+        self.client.get(ALL_EVENTS_URL)
+
+        self.event.delete()
+        res = self.client.get(ALL_EVENTS_URL)
+
+        self.assertEqual(res.data, [])
+
+    @override_settings(EVENT_LISTING_CACHE_TTL=60)
+    @patch('core.cache.time.monotonic')
+    def test_listing_expires(self, patched_monotonic):
+        """Test a cached listing expires even without a version bump,
+        as made by writes through another process."""
+        patched_monotonic.return_value = 100
+        self.client.get(ALL_EVENTS_URL)
+        Event.objects.filter(pk=self.event.pk).update(title='Elsewhere')
+
+        patched_monotonic.return_value = 159
+        self.assertEqual(
+            self.client.get(ALL_EVENTS_URL).data[0]['title'], 'Event 1'
+        )
+        patched_monotonic.return_value = 161
+        self.assertEqual(
+            self.client.get(ALL_EVENTS_URL).data[0]['title'], 'Elsewhere'
+        )
+
+    def test_clock_filters_not_cached(self):
+        """Test listings filtered on the current time are queried every
+        time, as events drop out of them without being written."""
+        self.client.get(ALL_EVENTS_URL, {'upcoming': 'true'})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(ALL_EVENTS_URL, {'upcoming': 'true'})
+
+        self.assertTrue(queries.captured_queries)
+
+    def test_per_process_cache_checked(self):
+        """Test the deploy checks warn about a listing cache kept per
+        process."""
+        shared = {'events': {'BACKEND': 'core.cache.RedisCache'}}
+
+        self.assertEqual(
+            [error.id for error in check_listing_cache_shared(None)],
+            ['event.W001'],
+        )
+        with override_settings(CORE_CACHES=shared):
+            self.assertEqual(check_listing_cache_shared(None), [])
+
+    def test_hits_and_misses_counted(self):
+        """Test the listing cache reports its hits and misses."""
+        cache = get_listing_cache()
+        cache.reset_stats()
+
+        self.client.get(ALL_EVENTS_URL)
+        self.client.get(ALL_EVENTS_URL)
+
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_redis_backend(self):
+        """Test the listing can be cached in a shared backend."""
+        client = FakeRedis()
+        caches = {
+            'events': {
+                'BACKEND': 'core.cache.RedisCache',
+                'OPTIONS': {'client': client},
+            },
+        }
+
+        with override_settings(CORE_CACHES=caches):
+            self.client.get(ALL_EVENTS_URL)
+            with self.assertNumQueries(0):
+                res = self.client.get(ALL_EVENTS_URL)
+
+        self.assertEqual(res.data[0]['id'], self.event.id)
+        self.assertIn('version', client.data)
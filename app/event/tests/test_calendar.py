@@ -0,0 +1,250 @@
+"""
+Tests for the event calendar.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Event
+from event.cache import get_listing_cache
+from event.calendar import daily_counts
+
+CALENDAR_URL = reverse('event:event-calendar')
+BULK_URL = reverse('event:event-bulk')
+
+
+def event_detail_url(event_id):
+    """Get and return a detail event url."""
+    return reverse('event:event-detail', args=[event_id])
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+        name='Test User',
+    )
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event 1',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': date(2030, 3, 10),
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+class EventCalendarTests(TestCase):
+    """Tests for counting events per day."""
+
+    def setUp(self):
+        get_listing_cache().clear()
+        self.user = create_user()
+        self.client = APIClient()
+
+    def get_calendar(self, **params):
+        params.setdefault('date_from', '2030-03-01')
+        params.setdefault('date_to', '2030-04-30')
+        res = self.client.get(CALENDAR_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return {
+            entry['date']: entry for entry in res.json()['days']
+            if entry['events']
+        }
+
+    def test_counts_per_day(self):
+        """Test every day of the window is listed with its events."""
+        create_event(self.user)
+        create_event(self.user, venue='Hall')
+        create_event(self.user, date=date(2030, 4, 30))
+        create_event(self.user, date=date(2030, 5, 1))
+
+        res = self.client.get(CALENDAR_URL, {
+            'date_from': '2030-03-01', 'date_to': '2030-04-30',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['days']), 61)
+        self.assertEqual(res.data['days'][0], {
+            'date': date(2030, 3, 1), 'events': 0,
+        })
+        self.assertEqual(self.get_calendar(), {
+            '2030-03-10': {'date': '2030-03-10', 'events': 2},
+            '2030-04-30': {'date': '2030-04-30', 'events': 1},
+        })
+
+    def test_counts_per_venue(self):
+        """Test the days are broken down by venue."""
+        create_event(self.user)
+        create_event(self.user)
+        create_event(self.user, venue='Hall')
+
+        days = self.get_calendar(by_venue='true')
+
+        self.assertEqual(days, {'2030-03-10': {
+            'date': '2030-03-10', 'events': 3,
+            'venues': {'Online': 2, 'Hall': 1},
+        }})
+
+    def test_current_month_by_default(self):
+        """Test the calendar covers the current month by default."""
+        today = timezone.localdate()
+        create_event(self.user, date=today)
+
+        res = self.client.get(CALENDAR_URL)
+
+        self.assertEqual(res.data['date_from'], today.replace(day=1))
+        self.assertEqual(res.data['days'][today.day - 1]['events'], 1)
+
+    @override_settings(EVENT_CALENDAR_MAX_DAYS=31)
+    def test_window_validated(self):
+        """Test reversed and too long windows are rejected."""
+        for params in ({'date_from': '2030-03-02', 'date_to': '2030-03-01'},
+                       {'date_from': '2030-03-01', 'date_to': '2030-04-01'}):
+            res = self.client.get(CALENDAR_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_months_cached(self):
+        """Test cached months are served without a query and only the
+        others are counted."""
+        create_event(self.user)
+        self.get_calendar(date_from='2030-03-01', date_to='2030-03-31')
+
+        with self.assertNumQueries(1):
+            days = self.get_calendar()
+        with self.assertNumQueries(0):
+            self.assertEqual(days, self.get_calendar())
+
+    @override_settings(EVENT_LISTING_CACHE_TTL=60)
+    @patch('core.cache.time.monotonic')
+    def test_months_expire(self, patched_monotonic):
+        """Test cached months expire even without a version bump, as
+        made by writes through another process."""
+        patched_monotonic.return_value = 100
+        self.get_calendar()
+        Event.objects.bulk_create([Event(
+            organizer=self.user, title='Elsewhere', venue='Online',
+            ticket_price=Decimal('1.00'), date=date(2030, 3, 10),
+            time='13:00',
+        )])
+
+        patched_monotonic.return_value = 159
+        self.assertEqual(self.get_calendar(), {})
+        patched_monotonic.return_value = 161
+        self.assertEqual(list(self.get_calendar()), ['2030-03-10'])
+
+    def test_moved_event_invalidates_its_months(self):
+        """Test moving an event invalidates the months it left and
+        entered, and no other."""
+        event = create_event(self.user)
+        create_event(self.user, date=date(2030, 5, 5))
+        self.get_calendar(date_from='2030-03-01', date_to='2030-05-31')
+        self.client.force_authenticate(self.user)
+
+        self.client.patch(event_detail_url(event.id), {'date': '2030-04-02'})
+
+        with self.assertNumQueries(1) as queries:
+            days = self.get_calendar(
+                date_from='2030-03-01', date_to='2030-05-31'
+            )
+        self.assertIn("'2030-04-30'", queries.captured_queries[0]['sql'])
+        self.assertEqual(list(days), ['2030-04-02', '2030-05-05'])
+
+    def test_unrelated_change_keeps_cache(self):
+        """Test changing what the calendar does not count keeps the
+        cached months."""
+        event = create_event(self.user)
+        self.get_calendar()
+        self.client.force_authenticate(self.user)
+
+        self.client.patch(event_detail_url(event.id), {'title': 'Renamed'})
+
+        with self.assertNumQueries(0):
+            self.get_calendar()
+
+    def test_venue_change_invalidates_month(self):
+        """Test changing the venue of an event invalidates its month."""
+        event = create_event(self.user)
+        self.get_calendar(by_venue='true')
+        self.client.force_authenticate(self.user)
+
+        self.client.patch(event_detail_url(event.id), {'venue': 'Hall'})
+
+        self.assertEqual(
+            self.get_calendar(by_venue='true')['2030-03-10']['venues'],
+            {'Hall': 1},
+        )
+
+    def test_deleted_and_bulk_events_invalidate(self):
+        """Test deleted and bulk created events invalidate their
+        months."""
+        event = create_event(self.user)
+        self.get_calendar()
+        self.client.force_authenticate(self.user)
+
+        self.client.delete(event_detail_url(event.id))
+        self.assertEqual(self.get_calendar(), {})
+
+        self.client.post(BULK_URL, [{
+            'title': 'Bulk', 'venue': 'Online', 'ticket_price': '1.00',
+            'date': '2030-04-01', 'time': '13:00',
+        }], format='json')
+        self.assertEqual(list(self.get_calendar()), ['2030-04-01'])
+
+    def test_saved_without_loading_invalidates(self):
+        """Test an event saved over without being loaded invalidates the
+        month it was in."""
+        event = create_event(self.user)
+        self.get_calendar()
+
+        Event(
+            pk=event.pk, organizer=self.user, title='Moved', venue='Online',
+            ticket_price=Decimal('1.00'), date=date(2030, 4, 1),
+            time='13:00',
+        ).save()
+
+        self.assertEqual(list(self.get_calendar()), ['2030-04-01'])
+
+    def test_counted_on_date_index(self):
+        """Test the days are counted from the date index."""
+        Event.objects.bulk_create(
+            Event(
+                organizer=self.user, title=f'Event {number}',
+                venue=f'Venue {number % 50}', ticket_price=Decimal(1),
+                date=date(2030, 1, 1) + timedelta(days=number % 700),
+                time='13:00',
+            )
+            for number in range(2000)
+        )
+        queryset = daily_counts(
+            Event.objects.all(), date(2030, 3, 1), date(2030, 3, 31)
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_event')
+            cursor.execute('SET enable_seqscan = off')
+        try:
+            plan = queryset.explain()
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('RESET enable_seqscan')
+
+        self.assertIn('event_date_time_id_idx', plan)
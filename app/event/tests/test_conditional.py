@@ -0,0 +1,152 @@
+"""
+Tests for conditional GET requests to the event api.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Event
+
+EVENTS_URL = reverse('event:event-list')
+ALL_EVENTS_URL = reverse('event:all-events')
+
+
+def event_detail_url(event_id):
+    """Get and return a detail event url."""
+    return reverse('event:event-detail', args=[event_id])
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event 1',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': '2023-12-22',
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+class ConditionalGetTests(TestCase):
+    """Tests for ETag and Last-Modified validation."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='test123',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.event = create_event(organizer=self.user)
+
+    def test_listing_not_modified(self):
+        """Test a matching ETag short-circuits the listing to 304 with
+        the page query only."""
+        res = self.client.get(EVENTS_URL)
+        etag = res['ETag']
+
+        with self.assertNumQueries(1):
+            res = self.client.get(EVENTS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertEqual(res.content, b'')
+
+    def test_listing_etag_changes_on_update(self):
+        """Test updating an event invalidates the listing ETag."""
+        etag = self.client.get(EVENTS_URL)['ETag']
+
+        self.event.title = 'Updated Event'
+        self.event.save()
+        res = self.client.get(EVENTS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_listing_etag_changes_on_delete(self):
+        """Test deleting an event invalidates the listing ETag."""
+        create_event(organizer=self.user, title='Event 2')
+        etag = self.client.get(EVENTS_URL)['ETag']
+
+        self.event.delete()
+        res = self.client.get(EVENTS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_listing_page_not_aggregated(self):
+        """Test a page of a listing is validated without a query over
+        the whole listing."""
+        create_event(organizer=self.user, title='Event 2')
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(EVENTS_URL, {'page_size': 1})
+
+        self.assertTrue(res.has_header('ETag'))
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('COUNT(', queries.captured_queries[0]['sql'])
+
+    def test_listing_etag_depends_on_query(self):
+        """Test different pages of a listing have different ETags."""
+        etag = self.client.get(EVENTS_URL)['ETag']
+
+        res = self.client.get(
+            EVENTS_URL, {'page_size': 1}, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_all_events_not_modified(self):
+        """Test the cached all events listing honours its ETag."""
+        etag = self.client.get(ALL_EVENTS_URL)['ETag']
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ALL_EVENTS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_not_modified_since(self):
+        """Test a detail view answers If-Modified-Since with 304."""
+        url = event_detail_url(self.event.id)
+        res = self.client.get(url)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=res['Last-Modified']
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_etag_changes_on_update(self):
+        """Test updating an event invalidates its detail ETag."""
+        url = event_detail_url(self.event.id)
+        etag = self.client.get(url)['ETag']
+
+        self.client.patch(url, {'title': 'Updated Event'})
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['title'], 'Updated Event')
+
+    def test_detail_of_other_user_event_not_found(self):
+        """Test validators are not computed for other users' events."""
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='test123',
+        )
+        event = create_event(organizer=other)
+
+        res = self.client.get(event_detail_url(event.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(res.has_header('ETag'))
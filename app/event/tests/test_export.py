@@ -0,0 +1,137 @@
+"""
+Tests for the streaming event export.
+"""
+
+import csv
+import io
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Event
+from event.serializers import EventSerializer
+
+EXPORT_URL = reverse('event:export-events')
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+        name='Test User',
+    )
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': '2023-12-22',
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+def read_body(res):
+    """Return the streamed body of the response as text."""
+    return b''.join(res.streaming_content).decode()
+
+
+class ExportEventTests(TestCase):
+    """Tests for exporting the events."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.events = [
+            create_event(organizer=self.user, title='Café, "late" show'),
+            create_event(
+                organizer=self.user,
+                ticket_price=Decimal('5'),
+                date='2024-01-02',
+                time='09:30',
+            ),
+        ]
+
+    def expected(self):
+        return [
+            dict(data) for data in EventSerializer(
+                Event.objects.order_by('id'), many=True
+            ).data
+        ]
+
+    def test_export_ndjson_matches_serializer(self):
+        """Test every event is streamed as a JSON line matching the
+        event serializer."""
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertTrue(res['Content-Type'].startswith(
+            'application/x-ndjson'
+        ))
+        lines = read_body(res).splitlines()
+        self.assertEqual([json.loads(line) for line in lines],
+                         self.expected())
+        self.assertEqual(
+            lines[0],
+            json.dumps(self.expected()[0], ensure_ascii=False,
+                       separators=(',', ':')),
+        )
+
+    def test_export_csv(self):
+        """Test the csv export has a header and a row per event."""
+        res = self.client.get(EXPORT_URL, {'format': 'csv'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/csv'))
+        self.assertIn('events.csv', res['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(read_body(res))))
+        expected = [
+            {key: '' if value is None else str(value)
+             for key, value in event.items()}
+            for event in self.expected()
+        ]
+        self.assertEqual(rows, expected)
+
+    def test_export_format_negotiated_from_accept_header(self):
+        """Test the csv export is picked from the Accept header."""
+        res = self.client.get(EXPORT_URL, HTTP_ACCEPT='text/csv')
+
+        self.assertTrue(res['Content-Type'].startswith('text/csv'))
+
+    def test_export_filtered(self):
+        """Test the listing filters apply to the export."""
+        res = self.client.get(EXPORT_URL, {'date_from': '2024-01-01'})
+
+        lines = read_body(res).splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['id'], self.events[1].id)
+
+    def test_invalid_filter_rejected(self):
+        """Test invalid filters are reported in the export format."""
+        res = self.client.get(EXPORT_URL, {'min_price': 'cheap'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('min_price', json.loads(res.content))
+
+    @override_settings(EVENT_EXPORT_CHUNK_SIZE=1)
+    def test_export_streams_in_chunks(self):
+        """Test every row is exported when fetched one at a time."""
+        for number in range(3):
+            create_event(organizer=self.user, title=f'Extra {number}')
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(len(read_body(res).splitlines()), 5)
@@ -0,0 +1,147 @@
+"""
+Tests for the fast serialization of the event listings.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from core.models import Event
+from event.cache import get_listing_cache
+from event.fast import ValuesSerializer
+from event.serializers import EventDetailSerializer, EventSerializer
+
+EVENTS_URL = reverse('event:event-list')
+ALL_EVENTS_URL = reverse('event:all-events')
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+        name='Test User',
+    )
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': '2023-12-22',
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+class ValuesSerializerTests(TestCase):
+    """Tests for serializing values rows."""
+
+    def setUp(self):
+        user = create_user()
+        create_event(organizer=user, title='Café "quoted" ')
+        create_event(
+            organizer=user,
+            ticket_price=Decimal('0'),
+            time='09:05:30',
+            description='Longer text',
+        )
+        create_event(organizer=user, ticket_price=Decimal('99999999.99'))
+
+    def test_output_matches_model_serializer(self):
+        """Test values rows serialize exactly like the model instances."""
+        for serializer_class in (EventSerializer, EventDetailSerializer):
+            fast = ValuesSerializer(serializer_class)
+            events = Event.objects.order_by('id')
+
+            self.assertEqual(
+                fast.serialize(events.values(*fast.sources)),
+                serializer_class(events, many=True).data,
+            )
+
+    def test_nested_source_not_supported(self):
+        """Test serializers reading through relations are refused."""
+        class NestedSerializer(serializers.ModelSerializer):
+            email = serializers.CharField(source='organizer.email')
+
+            class Meta:
+                model = Event
+                fields = ['id', 'email']
+
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(NestedSerializer)
+
+
+class FastListingTests(TestCase):
+    """Tests for the listings served by the fast path."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        for number in range(5):
+            create_event(
+                organizer=self.user,
+                title=f'Évent {number}',
+                ticket_price=Decimal(number) / 4,
+                date=f'2024-01-0{number + 1}',
+                time=f'1{number}:30',
+            )
+
+    def fetch_both(self, url, params=None):
+        """Return the response bodies of the slow and the fast path."""
+        contents = []
+        for fast in (False, True):
+            get_listing_cache().clear()
+            with override_settings(EVENT_FAST_SERIALIZATION=fast):
+                res = self.client.get(url, params)
+            self.assertEqual(res.status_code, 200)
+            contents.append(res.content)
+        return contents
+
+    def test_all_events_byte_identical(self):
+        """Test the fast all events listing matches the slow one byte
+        for byte."""
+        slow, fast = self.fetch_both(ALL_EVENTS_URL)
+
+        self.assertEqual(fast, slow)
+
+    def test_paginated_listing_byte_identical(self):
+        """Test pages and their cursors match on both paths."""
+        params = {'page_size': 2, 'ordering': 'date'}
+        slow, fast = self.fetch_both(ALL_EVENTS_URL, params)
+        self.assertEqual(fast, slow)
+
+        with override_settings(EVENT_FAST_SERIALIZATION=True):
+            res = self.client.get(ALL_EVENTS_URL, params)
+            res = self.client.get(res.data['next'])
+
+        self.assertEqual(
+            [event['title'] for event in res.data['results']],
+            ['Évent 2', 'Évent 3'],
+        )
+
+    def test_organized_events_byte_identical(self):
+        """Test the organized events listing matches on both paths."""
+        self.client.force_authenticate(self.user)
+
+        slow, fast = self.fetch_both(EVENTS_URL, {'min_price': '0.5'})
+
+        self.assertEqual(fast, slow)
+
+    @override_settings(EVENT_FAST_SERIALIZATION=True)
+    def test_fast_listing_single_query(self):
+        """Test the fast listing still needs a single row query."""
+        self.client.force_authenticate(self.user)
+
+        with self.assertNumQueries(1):
+            self.client.get(EVENTS_URL)
@@ -0,0 +1,269 @@
+"""
+Tests for filtering and ordering the event listings.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.models import Event
+from event.filters import EventFilterBackend
+
+ALL_EVENTS_URL = reverse('event:all-events')
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+    )
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': '2023-12-22',
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+def filtered_queryset(params):
+    """Return the queryset the filter backend builds for `params`."""
+    request = Request(APIRequestFactory().get(ALL_EVENTS_URL, params))
+    return EventFilterBackend().filter_queryset(
+        request, Event.objects.all(), None
+    )
+
+
+class EventFilterTests(TestCase):
+    """Tests for the filter parameters of the listings."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+
+    def get_ids(self, params):
+        res = self.client.get(ALL_EVENTS_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return {event['id'] for event in res.data}
+
+    def test_filter_by_date_range(self):
+        """Test events are limited to the date range."""
+        create_event(organizer=self.user, date='2024-01-01')
+        inside = create_event(organizer=self.user, date='2024-01-15')
+        create_event(organizer=self.user, date='2024-02-01')
+
+        ids = self.get_ids(
+            {'date_from': '2024-01-10', 'date_to': '2024-01-31'}
+        )
+
+        self.assertEqual(ids, {inside.id})
+
+    def test_filter_by_venue(self):
+        """Test events are limited to the venue."""
+        zoom = create_event(organizer=self.user, venue='Zoom')
+        create_event(organizer=self.user, venue='Online')
+
+        self.assertEqual(self.get_ids({'venue': 'Zoom'}), {zoom.id})
+
+    def test_filter_by_price_band(self):
+        """Test events are limited to the price band."""
+        create_event(organizer=self.user, ticket_price=Decimal('5.00'))
+        inside = create_event(
+            organizer=self.user, ticket_price=Decimal('15.00')
+        )
+        create_event(organizer=self.user, ticket_price=Decimal('25.00'))
+
+        ids = self.get_ids({'min_price': '10', 'max_price': '20'})
+
+        self.assertEqual(ids, {inside.id})
+
+    def test_filter_free_only(self):
+        """Test only free events are listed."""
+        free = create_event(organizer=self.user, ticket_price=Decimal('0'))
+        create_event(organizer=self.user)
+
+        self.assertEqual(self.get_ids({'free': 'true'}), {free.id})
+
+    def test_filter_by_organizer(self):
+        """Test events are limited to the organizer."""
+        other = create_user(email='other@example.com')
+        create_event(organizer=self.user)
+        event = create_event(organizer=other)
+
+        self.assertEqual(self.get_ids({'organizer': other.id}), {event.id})
+
+    def test_filter_upcoming_only(self):
+        """Test only events that have not started are listed."""
+        today = timezone.localdate()
+        create_event(organizer=self.user, date=today - timedelta(days=1))
+        upcoming = create_event(
+            organizer=self.user, date=today + timedelta(days=1)
+        )
+
+        self.assertEqual(self.get_ids({'upcoming': 'true'}), {upcoming.id})
+
+    def test_invalid_filters_rejected(self):
+        """Test malformed and inconsistent filters return a 400."""
+        for params in [
+            {'date_from': 'tomorrow'},
+            {'min_price': '20', 'max_price': '10'},
+            {'date_from': '2024-02-01', 'date_to': '2024-01-01'},
+        ]:
+            res = self.client.get(ALL_EVENTS_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filtered_listing_query_count(self):
+        """Test a filtered listing costs the page query only."""
+        for i in range(3):
+            create_event(organizer=self.user, venue='Zoom', title=f'E {i}')
+
+        with self.assertNumQueries(1):
+            self.client.get(ALL_EVENTS_URL, {'venue': 'Zoom', 'free': 'false'})
+
+
+class EventOrderingTests(TestCase):
+    """Tests for ordering the listings."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+
+    def test_order_by_price(self):
+        """Test events are ordered by price with ties broken by id."""
+        mid = create_event(organizer=self.user, ticket_price=Decimal('10'))
+        low = create_event(organizer=self.user, ticket_price=Decimal('5'))
+        tie = create_event(organizer=self.user, ticket_price=Decimal('10'))
+
+        res = self.client.get(ALL_EVENTS_URL, {'ordering': 'ticket_price'})
+
+        self.assertEqual(
+            [event['id'] for event in res.data], [low.id, mid.id, tie.id]
+        )
+
+    def test_order_by_date_includes_time(self):
+        """Test ordering by date orders events on the same day by time."""
+        late = create_event(organizer=self.user, time='18:00')
+        early = create_event(organizer=self.user, time='08:00')
+
+        res = self.client.get(ALL_EVENTS_URL, {'ordering': '-date'})
+
+        self.assertEqual(
+            [event['id'] for event in res.data], [late.id, early.id]
+        )
+
+    def test_unknown_ordering_ignored(self):
+        """Test ordering by a field outside the whitelist is ignored."""
+        first = create_event(organizer=self.user, description='b')
+        second = create_event(organizer=self.user, description='a')
+
+        res = self.client.get(ALL_EVENTS_URL, {'ordering': 'description'})
+
+        self.assertEqual(
+            [event['id'] for event in res.data], [second.id, first.id]
+        )
+
+    def test_paginate_custom_ordering(self):
+        """Test the keyset pagination follows the requested ordering."""
+        prices = ['7', '3', '9', '3', '1']
+        events = [
+            create_event(organizer=self.user, ticket_price=Decimal(price))
+            for price in prices
+        ]
+
+        ids = []
+        res = self.client.get(
+            ALL_EVENTS_URL, {'ordering': '-ticket_price', 'page_size': 2}
+        )
+        while True:
+            ids += [event['id'] for event in res.data['results']]
+            if not res.data['next']:
+                break
+            res = self.client.get(res.data['next'])
+
+        expected = sorted(
+            events, key=lambda event: (event.ticket_price, event.id),
+            reverse=True,
+        )
+        self.assertEqual(ids, [event.id for event in expected])
+
+
+class EventFilterIndexTests(TestCase):
+    """Tests that every filter is answered from an index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        organizers = [
+            create_user(email=f'organizer{number}@example.com')
+            for number in range(20)
+        ]
+        Event.objects.bulk_create(
+            Event(
+                organizer=organizers[number % len(organizers)],
+                title=f'Event {number}',
+                venue=f'Venue {number % 50}',
+                ticket_price=Decimal(number % 40),
+                date=timezone.localdate() + timedelta(days=number % 400 - 200),
+                time='13:00',
+            )
+            for number in range(2000)
+        )
+
+    def assertUsesIndex(self, params, index_name):
+        """Assert the filtered queryset is planned on `index_name`.
+
+        The plans are made on statistics of the varied events above,
+        analyzed inside the test transaction and rolled back with it, so
+        they do not depend on what other tests left in the table.
+        Sequential scans are disabled so the planner picks an index
+        whenever one matches.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_event')
+            cursor.execute('SET enable_seqscan = off')
+        try:
+            plan = filtered_queryset(params).explain()
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('RESET enable_seqscan')
+        self.assertIn(index_name, plan)
+
+    def test_date_range_uses_index(self):
+        self.assertUsesIndex(
+            {'date_from': '2024-01-01', 'date_to': '2024-01-31'},
+            'event_date_time_id_idx',
+        )
+
+    def test_upcoming_uses_index(self):
+        self.assertUsesIndex({'upcoming': 'true'}, 'event_date_time_id_idx')
+
+    def test_venue_uses_index(self):
+        self.assertUsesIndex({'venue': 'Zoom'}, 'event_venue_date_idx')
+
+    def test_price_band_uses_index(self):
+        self.assertUsesIndex(
+            {'min_price': '10', 'max_price': '20'}, 'event_ticket_price_idx'
+        )
+
+    def test_free_uses_index(self):
+        self.assertUsesIndex({'free': 'true'}, 'event_ticket_price_idx')
+
+    def test_organizer_uses_index(self):
+        self.assertUsesIndex({'organizer': 1}, 'event_organizer_id_idx')
@@ -0,0 +1,46 @@
+"""
+Tests for the interval tree.
+"""
+
+import random
+
+from django.test import SimpleTestCase
+
+from event.intervals import IntervalTree
+
+
+class IntervalTreeTests(SimpleTestCase):
+    """Tests for finding overlapping intervals."""
+
+    def test_half_open_intervals(self):
+        """Test intervals touching at an end do not overlap."""
+        tree = IntervalTree([(0, 10, 'a'), (10, 20, 'b'), (5, 5, 'empty')])
+
+        self.assertEqual(len(tree), 2)
+        self.assertEqual(tree.overlapping(9, 10), ['a'])
+        self.assertEqual(tree.overlapping(10, 11), ['b'])
+        self.assertEqual(tree.overlapping(9, 11), ['a', 'b'])
+        self.assertEqual(tree.overlapping(20, 30), [])
+        self.assertEqual(tree.overlapping(5, 5), [])
+
+    def test_empty_tree(self):
+        """Test a tree without intervals overlaps nothing."""
+        self.assertEqual(IntervalTree([]).overlapping(0, 1), [])
+
+    def test_matches_linear_scan(self):
+        """Test the tree finds what checking every interval finds."""
+        rng = random.Random(7)
+        intervals = []
+        for number in range(500):
+            start = rng.randrange(1000)
+            intervals.append((start, start + rng.randrange(1, 50), number))
+        tree = IntervalTree(intervals)
+
+        for _ in range(200):
+            start = rng.randrange(1000)
+            end = start + rng.randrange(1, 30)
+            expected = sorted(
+                value for low, high, value in intervals
+                if low < end and start < high
+            )
+            self.assertEqual(sorted(tree.overlapping(start, end)), expected)
@@ -0,0 +1,197 @@
+"""
+Tests for the keyset pagination of the event listings.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Event
+from event.pagination import UpcomingEventKeysetPagination
+
+EVENTS_URL = reverse('event:event-list')
+ALL_EVENTS_URL = reverse('event:all-events')
+UPCOMING_EVENTS_URL = reverse('event:upcoming-events')
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+        name='Test User',
+    )
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': '2023-12-22',
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+def collect_pages(client, url, params):
+    """Follow the next links and return every page of results."""
+    pages = []
+    res = client.get(url, params)
+    while True:
+        pages.append([event['id'] for event in res.data['results']])
+        if res.data['next'] is None:
+            return pages
+        res = client.get(res.data['next'])
+
+
+class KeysetPaginationTests(TestCase):
+    """Tests for paginating the event listings."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+
+    def test_listing_unpaginated_by_default(self):
+        """Test the listing stays a plain list without pagination params."""
+        create_event(organizer=self.user)
+
+        res = self.client.get(ALL_EVENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(res.data, list)
+
+    def test_all_events_pages_newest_first(self):
+        """Test following the cursors returns every event once, newest
+        first."""
+        events = [
+            create_event(organizer=self.user, title=f'Event {i}')
+            for i in range(7)
+        ]
+
+        pages = collect_pages(self.client, ALL_EVENTS_URL, {'page_size': 3})
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        ids = [event_id for page in pages for event_id in page]
+        self.assertEqual(ids, [event.id for event in reversed(events)])
+
+    def test_page_size_capped(self):
+        """Test the page size cannot go over the configured maximum."""
+        for i in range(4):
+            create_event(organizer=self.user, title=f'Event {i}')
+
+        with override_settings(EVENT_MAX_PAGE_SIZE=2):
+            res = self.client.get(ALL_EVENTS_URL, {'page_size': 1000})
+
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIn('page_size=2', res.data['next'])
+
+    def test_invalid_cursor_returns_not_found(self):
+        """Test a tampered cursor is rejected."""
+        res = self.client.get(ALL_EVENTS_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_is_fetched_with_one_query(self):
+        """Test a page costs a single query however deep it is."""
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        for _ in range(5):
+            create_event(organizer=self.user, date=tomorrow)
+        res = self.client.get(UPCOMING_EVENTS_URL, {'page_size': 2})
+
+        with self.assertNumQueries(1):
+            self.client.get(res.data['next'])
+
+    def test_upcoming_events_ordered_by_date_and_time(self):
+        """Test upcoming events page chronologically, with ties on
+        date and time broken by id."""
+        today = timezone.localdate()
+        create_event(
+            organizer=self.user, date=today - timedelta(days=1)
+        )
+        later = create_event(
+            organizer=self.user, date=today + timedelta(days=2), time='09:00'
+        )
+        first = create_event(
+            organizer=self.user, date=today + timedelta(days=1), time='18:00'
+        )
+        tie_a = create_event(
+            organizer=self.user, date=today + timedelta(days=2), time='08:00'
+        )
+        tie_b = create_event(
+            organizer=self.user, date=today + timedelta(days=2), time='08:00'
+        )
+
+        pages = collect_pages(
+            self.client, UPCOMING_EVENTS_URL, {'page_size': 2}
+        )
+
+        ids = [event_id for page in pages for event_id in page]
+        self.assertEqual(ids, [first.id, tie_a.id, tie_b.id, later.id])
+
+    def test_organized_events_paginated_for_user(self):
+        """Test the organized events listing pages only the user's
+        events."""
+        other = create_user(email='other@example.com')
+        create_event(organizer=other)
+        own = [create_event(organizer=self.user) for _ in range(3)]
+        self.client.force_authenticate(self.user)
+
+        pages = collect_pages(self.client, EVENTS_URL, {'page_size': 2})
+
+        ids = [event_id for page in pages for event_id in page]
+        self.assertEqual(ids, [event.id for event in reversed(own)])
+
+    def test_mixed_directions_paginated(self):
+        """Test an ordering mixing directions pages every event once."""
+        events = [
+            create_event(organizer=self.user, ticket_price=Decimal(price),
+                         date=f'2023-12-{day}')
+            for day, price in (('20', 5), ('21', 3), ('20', 7), ('21', 3))
+        ]
+
+        pages = collect_pages(self.client, ALL_EVENTS_URL, {
+            'ordering': 'date,-ticket_price', 'page_size': 1,
+        })
+
+        ids = [event_id for page in pages for event_id in page]
+        self.assertEqual(ids, [
+            events[2].id, events[0].id, events[3].id, events[1].id,
+        ])
+
+    def test_seek_is_index_range_scan(self):
+        """Test a page after a cursor is sought on the composite index
+        with a row-value comparison, not filtered out of it."""
+        Event.objects.bulk_create(
+            Event(
+                organizer=self.user, title=f'Event {number}', venue='Online',
+                ticket_price=Decimal(1), time='13:00',
+                date=timezone.localdate() + timedelta(days=number % 400),
+            )
+            for number in range(2000)
+        )
+        paginator = UpcomingEventKeysetPagination()
+        paginator.fields = ['date', 'time', 'id']
+        queryset = Event.objects.filter(paginator.seek({
+            'date': timezone.localdate() + timedelta(days=200),
+            'time': '13:00',
+            'id': 0,
+        })).order_by(*paginator.ordering)[:10]
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_event')
+        plan = queryset.explain()
+
+        self.assertIn('event_date_time_id_idx', plan)
+        self.assertIn('Index Cond: (ROW(', plan)
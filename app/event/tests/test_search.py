@@ -0,0 +1,160 @@
+"""
+Tests for searching events.
+"""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Event
+from event.search import search_events
+
+SEARCH_URL = reverse('event:search-events')
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': '2023-12-22',
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+class SearchEventsTests(TestCase):
+    """Tests for the event search endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='test123',
+        )
+
+    def search(self, text, **params):
+        res = self.client.get(SEARCH_URL, {'q': text, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [event['id'] for event in res.data['results']]
+
+    def test_search_text_required(self):
+        """Test searching without text returns an error."""
+        res = self.client.get(SEARCH_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_matches_all_words(self):
+        """Test only events matching every word are returned."""
+        match = create_event(
+            organizer=self.user,
+            title='Jazz Night',
+            description='Live music by the river',
+        )
+        create_event(organizer=self.user, title='Jazz Brunch')
+
+        self.assertEqual(self.search('jazz river'), [match.id])
+
+    def test_search_prefix_and_stemming(self):
+        """Test partial and inflected words match."""
+        event = create_event(organizer=self.user, title='Running Club')
+
+        self.assertEqual(self.search('runn'), [event.id])
+        self.assertEqual(self.search('runs'), [event.id])
+
+    def test_search_ranked_by_relevance(self):
+        """Test title matches rank above description matches."""
+        in_description = create_event(
+            organizer=self.user,
+            title='Meetup',
+            description='Python talks',
+        )
+        in_title = create_event(organizer=self.user, title='Python Meetup')
+
+        self.assertEqual(
+            self.search('python'), [in_title.id, in_description.id]
+        )
+
+    def test_search_vector_follows_updates(self):
+        """Test the search vector is kept up to date on updates."""
+        event = create_event(organizer=self.user, title='Chess')
+
+        Event.objects.filter(id=event.id).update(title='Poker')
+
+        self.assertEqual(self.search('chess'), [])
+        self.assertEqual(self.search('poker'), [event.id])
+
+    def test_search_vector_not_loaded(self):
+        """Test events are read and saved without their search vector,
+        which the database keeps up to date."""
+        event = create_event(organizer=self.user, title='Chess')
+
+        with CaptureQueriesContext(connection) as queries:
+            loaded = Event.objects.get(id=event.id)
+            loaded.title = 'Poker'
+            loaded.save()
+
+        # The load, the read of the values the save replaces, the save.
+        self.assertEqual(len(queries), 3)
+        for query in queries.captured_queries:
+            self.assertNotIn('search_vector', query['sql'])
+        self.assertEqual(self.search('poker'), [event.id])
+
+    def test_search_paginated(self):
+        """Test search results are paginated in rank order."""
+        events = [
+            create_event(organizer=self.user, title='Yoga')
+            for _ in range(3)
+        ]
+
+        res = self.client.get(SEARCH_URL, {'q': 'yoga', 'page_size': 2})
+        ids = [event['id'] for event in res.data['results']]
+        res = self.client.get(res.data['next'])
+        ids += [event['id'] for event in res.data['results']]
+
+        self.assertIsNone(res.data['next'])
+        self.assertEqual(ids, [event.id for event in reversed(events)])
+
+    def test_search_combined_with_filters(self):
+        """Test search results honour the listing filters."""
+        create_event(organizer=self.user, title='Yoga', venue='Park')
+        event = create_event(organizer=self.user, title='Yoga', venue='Gym')
+
+        self.assertEqual(self.search('yoga', venue='Gym'), [event.id])
+
+    def test_search_fallback_without_postgres(self):
+        """Test other backends fall back to substring matching."""
+        match = create_event(
+            organizer=self.user,
+            title='Board Games',
+            venue='Library',
+        )
+        create_event(organizer=self.user, title='Board Meeting')
+
+        with patch.object(connection, 'vendor', 'sqlite'):
+            ids = self.search('game libr')
+
+        self.assertEqual(ids, [match.id])
+
+    def test_search_uses_index(self):
+        """Test the search is planned on the GIN index."""
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+        try:
+            plan = search_events(Event.objects.all(), 'jazz nig').explain()
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('RESET enable_seqscan')
+
+        self.assertIn('event_search_vector_idx', plan)
@@ -0,0 +1,260 @@
+"""
+Tests for the organizer statistics of the event api.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Q, Sum
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Enrollment, Event, OrganizerStats, WaitlistEntry
+
+BULK_URL = reverse('event:event-bulk')
+STATS_URL = reverse('event:event-stats')
+
+
+def event_detail_url(event_id):
+    """Get and return a detail event url."""
+    return reverse('event:event-detail', args=[event_id])
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+        name='Test User',
+    )
+
+
+def create_event(organizer, **params):
+    """Create and return a sample event."""
+    default = {
+        'title': 'Event 1',
+        'venue': 'Online',
+        'ticket_price': Decimal('12.95'),
+        'date': date(2099, 12, 22),
+        'time': '13:00',
+    }
+    default.update(params)
+
+    return Event.objects.create(organizer=organizer, **default)
+
+
+class OrganizerStatsTests(TestCase):
+    """Tests for keeping the organizer statistics up to date."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.attendee = create_user('attendee@example.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertStatsCounted(self, organizer=None):
+        """Assert the statistics row of the organizer matches its
+        events."""
+        organizer = organizer or self.user
+        today = timezone.localdate()
+        expected = Event.objects.filter(organizer=organizer).aggregate(
+            event_count=Count('id'),
+            upcoming_count=Count('id', filter=Q(date__gte=today)),
+            total_capacity=Sum('max_attendees'),
+            revenue_potential=Sum(F('ticket_price') * F('max_attendees')),
+            seats_taken=Sum('seats_taken'),
+        )
+        stats = OrganizerStats.objects.get(organizer=organizer)
+
+        self.assertEqual(
+            {name: getattr(stats, name) for name in expected},
+            {name: value or 0 for name, value in expected.items()},
+        )
+
+    def test_event_created(self):
+        """Test creating events adds them to the statistics."""
+        create_event(self.user, max_attendees=5)
+        create_event(self.user, date=date(2020, 1, 1))
+
+        self.assertStatsCounted()
+        stats = OrganizerStats.objects.get(organizer=self.user)
+        self.assertEqual(stats.event_count, 2)
+        self.assertEqual(stats.upcoming_count, 1)
+        self.assertEqual(stats.revenue_potential, Decimal('194.25'))
+
+    def test_event_updated_through_api(self):
+        """Test changing an event replaces its old values."""
+        event = create_event(self.user)
+        payload = {'max_attendees': 20, 'ticket_price': '5.00',
+                   'date': '2020-01-01'}
+
+        res = self.client.patch(event_detail_url(event.id), payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertStatsCounted()
+
+    def test_event_saved_with_update_fields(self):
+        """Test only the saved fields are counted."""
+        event = create_event(self.user)
+        event.max_attendees = 50
+        event.ticket_price = Decimal('1.00')
+
+        event.save(update_fields=['max_attendees'])
+
+        self.assertStatsCounted()
+
+    def test_event_loaded_and_saved(self):
+        """Test saving a loaded event replaces the values it had in the
+        database, which loading it does not record."""
+        event = create_event(self.user)
+        loaded = Event.objects.get(pk=event.pk)
+        loaded.max_attendees = 40
+        loaded.date = date(2020, 1, 1)
+
+        loaded.save()
+
+        self.assertFalse(hasattr(Event.objects.get(pk=event.pk),
+                                 '_loaded_snapshot'))
+        self.assertStatsCounted()
+
+    def test_event_saved_without_loading(self):
+        """Test saving an event that was not loaded recounts its
+        organizer."""
+        event = create_event(self.user)
+        Event(
+            pk=event.pk, organizer=self.user, title='Replaced',
+            venue='Online', ticket_price=Decimal('3.00'), date=event.date,
+            time=event.time, max_attendees=3,
+        ).save()
+
+        self.assertStatsCounted()
+
+    def test_event_deleted(self):
+        """Test deleting an event removes it with its seats."""
+        event = create_event(self.user)
+        create_event(self.user)
+        Enrollment.objects.enroll(self.attendee, event)
+
+        res = self.client.delete(event_detail_url(event.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertStatsCounted()
+
+    def test_events_deleted_with_queryset(self):
+        """Test events deleted through a queryset are removed."""
+        events = [create_event(self.user) for _ in range(3)]
+
+        Event.objects.filter(pk__in=[event.pk for event in events[:2]]) \
+            .delete()
+
+        self.assertStatsCounted()
+
+    def test_bulk_create_and_update(self):
+        """Test bulk writes are counted with one update."""
+        payload = [
+            {'title': f'Bulk {number}', 'venue': 'Online',
+             'ticket_price': '10.00', 'date': '2099-12-22', 'time': '13:00',
+             'max_attendees': number + 1}
+            for number in range(5)
+        ]
+        res = self.client.post(BULK_URL, payload, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertStatsCounted()
+
+        res = self.client.patch(BULK_URL, [
+            {'id': event['id'], 'ticket_price': '2.50', 'date': '2020-01-01'}
+            for event in res.data
+        ], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertStatsCounted()
+
+    def test_enrollments_counted(self):
+        """Test enrolling, cancelling and promoting from the waitlist
+        change the seats taken."""
+        event = create_event(self.user, max_attendees=1)
+        waiter = create_user('waiter@example.com')
+
+        enrollment, _ = Enrollment.objects.enroll(self.attendee, event)
+        self.assertStatsCounted()
+        WaitlistEntry.objects.join(waiter, event)
+        Enrollment.objects.cancel(enrollment)
+        self.assertStatsCounted()
+
+        Enrollment.objects.cancel(Enrollment.objects.get(user=waiter))
+        self.assertStatsCounted()
+        self.assertEqual(
+            OrganizerStats.objects.get(organizer=self.user).seats_taken, 0
+        )
+
+    def test_organizers_kept_apart(self):
+        """Test events only count for their organizer."""
+        other = create_user('other@example.com')
+        create_event(self.user)
+        create_event(other, max_attendees=7)
+
+        self.assertStatsCounted()
+        self.assertStatsCounted(other)
+
+
+class OrganizerStatsApiTests(TestCase):
+    """Tests for reading the organizer statistics."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_auth_required(self):
+        """Test auth is required for the statistics."""
+        res = APIClient().get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_no_events(self):
+        """Test organizers without events get zeros."""
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['event_count'], 0)
+        self.assertEqual(res.data['revenue_potential'], '0.00')
+        self.assertFalse(OrganizerStats.objects.exists())
+
+    def test_read_stats(self):
+        """Test the statistics of the user's events are returned."""
+        create_event(self.user, max_attendees=4, ticket_price=Decimal('2'))
+        create_event(create_user('other@example.com'))
+
+        with self.assertNumQueries(1):
+            res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['event_count'], 1)
+        self.assertEqual(res.data['upcoming_count'], 1)
+        self.assertEqual(res.data['total_capacity'], 4)
+        self.assertEqual(res.data['revenue_potential'], '8.00')
+        self.assertEqual(res.data['seats_taken'], 0)
+
+    def test_upcoming_recounted_next_day(self):
+        """Test the upcoming count is recounted once the day it was
+        counted on has passed."""
+        today = timezone.localdate()
+        create_event(self.user, date=today)
+        create_event(self.user, date=today + timedelta(days=1))
+        tomorrow = today + timedelta(days=1)
+
+        with patch('django.utils.timezone.localdate',
+                   return_value=tomorrow):
+            create_event(self.user, date=today)
+            res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.data['event_count'], 3)
+        self.assertEqual(res.data['upcoming_count'], 1)
+        stats = OrganizerStats.objects.get(organizer=self.user)
+        self.assertEqual(stats.upcoming_since, tomorrow)
@@ -8,7 +8,7 @@ from django.urls import (
 )
 from rest_framework.routers import DefaultRouter
 
-from event import views
+from event import async_views, views
 
 router = DefaultRouter()
 router.register('organized-events', views.OrganizedEventViewSet)
@@ -19,4 +19,19 @@ urlpatterns = [
     path('organized-events/', include(router.urls)),
     path('all-events/', views.GetAllEvents.as_view({'get': 'list'}),
          name='all-events'),
+    path('upcoming-events/',
+         views.GetUpcomingEvents.as_view({'get': 'list'}),
+         name='upcoming-events'),
+    path('search/', views.SearchEvents.as_view({'get': 'list'}),
+         name='search-events'),
+    path('calendar/', views.EventCalendar.as_view({'get': 'list'}),
+         name='event-calendar'),
+    path('export/', views.ExportEvents.as_view(), name='export-events'),
+    path('async/all-events/', async_views.all_events,
+         name='async-all-events'),
+    path('async/upcoming-events/', async_views.upcoming_events,
+         name='async-upcoming-events'),
+    path('async/organized-events/<int:pk>/',
+         async_views.organized_event_detail,
+         name='async-event-detail'),
 ]
@@ -2,24 +2,78 @@
 Views for the event api.
 """
 
-from core.models import Event
+from contextlib import contextmanager
 
-from rest_framework import viewsets, mixins
-from rest_framework.authentication import TokenAuthentication
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils.translation import gettext as _
+
+from core.models import Event, OrganizerStats, VenueBookedError
+from core.parsers import FastJSONParser, NDJSONParser
+from core.renderers import CSVRenderer, NDJSONRenderer
+from core.routers import ReplicaReadMixin
+
+from rest_framework import generics, serializers, status, viewsets, mixins
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from event.bookings import booking_conflicts
+from event.cache import CachedListMixin, bump_version
+from event.calendar import CalendarSerializer, calendar
+from event.conditional import ConditionalGetMixin
+from event.export import EXPORT_FIELDS, export_rows
+from event.fast import FastListMixin
+from event.filters import (
+    EventFilterBackend,
+    EventOrderingFilter,
+    upcoming_q,
+)
+from event.pagination import (
+    EventKeysetPagination,
+    SearchKeysetPagination,
+    UpcomingEventKeysetPagination,
+)
+from event.search import search_events
 from event.serializers import (
     EventSerializer,
-    EventDetailSerializer
+    EventDetailSerializer,
+    EventBulkSerializer,
+    OrganizerStatsSerializer,
 )
+from user.authentication import CachedTokenAuthentication
+
+
+class VenueBooked(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _('The venue is already booked at that time.')
+    default_code = 'venue_booked'
 
 
-class OrganizedEventViewSet(viewsets.ModelViewSet):
+@contextmanager
+def rejecting_double_bookings():
+    """Run the block in a transaction, answering writes that double-book
+    a venue with a conflict."""
+    try:
+        with booking_conflicts():
+            yield
+    except VenueBookedError:
+        raise VenueBooked()
+
+
+class OrganizedEventViewSet(ReplicaReadMixin,
+                            ConditionalGetMixin,
+                            FastListMixin,
+                            viewsets.ModelViewSet):
     """Viewset for the organised events by the user."""
+    replica_actions = ('retrieve',)
     queryset = Event.objects.all()
     serializer_class = EventDetailSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = EventKeysetPagination
+    filter_backends = [EventFilterBackend, EventOrderingFilter]
 
     def perform_create(self, serializer):
         """Save the authenticated user as the organizer
@@ -30,17 +84,172 @@ class OrganizedEventViewSet(viewsets.ModelViewSet):
         """Overrides queryset to be used for the specified methods."""
         if self.action == 'list':
             return EventSerializer
+        if self.action == 'bulk':
+            return EventBulkSerializer
+        if self.action == 'stats':
+            return OrganizerStatsSerializer
         return self.serializer_class
 
+    def create(self, request, *args, **kwargs):
+        """Create the event, unless it double-books its venue."""
+        with rejecting_double_bookings():
+            return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        """Update the event locked, so the organizer statistics are
+        changed from the values it is replacing, unless it double-books
+        its venue."""
+        with rejecting_double_bookings():
+            return super().update(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        """Delete the event locked, see `update`."""
+        with transaction.atomic():
+            return super().destroy(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """Return the totals over the user's events, read from one row
+        kept up to date as they change."""
+        stats = OrganizerStats.objects.for_organizer(request.user)
+        return Response(self.get_serializer(stats).data)
+
+    @action(detail=False, methods=['post', 'patch'],
+            parser_classes=[FastJSONParser, NDJSONParser])
+    def bulk(self, request):
+        """Create (POST) or update (PATCH) many events at once.
+
+        Takes a JSON array or an NDJSON stream of events; updates name
+        the event they change by `id`. Everything is saved in one
+        transaction, or nothing is and the errors are returned in the
+        order of the items, or a conflict when the events double-book a
+        venue.
+        """
+        with rejecting_double_bookings():
+            if request.method == 'POST':
+                serializer = self.get_serializer(data=request.data, many=True)
+                serializer.is_valid(raise_exception=True)
+                serializer.save(organizer=request.user)
+                response_status = status.HTTP_201_CREATED
+            else:
+                events = self.get_queryset().filter(
+                    pk__in=self.get_bulk_ids(request.data)
+                ).select_for_update()
+                serializer = self.get_serializer(
+                    list(events), data=request.data, many=True, partial=True
+                )
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+                response_status = status.HTTP_200_OK
+            bump_version()
+        return Response(serializer.data, status=response_status)
+
+    def get_bulk_ids(self, data):
+        """Return the event ids named by the items of a bulk update."""
+        ids = []
+        for item in data if isinstance(data, list) else []:
+            try:
+                ids.append(int(item['id']))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return ids
+
+    def get_object(self):
+        """Return the locked event an update changes with the values it
+        replaces, which the statistics and the calendar are updated by."""
+        event = super().get_object()
+        if self.action in ('update', 'partial_update'):
+            event._loaded_snapshot = event.snapshot()
+        return event
+
     def get_queryset(self):
         """Overrides the queryset based on the specifications provided."""
-        return self.queryset.filter(
-            organizer=self.request.user
-        ).order_by('-id')
+        queryset = self.queryset.filter(organizer=self.request.user)
+        if self.action in ('update', 'partial_update', 'destroy'):
+            queryset = queryset.select_for_update()
+        return queryset.order_by('-id')
 
 
-class GetAllEvents(mixins.ListModelMixin, viewsets.GenericViewSet):
+class GetAllEvents(ReplicaReadMixin,
+                   CachedListMixin,
+                   ConditionalGetMixin,
+                   FastListMixin,
+                   mixins.ListModelMixin,
+                   viewsets.GenericViewSet):
     """Views for getting all events."""
     http_method_names = ['get']
     queryset = Event.objects.all().order_by('-id')
     serializer_class = EventSerializer
+    pagination_class = EventKeysetPagination
+    filter_backends = [EventFilterBackend, EventOrderingFilter]
+
+
+class GetUpcomingEvents(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Views for getting events that have not started yet,
+    soonest first."""
+    http_method_names = ['get']
+    queryset = Event.objects.all()
+    serializer_class = EventSerializer
+    pagination_class = UpcomingEventKeysetPagination
+    filter_backends = [EventFilterBackend, EventOrderingFilter]
+
+    def get_queryset(self):
+        """Limit the events to the ones starting from now on."""
+        return self.queryset.filter(
+            upcoming_q()
+        ).order_by('date', 'time', 'id')
+
+
+class SearchEvents(ReplicaReadMixin,
+                   mixins.ListModelMixin,
+                   viewsets.GenericViewSet):
+    """Views for searching events by title, venue and description,
+    most relevant first."""
+    http_method_names = ['get']
+    queryset = Event.objects.all()
+    serializer_class = EventSerializer
+    pagination_class = SearchKeysetPagination
+    filter_backends = [EventFilterBackend]
+
+    def get_queryset(self):
+        """Match the events against the `q` parameter."""
+        text = self.request.query_params.get('q', '').strip()
+        if not text:
+            msg = _('The search text is required.')
+            raise serializers.ValidationError({'q': msg})
+        return search_events(self.queryset, text)
+
+
+class EventCalendar(ReplicaReadMixin, viewsets.GenericViewSet):
+    """View counting the events of every day of a window, by default
+    the current month, optionally per venue."""
+    http_method_names = ['get']
+    queryset = Event.objects.all()
+    serializer_class = CalendarSerializer
+    pagination_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(calendar(**serializer.validated_data))
+
+
+class ExportEvents(generics.GenericAPIView):
+    """View streaming all events as NDJSON (default) or CSV, oldest
+    first, without holding them in memory."""
+    queryset = Event.objects.all()
+    serializer_class = EventSerializer
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    filter_backends = [EventFilterBackend]
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).order_by('id')
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(EXPORT_FIELDS, export_rows(queryset)),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="events.{renderer.format}"'
+        )
+        return response
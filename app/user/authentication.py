@@ -0,0 +1,108 @@
+"""
+Cached token authentication for the apis.
+
+Tokens are signed and carry their expiry, see `user.tokens`, so only
+the ones that pass the signature check are resolved. Resolving a token
+costs a join of `authtoken_token` and `core_user`; the
+`CachedTokenAuthentication` keeps the resolved pair in a
+bounded in-process LRU cache and, when `AUTH_TOKEN_SHARED_CACHE` names
+one, in a shared cache as well. Entries are dropped when the token is
+deleted or the user is saved, which covers deactivation and password
+changes; other processes drop their local copy once it expires. The
+password hash is left out of the cached user and loaded on access, so
+it is neither copied to the shared cache nor written back stale.
+"""
+
+import copy
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from core.cache import get_cache
+from user.tokens import unsign_token
+
+LOCAL_CACHE_ALIAS = 'tokens'
+
+
+def get_token_caches():
+    """Return the token caches, nearest first."""
+    caches = [get_cache(LOCAL_CACHE_ALIAS)]
+    if settings.AUTH_TOKEN_SHARED_CACHE:
+        caches.append(get_cache(settings.AUTH_TOKEN_SHARED_CACHE))
+    return caches
+
+
+def invalidate_token(key):
+    """Drop the cached lookup of a token.
+
+    The entry is dropped right away and again once the transaction
+    commits, so a lookup cached from a concurrent read of the old rows
+    does not survive the commit.
+    """
+    def delete():
+        for cache in get_token_caches():
+            cache.delete(key)
+
+    delete()
+    transaction.on_commit(delete)
+
+
+def token_cache_stats():
+    """Return the hit and miss counters of the token caches."""
+    return {
+        alias: get_cache(alias).stats()
+        for alias in (LOCAL_CACHE_ALIAS, settings.AUTH_TOKEN_SHARED_CACHE)
+        if alias
+    }
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Signed token authentication answering warm lookups from the caches.
+
+    Takes the same header as `TokenAuthentication` with the signed
+    tokens of `user.tokens`; expired and tampered tokens are rejected
+    before any lookup. Only active users are cached, and every request
+    gets its own copy of the cached user so nothing set on it leaks
+    into later requests.
+    """
+
+    def authenticate_credentials(self, signed):
+        try:
+            key, user_id = unsign_token(signed)
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        user, token = self.lookup(key)
+        if user.pk != user_id:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        user = copy.copy(user)
+        token = copy.copy(token)
+        token.user = user
+        return user, token
+
+    def lookup(self, key):
+        """Return the user and token of a key, from the nearest cache
+        holding them or from the database."""
+        caches = get_token_caches()
+        for index, cache in enumerate(caches):
+            cached = cache.get(key)
+            if cached is not None:
+                for nearer in caches[:index]:
+                    nearer.set(key, cached)
+                return cached
+
+        user, token = super().authenticate_credentials(key)
+        user = copy.copy(user)
+        del user.__dict__['password']
+        token = copy.copy(token)
+        token.user = user
+        cached = user, token
+        for cache in caches:
+            cache.set(key, cached)
+        return cached
@@ -64,3 +64,9 @@ class AuthTokenSerializer(serializers.Serializer):
 
         attrs['user'] = user
         return attrs
+
+
+class SignedTokenSerializer(serializers.Serializer):
+    """Serializer for the signed tokens handed to clients."""
+    token = serializers.CharField(read_only=True)
+    expires = serializers.DateTimeField(read_only=True)
@@ -0,0 +1,161 @@
+"""
+Tests for the cached token authentication.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.cache import get_cache
+from core.tests.test_cache import FakeRedis
+from user.authentication import token_cache_stats
+from user.tokens import sign_token
+
+ME_URL = reverse('user:me')
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+        name='Test User',
+    )
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Tests for authenticating with cached tokens."""
+
+    def setUp(self):
+        get_cache('tokens').clear()
+        get_cache('tokens').reset_stats()
+        self.user = create_user()
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {sign_token(self.token)}'
+        )
+
+    def test_warm_request_makes_no_queries(self):
+        """Test a request with a cached token does not touch the
+        database."""
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_invalid_token_rejected(self):
+        """Test an unknown token is still rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_rejected(self):
+        """Test a cached token stops working once it is deleted."""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test a cached token stops working once its user is
+        deactivated."""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_invalidates_cache(self):
+        """Test changing the password drops the cached user."""
+        self.client.get(ME_URL)
+
+        self.client.patch(ME_URL, {'password': 'newpass123'})
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.wsgi_request.user.check_password('newpass123'))
+
+    def test_update_does_not_write_cached_user_back(self):
+        """Test updating the profile with a cached user keeps a password
+        changed since it was cached."""
+        self.client.get(ME_URL)
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            password=make_password('changed123'),
+        )
+
+        res = self.client.patch(ME_URL, {'name': 'Renamed'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'Renamed')
+        self.assertTrue(self.user.check_password('changed123'))
+
+    def test_password_hash_not_cached(self):
+        """Test the cached user leaves the password hash out."""
+        self.client.get(ME_URL)
+
+        user, token = get_cache('tokens').get(self.token.key)
+
+        self.assertNotIn('password', user.__dict__)
+        self.assertIs(token.user, user)
+
+    def test_requests_get_their_own_user(self):
+        """Test changes to the user of one request do not leak into the
+        cache."""
+        res = self.client.get(ME_URL)
+        res.wsgi_request.user.name = 'Changed'
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'Test User')
+
+    def test_hit_rate_reported(self):
+        """Test the cache counters track token lookups."""
+        for _ in range(4):
+            self.client.get(ME_URL)
+
+        stats = token_cache_stats()['tokens']
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['hit_rate'], 0.75)
+
+    def test_shared_cache_fills_local_cache(self):
+        """Test a lookup cached by another process is served from the
+        shared cache without a query."""
+        caches = {
+            'tokens': {
+                'BACKEND': 'core.cache.LocMemLRUCache',
+                'OPTIONS': {'default_timeout': 30},
+            },
+            'tokens-shared': {
+                'BACKEND': 'core.cache.RedisCache',
+                'OPTIONS': {'client': FakeRedis()},
+            },
+        }
+        with override_settings(
+            CORE_CACHES=caches, AUTH_TOKEN_SHARED_CACHE='tokens-shared'
+        ):
+            self.client.get(ME_URL)
+            get_cache('tokens').clear()
+
+            with self.assertNumQueries(0):
+                res = self.client.get(ME_URL)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(get_cache('tokens-shared').stats()['hits'], 1)
+            self.assertEqual(get_cache('tokens').stats()['misses'], 2)
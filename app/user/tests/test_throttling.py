@@ -0,0 +1,164 @@
+"""
+Tests for throttling the login attempts.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.cache import get_cache
+from user.throttling import LoginRateThrottle, SlidingWindowThrottle
+
+TOKEN_URL = reverse('user:token')
+
+RATES = {'login-ip': '3/min', 'login-email': '2/min'}
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+        name='Test User',
+    )
+
+
+@override_settings(LOGIN_THROTTLE_RATES=RATES)
+class LoginThrottleTests(TestCase):
+    """Tests for throttling the token endpoint."""
+
+    def setUp(self):
+        get_cache('throttle').clear()
+        self.client = APIClient()
+        create_user()
+
+    def login(self, email='test@example.com', password='wrong',
+              address='10.0.0.1', **extra):
+        return self.client.post(
+            TOKEN_URL, {'email': email, 'password': password},
+            REMOTE_ADDR=address, **extra
+        )
+
+    def test_throttled_by_email(self):
+        """Test attempts on one account are throttled from any address,
+        before the credentials are checked."""
+        self.login(address='10.0.0.1')
+        self.login(email=' Test@Example.com', address='10.0.0.2')
+
+        with patch('user.serializers.authenticate') as patched:
+            res = self.login(password='test123', address='10.0.0.3')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', res)
+        patched.assert_not_called()
+
+    def test_throttled_by_address(self):
+        """Test attempts from one address are throttled whatever account
+        they try."""
+        for number in range(3):
+            res = self.login(email=f'user{number}@example.com')
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.login(email='other@example.com')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        res = self.login(email='other@example.com', address='10.0.0.2')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_body_without_fields_rejected(self):
+        """Test a body that is not an object is rejected as invalid,
+        counted only against the address."""
+        res = self.client.post(TOKEN_URL, [], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_forwarded_address_not_trusted(self):
+        """Test a client cannot dodge the address throttle by sending
+        its own X-Forwarded-For."""
+        for number in range(3):
+            res = self.login(
+                email=f'user{number}@example.com',
+                HTTP_X_FORWARDED_FOR=f'10.1.0.{number}',
+            )
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.login(
+            email='other@example.com', HTTP_X_FORWARDED_FOR='10.1.0.9'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_successful_login_within_limit(self):
+        """Test logins within the limits go through."""
+        self.login()
+
+        res = self.login(password='test123')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(
+        LOGIN_THROTTLE_RATES={'login-ip': None, 'login-email': None}
+    )
+    def test_throttles_disabled(self):
+        """Test throttles without a rate let every attempt through."""
+        for _ in range(5):
+            res = self.login()
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(LOGIN_THROTTLE_RATES=RATES)
+class SlidingWindowTests(SimpleTestCase):
+    """Tests for the sliding window estimate."""
+
+    def setUp(self):
+        get_cache('throttle').clear()
+        self.request = Request(APIRequestFactory().post(TOKEN_URL))
+
+    def attempt(self, now):
+        throttle = LoginRateThrottle()
+        with patch.object(SlidingWindowThrottle, 'timer',
+                          return_value=now):
+            allowed = throttle.allow_request(self.request, None)
+        return allowed, throttle.wait()
+
+    def test_previous_window_weighed_by_overlap(self):
+        """Test the previous window counts by how much of it is still in
+        the last minute."""
+        for _ in range(3):
+            self.assertEqual(self.attempt(600), (True, None))
+
+        # Two thirds of the previous window overlap: 3 * 2 / 3 + 1.
+        self.assertEqual(self.attempt(680), (True, None))
+        allowed, wait = self.attempt(680)
+
+        self.assertFalse(allowed)
+        # The next attempt fits, 3 * (1 - t / 60) + 3 <= 3, only once
+        # the previous window has slid out entirely, 40 seconds later.
+        self.assertAlmostEqual(wait, 40)
+
+    def test_wait_into_next_window(self):
+        """Test the wait reaches into the next window when this one is
+        full."""
+        for _ in range(3):
+            self.attempt(630)
+
+        allowed, wait = self.attempt(630)
+
+        self.assertFalse(allowed)
+        # 4 * (1 - t / 60) + 1 <= 3 at t = 30 of the next window.
+        self.assertAlmostEqual(wait, 60)
+
+    def test_idle_keys_expire(self):
+        """Test the counters are stored with a timeout of two windows."""
+        with patch('core.cache.LocMemLRUCache.incr',
+                   return_value=1) as patched:
+            self.attempt(600)
+
+        self.assertEqual(patched.call_args.kwargs['timeout'], 120)
@@ -0,0 +1,177 @@
+"""
+Tests for the signed, expiring tokens.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.cache import get_cache
+from user.tokens import sign_token, unsign_token
+
+TOKEN_URL = reverse('user:token')
+REFRESH_URL = reverse('user:token-refresh')
+ME_URL = reverse('user:me')
+
+
+def create_user(email='test@example.com', password='test123'):
+    """Create and return a user."""
+    return get_user_model().objects.create_user(
+        email=email,
+        password=password,
+        name='Test User',
+    )
+
+
+def age_token(token, seconds):
+    """Move the creation of the token `seconds` into the past."""
+    token.created -= timedelta(seconds=seconds)
+    Token.objects.filter(pk=token.pk).update(created=token.created)
+
+
+class SignedTokenTests(TestCase):
+    """Tests for signing and checking tokens."""
+
+    def setUp(self):
+        self.user = create_user()
+        self.token = Token.objects.create(user=self.user)
+
+    def test_sign_and_unsign(self):
+        """Test a signed token gives back its key and user."""
+        key, user_id = unsign_token(sign_token(self.token))
+
+        self.assertEqual(key, self.token.key)
+        self.assertEqual(user_id, self.user.id)
+
+    def test_tampered_token_rejected(self):
+        """Test changing any part of a signed token is detected."""
+        signed = sign_token(self.token)
+        key, user_id, rest = signed.split('.', 2)
+
+        with self.assertRaises(signing.BadSignature):
+            unsign_token(f'{key}.{int(user_id) + 1}.{rest}')
+        with self.assertRaises(signing.BadSignature):
+            unsign_token(signed[:-1])
+        with self.assertRaises(signing.BadSignature):
+            unsign_token(self.token.key)
+
+    @override_settings(AUTH_TOKEN_TTL=60)
+    def test_expired_token_rejected(self):
+        """Test a token past its expiry is rejected."""
+        age_token(self.token, 61)
+
+        with self.assertRaises(signing.SignatureExpired):
+            unsign_token(sign_token(self.token))
+
+    def test_retired_key_still_accepted(self):
+        """Test tokens signed with a previous key keep working while the
+        key is listed."""
+        with override_settings(AUTH_TOKEN_SIGNING_KEYS={'1': 'old'}):
+            signed = sign_token(self.token)
+
+        with override_settings(
+            AUTH_TOKEN_SIGNING_KEYS={'1': 'old', '2': 'new'},
+            AUTH_TOKEN_SIGNING_KEY_VERSION='2',
+        ):
+            self.assertEqual(unsign_token(signed)[0], self.token.key)
+        with override_settings(
+            AUTH_TOKEN_SIGNING_KEYS={'2': 'new'},
+            AUTH_TOKEN_SIGNING_KEY_VERSION='2',
+        ):
+            with self.assertRaises(signing.BadSignature):
+                unsign_token(signed)
+
+
+class TokenApiTests(TestCase):
+    """Tests for issuing and refreshing tokens."""
+
+    def setUp(self):
+        get_cache('tokens').clear()
+        self.user = create_user()
+        self.client = APIClient()
+
+    def obtain_token(self):
+        res = self.client.post(TOKEN_URL, {
+            'email': 'test@example.com',
+            'password': 'test123',
+        })
+        return res.data['token']
+
+    def test_obtained_token_authenticates(self):
+        """Test the issued token is signed and accepted."""
+        signed = self.obtain_token()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {signed}')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(unsign_token(signed)[1], self.user.id)
+
+    @override_settings(AUTH_TOKEN_TTL=60)
+    def test_expired_token_rejected_without_queries(self):
+        """Test an expired token is turned away before the database."""
+        signed = self.obtain_token()
+        age_token(Token.objects.get(user=self.user), 61)
+        signed = sign_token(Token.objects.get(user=self.user))
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {signed}')
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_TTL=60)
+    def test_expired_token_replaced_on_login(self):
+        """Test logging in again after expiry issues a new token."""
+        old = self.obtain_token()
+        age_token(Token.objects.get(user=self.user), 61)
+
+        new = self.obtain_token()
+
+        self.assertNotEqual(unsign_token(new)[0], old.split('.')[0])
+        self.assertEqual(Token.objects.filter(user=self.user).count(), 1)
+
+    def test_refresh_rotates_token(self):
+        """Test refreshing hands out a new token and retires the old."""
+        old = self.obtain_token()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {old}')
+        self.client.get(ME_URL)
+
+        res = self.client.post(REFRESH_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data['token'], old)
+        self.assertEqual(self.client.get(ME_URL).status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Token {res.data["token"]}'
+        )
+        self.assertEqual(self.client.get(ME_URL).status_code,
+                         status.HTTP_200_OK)
+
+    def test_refresh_requires_authentication(self):
+        """Test refreshing without a token is rejected."""
+        res = self.client.post(REFRESH_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_endpoints_documented(self):
+        """Test the schema documents the signed token both token
+        endpoints answer with."""
+        paths = SchemaGenerator().get_schema(public=True)['paths']
+
+        for url in (TOKEN_URL, REFRESH_URL):
+            response = paths[url]['post']['responses']['200']
+            self.assertEqual(
+                response['content']['application/json']['schema'],
+                {'$ref': '#/components/schemas/SignedToken'},
+            )
+        self.assertNotIn('requestBody', paths[REFRESH_URL]['post'])
@@ -0,0 +1,104 @@
+"""
+Throttling of the login attempts of the user api.
+
+Each throttle keeps a sliding window counter per key: the attempts of
+the current and of the previous fixed window, two integers in the
+`throttle` core cache. The attempts in the last window length are
+estimated by weighing the previous window's count by how much of it
+still overlaps. Counters expire two windows after they were created, so
+idle keys go away on their own, and the in-process cache also evicts
+the least recently used keys beyond its size. With REDIS_URL set the
+counters are shared by every process.
+
+The throttles run in `initial()`, before the view parses and checks
+the credentials, so rejected attempts cost no password hashing.
+"""
+
+from collections.abc import Mapping
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from core.cache import get_cache
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Sliding window counter throttle, with its rate in
+    `settings.LOGIN_THROTTLE_RATES[scope]`.
+
+    Attempts over the limit are counted as well, so a client that keeps
+    retrying stays throttled until it slows down.
+    """
+    cache_alias = 'throttle'
+
+    def get_rate(self):
+        return settings.LOGIN_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        cache = get_cache(self.cache_alias)
+        now = self.timer()
+        window, elapsed = divmod(now, self.duration)
+        window = int(window)
+        current = cache.incr(
+            f'{self.key}:{window}', timeout=2 * self.duration
+        )
+        previous = cache.get(f'{self.key}:{window - 1}', 0)
+        overlap = 1 - elapsed / self.duration
+        estimate = previous * overlap + current
+
+        if estimate > self.num_requests:
+            self.wait_seconds = self.get_wait(previous, current, elapsed)
+            return False
+        return True
+
+    def get_wait(self, previous, current, elapsed):
+        """Return the seconds until another attempt would be allowed,
+        assuming none are made in between."""
+        limit = self.num_requests - 1
+        if current > limit:
+            # Not in this window; in the next one, this window's count
+            # has to slide out until one more attempt fits.
+            return self.duration - elapsed \
+                + self.duration * (1 - limit / current)
+        # The previous window's share has to shrink to the room left.
+        return max(
+            self.duration * (1 - (limit - current) / previous) - elapsed, 0
+        )
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+
+class LoginRateThrottle(SlidingWindowThrottle):
+    """Login attempts per client IP address, trusting X-Forwarded-For
+    only as far as `REST_FRAMEWORK['NUM_PROXIES']`."""
+    scope = 'login-ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class LoginEmailRateThrottle(SlidingWindowThrottle):
+    """Login attempts per account, whichever address they come from."""
+    scope = 'login-email'
+
+    def get_cache_key(self, request, view):
+        if not isinstance(request.data, Mapping):
+            return None
+        email = request.data.get('email')
+        if not isinstance(email, str) or not email:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': email.strip().lower(),
+        }
@@ -0,0 +1,96 @@
+"""
+Signed, expiring tokens for the user api.
+
+A token handed to clients reads `<key>.<user id>.<expiry>.<version>.<mac>`:
+the key of the `authtoken` row, the id of its user, the unix time it
+expires at and the version of the signing key, followed by an HMAC of
+all four. Expired or tampered tokens are rejected without touching the
+database; only the key is looked up for the ones that pass.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework.authtoken.models import Token
+
+SALT = 'user.tokens'
+SEPARATOR = '.'
+
+
+def get_ttl():
+    return timedelta(seconds=settings.AUTH_TOKEN_TTL)
+
+
+def token_expiry(token):
+    """Return when the token expires."""
+    return token.created + get_ttl()
+
+
+def is_expired(token, now=None):
+    return token_expiry(token) <= (now or timezone.now())
+
+
+def expired_tokens(now=None):
+    """Return the tokens past their expiry."""
+    cutoff = (now or timezone.now()) - get_ttl()
+    return Token.objects.filter(created__lte=cutoff)
+
+
+def signature(value, version):
+    try:
+        secret = settings.AUTH_TOKEN_SIGNING_KEYS[version]
+    except KeyError:
+        raise signing.BadSignature('Unknown signing key version')
+    return salted_hmac(
+        SALT, value, secret=secret, algorithm='sha256'
+    ).hexdigest()
+
+
+def sign_token(token):
+    """Return the signed form of the token handed to clients."""
+    version = settings.AUTH_TOKEN_SIGNING_KEY_VERSION
+    value = SEPARATOR.join([
+        token.key,
+        str(token.user_id),
+        str(int(token_expiry(token).timestamp())),
+        version,
+    ])
+    return SEPARATOR.join([value, signature(value, version)])
+
+
+def unsign_token(signed):
+    """Check a signed token and return its key and user id.
+
+    Raises `signing.BadSignature` for malformed or tampered tokens and
+    `signing.SignatureExpired` for expired ones.
+    """
+    value, _, mac = signed.rpartition(SEPARATOR)
+    try:
+        key, user_id, expires, version = value.split(SEPARATOR)
+        user_id, expires = int(user_id), int(expires)
+    except ValueError:
+        raise signing.BadSignature('Malformed token')
+    if not constant_time_compare(mac, signature(value, version)):
+        raise signing.BadSignature('Signature does not match')
+    if expires <= timezone.now().timestamp():
+        raise signing.SignatureExpired('Token expired')
+    return key, user_id
+
+
+def rotate_token(user):
+    """Replace the user's token with a fresh one and return it."""
+    with transaction.atomic():
+        Token.objects.filter(user=user).delete()
+        return Token.objects.create(user=user)
+
+
+def get_token(user):
+    """Return the user's token, replacing it if it has expired."""
+    token = Token.objects.filter(user=user).first()
+    if token is None or is_expired(token):
+        token = rotate_token(user)
+    return token
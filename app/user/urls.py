@@ -10,6 +10,11 @@ app_name = 'user'
 urlpatterns = [
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('token/', views.CreateUserToken.as_view(), name='token'),
+    path(
+        'token/refresh/',
+        views.RefreshUserToken.as_view(),
+        name='token-refresh'
+    ),
     path(
         'me/', views.ManageUserViews.as_view(), name='me')
 ]
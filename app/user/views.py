@@ -2,17 +2,30 @@
 Views for the user api.
 """
 
+from django.contrib.auth import get_user_model
+from drf_spectacular.utils import extend_schema
 from rest_framework import generics
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
-
+from user.authentication import CachedTokenAuthentication
+from user.throttling import LoginEmailRateThrottle, LoginRateThrottle
 from user.serializers import (
     UserSerializer,
     AuthTokenSerializer,
+    SignedTokenSerializer,
 )
+from user.tokens import get_token, rotate_token, sign_token, token_expiry
+
+
+def token_response(token):
+    """Return the response handing a signed token to the client."""
+    return Response({
+        'token': sign_token(token),
+        'expires': token_expiry(token),
+    })
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -24,6 +37,26 @@ class CreateUserToken(ObtainAuthToken):
     """View for creating new user token."""
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = [LoginRateThrottle, LoginEmailRateThrottle]
+
+    @extend_schema(responses=SignedTokenSerializer)
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(
+            data=request.data, context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        return token_response(get_token(serializer.validated_data['user']))
+
+
+class RefreshUserToken(generics.GenericAPIView):
+    """View for swapping a valid token for a fresh one."""
+    serializer_class = SignedTokenSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(request=None)
+    def post(self, request, *args, **kwargs):
+        return token_response(rotate_token(request.user))
 
 
 class ManageUserViews(generics.RetrieveUpdateAPIView):
@@ -31,9 +64,12 @@ class ManageUserViews(generics.RetrieveUpdateAPIView):
     http_method_names = ['get', 'patch']  # to just support get and patch
 
     serializer_class = UserSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        """ Get and return the current authenticated user."""
-        return self.request.user
+        """ Get and return the current authenticated user, read again
+        for updates as the authenticated one may be cached."""
+        if self.request.method in SAFE_METHODS:
+            return self.request.user
+        return get_user_model().objects.get(pk=self.request.user.pk)